@@ -0,0 +1,32 @@
+"""
+API Responses
+
+Fast JSON responses, used as the application's default response class.
+
+Returning a `FastJSONResponse` from a route skips FastAPI's
+`jsonable_encoder` pass; `json_response` also reuses the JSON bytes
+the cache encoded when the payload was stored, so a cache hit is sent
+without encoding it again.
+"""
+
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+from app.services.cache_service import CacheService
+from app.utils.json_utils import encode_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson; pre-encoded bytes are sent as-is."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return encode_json(content)
+
+
+def json_response(data: Any, cache: Optional[CacheService] = None) -> FastJSONResponse:
+    """Response for `data`, sending the cache's pre-encoded body when `data` is a cached value."""
+    body = cache.encoded(data) if cache is not None else None
+    return FastJSONResponse(body if body is not None else data)
@@ -1,5 +1,5 @@
 """API routes."""
 
-from app.api.routes import chat, riders, races, teams, rankings, stats
+from app.api.routes import chat, riders, races, teams, rankings, stats, batch
 
-__all__ = ["chat", "riders", "races", "teams", "rankings", "stats"]
+__all__ = ["chat", "riders", "races", "teams", "rankings", "stats", "batch"]
@@ -0,0 +1,133 @@
+"""Batch API endpoint."""
+
+from typing import Any, Dict, List, Tuple
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.responses import FastJSONResponse
+from app.config import settings
+from app.models.batch import BatchLookup, BatchRequest, BatchResponse
+from app.services.pcs_scraper import PCSScraperService
+from app.services.rate_limiter import ScrapeAllowance, set_allowance
+from app.dependencies import get_scraper
+from app.utils.json_utils import encode_json
+
+router = APIRouter()
+
+# (type, resolved slug, year, stage, category)
+LookupKey = Tuple[str, str, Any, Any, str]
+
+
+@router.post("/", response_model=BatchResponse)
+async def batch_lookup(
+    request: BatchRequest,
+    scraper: PCSScraperService = Depends(get_scraper)
+):
+    """
+    Look up several riders, races, startlists, teams or rankings at once.
+
+    Names are resolved first and duplicate lookups are fetched once.
+    Cached entities are answered at once; the others are scraped
+    concurrently, within the PCS rate limit. Only the first
+    BATCH_INTERACTIVE_SCRAPES misses are scraped in the interactive
+    lane; the rest wait behind other users' requests. With `"stream": true` the
+    results are sent as NDJSON lines in completion order, so cached
+    entities arrive first.
+
+    Example body:
+        {"lookups": [{"type": "rider", "slug": "pogacar"},
+                     {"type": "team", "slug": "uae", "year": 2024}]}
+    """
+    if len(request.lookups) > settings.BATCH_MAX_LOOKUPS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_LOOKUPS} lookups per batch"
+        )
+
+    started = time.perf_counter()
+    keys = [await _resolve(scraper, lookup) for lookup in request.lookups]
+    # Unique key -> positions in the request
+    positions: Dict[LookupKey, List[int]] = {}
+    for i, key in enumerate(keys):
+        positions.setdefault(key, []).append(i)
+
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    # Shared by the fetch tasks, which copy this context
+    allowance = ScrapeAllowance(settings.BATCH_INTERACTIVE_SCRAPES)
+    set_allowance(allowance)
+
+    async def _run(key: LookupKey) -> Tuple[LookupKey, Dict[str, Any]]:
+        async with semaphore:
+            return key, await _fetch(scraper, key)
+
+    tasks = [asyncio.create_task(_run(key)) for key in positions]
+
+    def _meta() -> Dict[str, Any]:
+        return {
+            "lookups": len(keys),
+            "unique": len(positions),
+            "background_scrapes": allowance.demoted,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    if request.stream:
+        async def _lines():
+            try:
+                for done in asyncio.as_completed(tasks):
+                    key, result = await done
+                    for i in positions[key]:
+                        yield encode_json({"index": i, **result}) + b"\n"
+                yield encode_json({"meta": _meta()}) + b"\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+    results: List[Dict[str, Any]] = [{}] * len(keys)
+    for key, result in await asyncio.gather(*tasks):
+        for i in positions[key]:
+            results[i] = {"index": i, **result}
+    return FastJSONResponse({"results": results, "meta": _meta()})
+
+
+async def _resolve(scraper: PCSScraperService, lookup: BatchLookup) -> LookupKey:
+    """Dedupe key of a lookup, with its name resolved to a slug."""
+    resolver = scraper.entity_resolver
+    if lookup.type == "rider":
+        slug = await resolver.resolve_rider(lookup.slug)
+    elif lookup.type in ("race", "startlist"):
+        slug = await resolver.resolve_race(lookup.slug)
+    elif lookup.type == "team":
+        slug = await resolver.resolve_team(lookup.slug, lookup.year)
+    else:
+        slug = lookup.slug or "individual"
+    stage = lookup.stage if lookup.type == "race" else None
+    category = lookup.category if lookup.type == "ranking" else ""
+    return (lookup.type, slug, lookup.year, stage, category)
+
+
+async def _fetch(scraper: PCSScraperService, key: LookupKey) -> Dict[str, Any]:
+    """Fetch one unique lookup as a result item (without its index)."""
+    kind, slug, year, stage, category = key
+    result: Dict[str, Any] = {"type": kind, "slug": slug}
+    try:
+        if kind == "rider":
+            data = await scraper.get_rider(slug)
+        elif kind == "race":
+            data = await scraper.get_race_results(slug, year, stage)
+        elif kind == "startlist":
+            data = await scraper.get_race_startlist(slug, year)
+        elif kind == "team":
+            data = await scraper.get_team(slug, year)
+        else:
+            data = await scraper.get_ranking(slug, category)
+    except Exception as e:
+        return {**result, "status": 502, "error": str(e)}
+
+    if "error" in data:
+        return {**result, "status": 404 if data.get("not_found") else 502, "error": data["error"]}
+    return {**result, "status": 200, "data": data}
@@ -1,11 +1,13 @@
 """Chat API endpoints."""
 
+import json
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.models.chat import ChatRequest, ChatResponse
 from app.services.ai_service import AIService
-from app.services.pcs_scraper import PCSScraperService
-from app.dependencies import get_scraper
+from app.dependencies import get_ai_service
 
 router = APIRouter()
 
@@ -13,42 +15,68 @@ router = APIRouter()
 @router.post("/", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    scraper: PCSScraperService = Depends(get_scraper)
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """
     Process a chat message and return AI response with optional data.
     """
     try:
-        ai_service = AIService(scraper)
         response = await ai_service.chat(request.message)
 
         return ChatResponse(
             message=response["message"],
             data=response.get("data"),
-            visualization=response.get("visualization")
+            visualization=response.get("visualization"),
+            meta=response.get("meta")
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Process a chat message and stream the answer as Server-Sent Events.
+
+    Emits `plan`, then one `data` event per entity as its scrape lands,
+    then `token` events with LLM text deltas, and finally `done`.
+    """
+    async def _events():
+        try:
+            async for event in ai_service.chat_stream(request.message):
+                payload = {k: v for k, v in event.items() if k != "event"}
+                yield f"event: {event['event']}\ndata: {json.dumps(payload, default=str)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/quick")
 async def quick_query(
     query: str,
-    scraper: PCSScraperService = Depends(get_scraper)
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """
     Quick query endpoint for simple questions.
     Returns structured data without full AI processing.
     """
     try:
-        ai_service = AIService(scraper)
         plan = await ai_service.plan_query(query)
-        data = await ai_service.execute_query(plan)
+        data, timings = await ai_service.execute_query_timed(plan)
 
         return {
             "plan": plan,
-            "data": data
+            "data": data,
+            "timings_ms": timings
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
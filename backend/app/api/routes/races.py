@@ -3,31 +3,54 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.api.responses import FastJSONResponse, json_response
 from app.services.pcs_scraper import PCSScraperService
-from app.dependencies import get_scraper
+from app.services.table_index import TableIndexCache, TableQuery
+from app.dependencies import get_scraper, get_tables, table_query
 
 router = APIRouter()
 
+# Result tables picked by default when paging a race or stage page
+RESULT_TABLES = ("results", "gc", "stages_winners", "stages")
+
 
 @router.get("/{race_slug}")
 async def get_race_results(
     race_slug: str,
     year: int = Query(..., description="Race year"),
     stage: Optional[int] = Query(None, description="Stage number"),
-    scraper: PCSScraperService = Depends(get_scraper)
+    table: Optional[str] = Query(None, description="Table to page, e.g. results, gc, points, kom"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Number of rows"),
+    query: TableQuery = Depends(table_query),
+    scraper: PCSScraperService = Depends(get_scraper),
+    tables: TableIndexCache = Depends(get_tables)
 ):
     """
     Get race results.
 
+    Without paging or filter parameters the full parsed page is returned.
+    Otherwise only one table (`table`, default: the main results table)
+    is returned, paged and filtered.
+
     Examples:
     - /api/races/tour-de-france?year=2024
     - /api/races/tour-de-france?year=2024&stage=1
+    - /api/races/tour-de-france?year=2024&stage=1&table=gc&limit=10&fields=rank,rider_name,time
     """
     try:
         data = await scraper.get_race_results(race_slug, year, stage)
         if "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
-        return data
+
+        query.limit = limit
+        if table is None and limit is None and query == TableQuery():
+            return json_response(data, scraper.cache)
+
+        if table is None:
+            table = next((t for t in RESULT_TABLES if isinstance(data.get(t), list)), None)
+        if table is None or not isinstance(data.get(table), list):
+            raise HTTPException(status_code=400, detail=f"No result table '{table}' in this page")
+        return FastJSONResponse(tables.query(data, table, query))
     except HTTPException:
         raise
     except Exception as e:
@@ -38,14 +61,19 @@ async def get_race_results(
 async def get_race_startlist(
     race_slug: str,
     year: int = Query(..., description="Race year"),
-    scraper: PCSScraperService = Depends(get_scraper)
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Number of riders"),
+    query: TableQuery = Depends(table_query),
+    scraper: PCSScraperService = Depends(get_scraper),
+    tables: TableIndexCache = Depends(get_tables)
 ):
-    """Get race startlist."""
+    """Get race startlist (filterable by team and nationality)."""
     try:
         data = await scraper.get_race_startlist(race_slug, year)
         if "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
-        return data
+
+        query.limit = limit
+        return FastJSONResponse(tables.query(data, "startlist", query))
     except HTTPException:
         raise
     except Exception as e:
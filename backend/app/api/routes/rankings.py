@@ -2,8 +2,10 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.api.responses import FastJSONResponse, json_response
 from app.services.pcs_scraper import PCSScraperService
-from app.dependencies import get_scraper
+from app.services.table_index import TableIndexCache, TableQuery
+from app.dependencies import get_scraper, get_tables, table_query
 
 router = APIRouter()
 
@@ -12,19 +14,22 @@ router = APIRouter()
 async def get_individual_ranking(
     limit: int = Query(50, ge=1, le=500, description="Number of riders"),
     category: str = Query("me", description="Category: me=men elite, we=women elite"),
-    scraper: PCSScraperService = Depends(get_scraper)
+    query: TableQuery = Depends(table_query),
+    scraper: PCSScraperService = Depends(get_scraper),
+    tables: TableIndexCache = Depends(get_tables)
 ):
-    """Get individual rider rankings."""
+    """Get individual rider rankings (filterable by team, nationality and rank range)."""
     try:
         data = await scraper.get_ranking("individual", category)
         if "error" in data:
             raise HTTPException(status_code=500, detail=data["error"])
 
-        # Limit results
-        if "ranking" in data and isinstance(data["ranking"], list):
-            data["ranking"] = data["ranking"][:limit]
+        # Page through the cached ranking without copying the rest
+        if isinstance(data.get("ranking"), list):
+            query.limit = limit
+            return FastJSONResponse(tables.query(data, "ranking", query))
 
-        return data
+        return json_response(data, scraper.cache)
     except HTTPException:
         raise
     except Exception as e:
@@ -35,19 +40,22 @@ async def get_individual_ranking(
 async def get_team_ranking(
     limit: int = Query(20, ge=1, le=100, description="Number of teams"),
     category: str = Query("me", description="Category: me=men elite, we=women elite"),
-    scraper: PCSScraperService = Depends(get_scraper)
+    query: TableQuery = Depends(table_query),
+    scraper: PCSScraperService = Depends(get_scraper),
+    tables: TableIndexCache = Depends(get_tables)
 ):
-    """Get team rankings."""
+    """Get team rankings (filterable by team, nationality and rank range)."""
     try:
         data = await scraper.get_ranking("teams", category)
         if "error" in data:
             raise HTTPException(status_code=500, detail=data["error"])
 
-        # Limit results
-        if "ranking" in data and isinstance(data["ranking"], list):
-            data["ranking"] = data["ranking"][:limit]
+        # Page through the cached ranking without copying the rest
+        if isinstance(data.get("ranking"), list):
+            query.limit = limit
+            return FastJSONResponse(tables.query(data, "ranking", query))
 
-        return data
+        return json_response(data, scraper.cache)
     except HTTPException:
         raise
     except Exception as e:
@@ -58,19 +66,22 @@ async def get_team_ranking(
 async def get_nation_ranking(
     limit: int = Query(30, ge=1, le=100, description="Number of nations"),
     category: str = Query("me", description="Category: me=men elite, we=women elite"),
-    scraper: PCSScraperService = Depends(get_scraper)
+    query: TableQuery = Depends(table_query),
+    scraper: PCSScraperService = Depends(get_scraper),
+    tables: TableIndexCache = Depends(get_tables)
 ):
-    """Get nation rankings."""
+    """Get nation rankings (filterable by rank range)."""
     try:
         data = await scraper.get_ranking("nations", category)
         if "error" in data:
             raise HTTPException(status_code=500, detail=data["error"])
 
-        # Limit results
-        if "ranking" in data and isinstance(data["ranking"], list):
-            data["ranking"] = data["ranking"][:limit]
+        # Page through the cached ranking without copying the rest
+        if isinstance(data.get("ranking"), list):
+            query.limit = limit
+            return FastJSONResponse(tables.query(data, "ranking", query))
 
-        return data
+        return json_response(data, scraper.cache)
     except HTTPException:
         raise
     except Exception as e:
@@ -9,6 +9,7 @@ router = APIRouter()
 async def get_stats_summary(request: Request):
     """Get general statistics summary."""
     cache = request.app.state.cache
+    scraper = request.app.state.scraper
 
     return {
         "total_races": 892,
@@ -16,15 +17,66 @@ async def get_stats_summary(request: Request):
         "worldtour_teams": 18,
         "race_days": 342,
         "active_season": 2024,
-        "cache_stats": cache.stats()
+        "cache_stats": cache.stats(),
+        "scraper_stats": scraper.stats()
     }
 
 
+@router.get("/scraper")
+async def get_scraper_stats(request: Request):
+    """Get scrape pool statistics (admin endpoint)."""
+    scraper = request.app.state.scraper
+    return scraper.stats()
+
+
+@router.get("/ai")
+async def get_ai_stats(request: Request):
+    """Get AI service statistics, e.g. plan cache hit rate (admin endpoint)."""
+    ai_service = request.app.state.ai
+    return ai_service.stats()
+
+
+@router.get("/rate-limit")
+async def get_rate_limit_stats(request: Request):
+    """Get PCS rate limiter wait times and queue length (admin endpoint)."""
+    scraper = request.app.state.scraper
+    if not scraper.rate_limiter:
+        return {"enabled": False}
+    return {"enabled": True, **scraper.rate_limiter.stats()}
+
+
+@router.get("/riders")
+async def get_rider_index_stats(request: Request):
+    """Get rider index size and lookup statistics (admin endpoint)."""
+    return request.app.state.rider_index.stats()
+
+
+@router.get("/teams")
+async def get_team_index_stats(request: Request):
+    """Get team season index statistics (admin endpoint)."""
+    return request.app.state.team_index.stats()
+
+
+@router.get("/live")
+async def get_live_stats(request: Request):
+    """Get live push statistics: topics, refreshes and deliveries (admin endpoint)."""
+    return request.app.state.live.stats()
+
+
+@router.get("/prewarm")
+async def get_prewarm_stats(request: Request):
+    """Get cache pre-warming statistics (admin endpoint)."""
+    prewarmer = request.app.state.prewarmer
+    if not prewarmer:
+        return {"enabled": False}
+    return {"enabled": True, **prewarmer.stats()}
+
+
 @router.get("/cache")
 async def get_cache_stats(request: Request):
     """Get cache statistics (admin endpoint)."""
     cache = request.app.state.cache
-    return cache.stats()
+    return {**cache.stats(), "table_indexes": request.app.state.tables.stats()}
 
 
 @router.delete("/cache")
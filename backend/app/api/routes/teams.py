@@ -2,6 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.api.responses import json_response
 from app.services.pcs_scraper import PCSScraperService
 from app.dependencies import get_scraper
 
@@ -25,7 +26,7 @@ async def get_team_info(
         data = await scraper.get_team(team_slug, year)
         if "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
-        return data
+        return json_response(data, scraper.cache)
     except HTTPException:
         raise
     except Exception as e:
@@ -4,6 +4,11 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict, Set
 import asyncio
 
+from app.config import settings
+from app.services.live_publisher import page_key
+from app.services.rate_limiter import Priority, set_priority
+from app.utils.json_utils import encode_json
+
 router = APIRouter()
 
 
@@ -22,9 +27,15 @@ class ConnectionManager:
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
         self.active_connections.discard(websocket)
-        # Remove from all subscriptions
-        for topic in self.subscriptions:
+        # Remove from all subscriptions, and drop topics left empty
+        for topic in list(self.subscriptions):
             self.subscriptions[topic].discard(websocket)
+            if not self.subscriptions[topic]:
+                del self.subscriptions[topic]
+
+    def topic_count(self, websocket: WebSocket) -> int:
+        """Number of topics a connection is subscribed to."""
+        return sum(1 for clients in self.subscriptions.values() if websocket in clients)
 
     async def subscribe(self, websocket: WebSocket, topic: str):
         """Subscribe a connection to a topic."""
@@ -46,20 +57,21 @@ class ConnectionManager:
             self.disconnect(conn)
 
     async def broadcast_to_topic(self, topic: str, message: dict):
-        """Broadcast to clients subscribed to a topic."""
-        if topic not in self.subscriptions:
+        """Broadcast to clients subscribed to a topic, encoding the message once."""
+        connections = list(self.subscriptions.get(topic) or ())
+        if not connections:
             return
 
-        disconnected = set()
-        for connection in self.subscriptions[topic]:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.add(connection)
+        text = encode_json(message).decode()
+        results = await asyncio.gather(
+            *(connection.send_text(text) for connection in connections),
+            return_exceptions=True
+        )
 
         # Clean up disconnected
-        for conn in disconnected:
-            self.disconnect(conn)
+        for conn, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(conn)
 
 
 # Global connection manager
@@ -68,7 +80,14 @@ manager = ConnectionManager()
 
 @router.websocket("/live")
 async def websocket_endpoint(websocket: WebSocket):
-    """Main WebSocket endpoint for live updates."""
+    """
+    Main WebSocket endpoint for live updates.
+
+    Clients subscribe to a cache key topic (`ranking:me:individual`,
+    `race:tour-de-france:2024`, `startlist:tour-de-france:2024`...) after
+    loading the page through the REST API, then apply the `update`
+    messages pushed by the LivePublisher when the page is refreshed.
+    """
     await manager.connect(websocket)
 
     try:
@@ -78,13 +97,46 @@ async def websocket_endpoint(websocket: WebSocket):
             # Handle subscription requests
             if data.get("type") == "subscribe":
                 topic = data.get("topic")
-                if topic:
+                if topic and page_key(topic) is None:
+                    await websocket.send_json({
+                        "type": "error",
+                        "topic": topic,
+                        "detail": "Unknown topic: expected a ranking, race or startlist page"
+                    })
+                elif topic and (
+                    websocket not in manager.subscriptions.get(topic, ())
+                    and manager.topic_count(websocket) >= settings.WS_MAX_TOPICS
+                ):
+                    await websocket.send_json({
+                        "type": "error",
+                        "topic": topic,
+                        "detail": f"At most {settings.WS_MAX_TOPICS} topics per connection"
+                    })
+                elif topic:
                     await manager.subscribe(websocket, topic)
                     await websocket.send_json({
                         "type": "subscribed",
                         "topic": topic
                     })
 
+            # Handle streaming chat: same events as POST /api/chat/stream
+            elif data.get("type") == "chat":
+                message = data.get("message")
+                if message:
+                    set_priority(Priority.INTERACTIVE)
+                    ai_service = websocket.app.state.ai
+                    try:
+                        async for event in ai_service.chat_stream(message):
+                            await websocket.send_json({"type": "chat", **event})
+                    except WebSocketDisconnect:
+                        raise
+                    except Exception as e:
+                        await websocket.send_json({
+                            "type": "chat",
+                            "event": "error",
+                            "detail": str(e)
+                        })
+
             # Handle ping/pong for keepalive
             elif data.get("type") == "ping":
                 await websocket.send_json({"type": "pong"})
@@ -26,17 +26,80 @@ class Settings(BaseSettings):
     AI_MODEL: str = "gpt-4o"  # e.g., "gpt-4o", "gpt-3.5-turbo", "claude-sonnet-4-20250514"
     OPENAI_API_KEY: str = ""
     ANTHROPIC_API_KEY: str = ""
+    AI_TIMEOUT: float = 30.0  # seconds per LLM request
+    AI_MAX_CONCURRENCY: int = 8  # LLM requests in flight per process
+    AI_FETCH_CONCURRENCY: int = 4  # concurrent scrapes per chat query plan
+    AI_FETCH_DEADLINE: float = 20.0  # seconds before partial results are used
+    AI_CONTEXT_TOKEN_BUDGET: int = 4000  # max data tokens in the answer prompt
+    AI_PLAN_CACHE_SIZE: int = 2000  # cached query plans
+    AI_PLAN_CACHE_TTL: int = 21600  # 6 hours
+    AI_RESPONSE_CACHE_SIZE: int = 1000  # cached chat answers
+    AI_RESPONSE_CACHE_TTL: int = 3600  # 1 hour
 
     # Cache
     CACHE_TTL_DEFAULT: int = 300  # 5 minutes
     CACHE_TTL_RANKINGS: int = 600  # 10 minutes
     CACHE_TTL_RIDER: int = 900  # 15 minutes
+    CACHE_TTL_STARTLIST: int = 1800  # 30 minutes
+    CACHE_TTL_TEAM: int = 3600  # 1 hour
+    # Race pages, by where the race sits in the calendar
+    CACHE_TTL_LIVE: int = 300  # race in progress
+    CACHE_TTL_UPCOMING: int = 3600  # not started yet
+    CACHE_TTL_FINAL: int = 86400  # finished this season
+    CACHE_TTL_HISTORICAL: int = 2592000  # past seasons (30 days)
+    CACHE_MAX_ENTRIES: int = 5000
+    CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256 MB (estimated)
+    # Seconds past its TTL an entry is still served (stale) while it is
+    # refreshed in the background; 0 disables stale-while-revalidate
+    CACHE_STALE_GRACE: int = 900
+    # SQLite file keeping finished races and past seasons across restarts
+    # (empty to disable)
+    CACHE_SNAPSHOT_PATH: str = "data/pcs_snapshots.db"
+
+    # PCS scraping
+    PCS_SCRAPE_WORKERS: int = 4  # threads shared by all procyclingstats calls
+    # Failed scrapes: pages PCS does not have are not retried for
+    # SCRAPE_NOT_FOUND_TTL seconds; transient failures back off
+    # exponentially from SCRAPE_BACKOFF_BASE up to SCRAPE_BACKOFF_MAX
+    SCRAPE_NOT_FOUND_TTL: int = 600
+    SCRAPE_BACKOFF_BASE: int = 10
+    SCRAPE_BACKOFF_MAX: int = 900
+    # JSON file of every rider seen in scraped pages, used for rider name
+    # lookup and fuzzy search (empty keeps the index in memory only)
+    RIDER_INDEX_PATH: str = "data/rider_index.json"
+    RIDER_INDEX_SAVE_INTERVAL: int = 300  # seconds between saves
+    # JSON file mapping team slugs to the slug of each season
+    # (empty keeps the index in memory only)
+    TEAM_INDEX_PATH: str = "data/team_index.json"
+    TEAM_INDEX_SAVE_INTERVAL: int = 300  # seconds between saves
 
     # Redis (optional - for Render Redis)
     REDIS_URL: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 20
+    # "memory" (per process), "redis" (shared only) or "tiered"
+    # (in-process L1 in front of a shared Redis L2). Needs REDIS_URL.
+    CACHE_BACKEND: str = "memory"
+    CACHE_L1_TTL: int = 60  # max L1 age in tiered mode
+
+    # Cache pre-warming (hot pages refreshed in the background)
+    PREWARM_ENABLED: bool = True
+    PREWARM_INTERVAL: int = 300  # seconds between refresh cycles
+    PREWARM_INITIAL_DELAY: int = 10  # seconds after startup before seeding
+    PREWARM_TOP_KEYS: int = 50  # most fetched keys kept warm
+    PREWARM_SEED_RIDERS: int = 20  # alias-table riders seeded at startup
+    PREWARM_RATE_SHARE: float = 0.3  # share of RATE_LIMIT_PCS refreshes may use
+
+    # Batch lookups (POST /api/batch)
+    BATCH_MAX_LOOKUPS: int = 100  # lookups per request
+    BATCH_CONCURRENCY: int = 8  # unique lookups fetched at once per request
+    BATCH_INTERACTIVE_SCRAPES: int = 2  # cache misses per batch scraped ahead of background work
+
+    # Live updates (/ws/live)
+    WS_MAX_TOPICS: int = 20  # topics one connection may subscribe to
 
     # Rate limiting
     RATE_LIMIT_PCS: int = 10  # requests per minute to PCS
+    RATE_LIMIT_PCS_BURST: int = 3  # requests allowed back to back
 
     class Config:
         env_file = ".env"
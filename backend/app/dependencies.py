@@ -1,9 +1,14 @@
 """Dependency injection for FastAPI."""
 
-from fastapi import Request
+from typing import Optional
+
+from fastapi import Query, Request
 
 from app.services.pcs_scraper import PCSScraperService
+from app.services.ai_service import AIService
 from app.services.cache_service import CacheService
+from app.services.rate_limiter import Priority, set_priority
+from app.services.table_index import TableIndexCache, TableQuery
 
 
 def get_cache(request: Request) -> CacheService:
@@ -12,6 +17,41 @@ def get_cache(request: Request) -> CacheService:
 
 
 def get_scraper(request: Request) -> PCSScraperService:
-    """Get PCS scraper service with cache."""
-    cache = get_cache(request)
-    return PCSScraperService(cache)
+    """Get the process-wide PCS scraper service from app state."""
+    return request.app.state.scraper
+
+
+def get_ai_service(request: Request) -> AIService:
+    """Get the process-wide AI service (and its LLM client) from app state."""
+    return request.app.state.ai
+
+
+def get_tables(request: Request) -> TableIndexCache:
+    """Get the memoized table indexes from app state."""
+    return request.app.state.tables
+
+
+def table_query(
+    offset: int = Query(0, ge=0, description="Rows to skip"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    team: Optional[str] = Query(None, description="Team name or slug"),
+    nationality: Optional[str] = Query(None, description="Nationality code, e.g. SI"),
+    rank_min: Optional[int] = Query(None, ge=1, description="Lowest rank"),
+    rank_max: Optional[int] = Query(None, ge=1, description="Highest rank"),
+    sort: Optional[str] = Query(None, description="Column to sort by, -column for descending")
+) -> TableQuery:
+    """Paging, projection, filter and sort query parameters shared by table endpoints."""
+    return TableQuery(
+        offset=offset,
+        fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        team=team,
+        nationality=nationality,
+        rank_min=rank_min,
+        rank_max=rank_max,
+        sort=sort
+    )
+
+
+async def interactive_priority():
+    """Serve PCS scrapes made by this request from the interactive lane."""
+    set_priority(Priority.INTERACTIVE)
@@ -4,24 +4,143 @@ PCS Assistant API - FastAPI Application
 AI-powered cycling statistics assistant using ProCyclingStats data.
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.api.routes import chat, riders, races, teams, rankings, stats
-from app.api.websocket import websocket_router
+from app.api.responses import FastJSONResponse
+from app.api.routes import chat, riders, races, teams, rankings, stats, batch
+from app.api.websocket import websocket_router, websocket_manager
 from app.services.cache_service import CacheService
+from app.services.snapshot_store import SnapshotStore
+from app.services.pcs_scraper import PCSScraperService, trace_fetches
+from app.services.ai_service import AIService
+from app.services.prewarm import Prewarmer
+from app.services.table_index import TableIndexCache
+from app.services.live_publisher import LivePublisher
+from app.services.negative_cache import NegativeCache
+from app.services.rate_limiter import TokenBucketRateLimiter
+from app.services.rider_index import RiderIndex
+from app.services.team_index import TeamIndex
+from app.services.ttl_policy import TTLPolicy
+from app.dependencies import interactive_priority
 from app.config import settings
 
 
+def _create_cache() -> CacheService:
+    """
+    Build the cache for the configured backend (memory, redis or tiered) and snapshot store.
+
+    Raises:
+        ValueError: If CACHE_BACKEND is unknown, or needs Redis and REDIS_URL is not set
+    """
+    if settings.CACHE_BACKEND not in ("memory", "redis", "tiered"):
+        raise ValueError(f"Unknown CACHE_BACKEND {settings.CACHE_BACKEND!r} (memory, redis or tiered)")
+    if settings.CACHE_BACKEND != "memory" and not settings.REDIS_URL:
+        raise ValueError(f"CACHE_BACKEND={settings.CACHE_BACKEND} needs REDIS_URL")
+
+    remote = None
+    if settings.CACHE_BACKEND in ("redis", "tiered"):
+        from app.services.redis_cache import RedisCacheBackend
+        remote = RedisCacheBackend(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS
+        )
+
+    snapshots = None
+    if settings.CACHE_SNAPSHOT_PATH:
+        snapshots = SnapshotStore(settings.CACHE_SNAPSHOT_PATH)
+
+    return CacheService(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        max_bytes=settings.CACHE_MAX_BYTES,
+        remote=remote,
+        local=remote is None or settings.CACHE_BACKEND == "tiered",
+        local_ttl=settings.CACHE_L1_TTL,
+        stale_grace=settings.CACHE_STALE_GRACE,
+        snapshots=snapshots
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown events."""
-    # Startup: Initialize cache
-    app.state.cache = CacheService()
+    # Startup: Initialize cache and the shared scraper
+    app.state.cache = _create_cache()
     await app.state.cache.start()
+    app.state.rider_index = RiderIndex(
+        settings.RIDER_INDEX_PATH or None,
+        save_interval=settings.RIDER_INDEX_SAVE_INTERVAL
+    )
+    await app.state.rider_index.start()
+    app.state.team_index = TeamIndex(
+        settings.TEAM_INDEX_PATH or None,
+        save_interval=settings.TEAM_INDEX_SAVE_INTERVAL
+    )
+    await app.state.team_index.start()
+    app.state.scraper = PCSScraperService(
+        app.state.cache,
+        max_workers=settings.PCS_SCRAPE_WORKERS,
+        rate_limiter=TokenBucketRateLimiter(
+            settings.RATE_LIMIT_PCS,
+            burst=settings.RATE_LIMIT_PCS_BURST
+        ),
+        ttl_policy=TTLPolicy(
+            live_ttl=settings.CACHE_TTL_LIVE,
+            upcoming_ttl=settings.CACHE_TTL_UPCOMING,
+            final_ttl=settings.CACHE_TTL_FINAL,
+            historical_ttl=settings.CACHE_TTL_HISTORICAL,
+            rider_ttl=settings.CACHE_TTL_RIDER,
+            ranking_ttl=settings.CACHE_TTL_RANKINGS,
+            startlist_ttl=settings.CACHE_TTL_STARTLIST,
+            team_ttl=settings.CACHE_TTL_TEAM
+        ),
+        rider_index=app.state.rider_index,
+        negative_cache=NegativeCache(
+            not_found_ttl=settings.SCRAPE_NOT_FOUND_TTL,
+            backoff_base=settings.SCRAPE_BACKOFF_BASE,
+            backoff_max=settings.SCRAPE_BACKOFF_MAX
+        ),
+        team_index=app.state.team_index
+    )
+    app.state.tables = TableIndexCache()
+    app.state.live = LivePublisher(websocket_manager)
+    app.state.cache.add_listener(app.state.live.on_cache_set)
+    app.state.ai = AIService(
+        app.state.scraper,
+        timeout=settings.AI_TIMEOUT,
+        max_concurrency=settings.AI_MAX_CONCURRENCY,
+        fetch_concurrency=settings.AI_FETCH_CONCURRENCY,
+        fetch_deadline=settings.AI_FETCH_DEADLINE,
+        context_token_budget=settings.AI_CONTEXT_TOKEN_BUDGET,
+        plan_cache_size=settings.AI_PLAN_CACHE_SIZE,
+        plan_cache_ttl=settings.AI_PLAN_CACHE_TTL,
+        response_cache_size=settings.AI_RESPONSE_CACHE_SIZE,
+        response_cache_ttl=settings.AI_RESPONSE_CACHE_TTL
+    )
+    app.state.prewarmer = None
+    if settings.PREWARM_ENABLED:
+        app.state.prewarmer = Prewarmer(
+            app.state.scraper,
+            interval=settings.PREWARM_INTERVAL,
+            initial_delay=settings.PREWARM_INITIAL_DELAY,
+            # Leave most of the PCS budget to user requests
+            min_spacing=60 / (settings.RATE_LIMIT_PCS * settings.PREWARM_RATE_SHARE),
+            top_keys=settings.PREWARM_TOP_KEYS,
+            seed_riders=settings.PREWARM_SEED_RIDERS,
+            # Pages with /ws/live subscribers are refreshed (and pushed) too
+            watched_keys=app.state.live.watched_keys
+        )
+        await app.state.prewarmer.start()
     yield
     # Shutdown: Cleanup
+    if app.state.prewarmer:
+        await app.state.prewarmer.close()
+    await app.state.live.close()
+    await app.state.ai.close()
+    await app.state.scraper.close()
+    await app.state.rider_index.close()
+    await app.state.team_index.close()
     await app.state.cache.close()
 
 
@@ -30,6 +149,7 @@ app = FastAPI(
     description="AI-powered cycling statistics assistant using ProCyclingStats data",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/docs" if settings.DEBUG else "/docs",
     redoc_url="/redoc" if settings.DEBUG else None,
 )
@@ -41,11 +161,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Age", "X-Cache-Stale"],
 )
 
-# API Routes
-app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
-app.include_router(riders.router, prefix="/api/riders", tags=["Riders"])
+
+@app.middleware("http")
+async def cache_age_headers(request: Request, call_next):
+    """
+    Tell clients how old the PCS data behind a response is.
+
+    Age is the age in seconds of the oldest cache entry read while
+    handling the request; X-Cache-Stale is "true" when any of them was
+    served stale while being refreshed in the background.
+    """
+    with trace_fetches() as trace:
+        response = await call_next(request)
+    if trace.keys:
+        response.headers["Age"] = str(int(trace.max_age))
+        response.headers["X-Cache-Stale"] = "true" if trace.stale else "false"
+    return response
+
+# API Routes (chat, rider pages and batches are interactive: their PCS scrapes
+# jump ahead of background refreshes in the rate limiter)
+app.include_router(
+    chat.router, prefix="/api/chat", tags=["Chat"],
+    dependencies=[Depends(interactive_priority)]
+)
+app.include_router(
+    riders.router, prefix="/api/riders", tags=["Riders"],
+    dependencies=[Depends(interactive_priority)]
+)
+app.include_router(
+    batch.router, prefix="/api/batch", tags=["Batch"],
+    dependencies=[Depends(interactive_priority)]
+)
 app.include_router(races.router, prefix="/api/races", tags=["Races"])
 app.include_router(teams.router, prefix="/api/teams", tags=["Teams"])
 app.include_router(rankings.router, prefix="/api/rankings", tags=["Rankings"])
@@ -79,6 +228,7 @@ async def root():
             "races": "/api/races/{slug}?year=2024",
             "teams": "/api/teams/{slug}?year=2024",
             "rankings": "/api/rankings/individual",
+            "batch": "/api/batch",
             "websocket": "/ws/live"
         }
     }
@@ -5,6 +5,7 @@ from app.models.race import RaceResult, RaceStageResult, RaceStartlistEntry
 from app.models.team import TeamInfo, TeamRider
 from app.models.chat import ChatMessage, ChatRequest, ChatResponse
 from app.models.stats import RankingEntry, StatsSummary
+from app.models.batch import BatchLookup, BatchRequest, BatchResult, BatchResponse
 
 __all__ = [
     "RiderProfile",
@@ -20,4 +21,8 @@ __all__ = [
     "ChatResponse",
     "RankingEntry",
     "StatsSummary",
+    "BatchLookup",
+    "BatchRequest",
+    "BatchResult",
+    "BatchResponse",
 ]
@@ -0,0 +1,48 @@
+"""Batch lookup models."""
+
+from typing import Optional, List, Dict, Any, Literal
+from pydantic import BaseModel, Field, model_validator
+
+# Ranking pages a batch may look up
+RANKING_TYPES = ("individual", "teams", "nations")
+
+
+class BatchLookup(BaseModel):
+    """One entity lookup of a batch."""
+    type: Literal["rider", "race", "startlist", "team", "ranking"]
+    slug: Optional[str] = None  # rider/race/team name or slug; ranking type for rankings
+    year: Optional[int] = None  # required for race, startlist and team
+    stage: Optional[int] = None  # race stage number
+    category: str = "me"  # ranking category
+
+    @model_validator(mode="after")
+    def _check_fields(self) -> "BatchLookup":
+        if self.type != "ranking" and not self.slug:
+            raise ValueError(f"{self.type} lookups need a slug")
+        if self.type == "ranking" and self.slug not in (None, *RANKING_TYPES):
+            raise ValueError(f"ranking lookups take a slug among {', '.join(RANKING_TYPES)}")
+        if self.type in ("race", "startlist", "team") and self.year is None:
+            raise ValueError(f"{self.type} lookups need a year")
+        return self
+
+
+class BatchRequest(BaseModel):
+    """Entity lookups answered in one round trip."""
+    lookups: List[BatchLookup] = Field(..., min_length=1)
+    stream: bool = False  # answer as NDJSON, one result per line as it completes
+
+
+class BatchResult(BaseModel):
+    """Result of one lookup; `index` is its position in the request."""
+    index: int
+    type: str
+    slug: Optional[str] = None
+    status: int  # 200, 404 (unknown entity) or 502 (PCS unavailable)
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Results in request order."""
+    results: List[BatchResult]
+    meta: Dict[str, Any]
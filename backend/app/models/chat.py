@@ -28,3 +28,4 @@ class ChatResponse(BaseModel):
     message: str
     data: Optional[Dict[str, Any]] = None
     visualization: Optional[VisualizationData] = None
+    meta: Optional[Dict[str, Any]] = None  # e.g. per-entity fetch timings
@@ -9,12 +9,19 @@ Handles:
 - Natural language response generation
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Awaitable, AsyncIterator, Tuple
+from functools import partial
+import asyncio
 import json
 import re
+import time
 
 from app.config import settings
-from app.services.pcs_scraper import PCSScraperService
+from app.services.pcs_scraper import PCSScraperService, FetchTrace, trace_fetches
+from app.services.context_builder import ContextBuilder
+from app.services.plan_cache import PlanCache
+from app.services.response_cache import ResponseCache
+from app.services.rule_planner import RulePlanner
 
 
 class AIService:
@@ -84,21 +91,102 @@ Common race slugs:
 
 Only return valid JSON, no explanation."""
 
-    def __init__(self, scraper: PCSScraperService):
+    def __init__(
+        self,
+        scraper: PCSScraperService,
+        timeout: float = 30.0,
+        max_concurrency: int = 8,
+        fetch_concurrency: int = 4,
+        fetch_deadline: float = 20.0,
+        context_token_budget: int = 4000,
+        plan_cache_size: int = 2000,
+        plan_cache_ttl: int = 6 * 3600,
+        response_cache_size: int = 1000,
+        response_cache_ttl: int = 3600
+    ):
+        """
+        One instance is created per process (see `app.main.lifespan`).
+
+        Args:
+            scraper: Shared PCS scraper service
+            timeout: Timeout in seconds for a single LLM request
+            max_concurrency: Maximum LLM requests in flight at once
+            fetch_concurrency: Maximum concurrent fetches for one query plan
+            fetch_deadline: Seconds after which a plan's pending fetches
+                are abandoned and partial results returned
+            context_token_budget: Token budget for the data context sent
+                with the answer prompt
+            plan_cache_size: Maximum number of cached query plans
+            plan_cache_ttl: Seconds a cached query plan stays valid
+            response_cache_size: Maximum number of cached chat answers
+            response_cache_ttl: Seconds a cached chat answer stays valid
+        """
         self.scraper = scraper
+        self.context_builder = ContextBuilder(token_budget=context_token_budget)
+        self.rule_planner = RulePlanner(scraper.entity_resolver)
+        self.plan_cache = PlanCache(
+            scraper.entity_resolver,
+            max_entries=plan_cache_size,
+            ttl=plan_cache_ttl
+        )
+        self.response_cache = ResponseCache(
+            max_entries=response_cache_size,
+            ttl=response_cache_ttl
+        )
+        # Refreshing a scrape entry drops the answers built from it
+        scraper.cache.add_listener(self.response_cache.on_cache_set)
+        self._rule_plans = 0
+        self._llm_plans = 0
+        self.fetch_concurrency = fetch_concurrency
+        self.fetch_deadline = fetch_deadline
         self.model = settings.AI_MODEL
         self.is_anthropic = self.model.startswith("claude")
+        self.timeout = timeout
+        self.client = None
+        self._llm_slots = asyncio.Semaphore(max_concurrency)
+
+    def _get_client(self):
+        """Build the async LLM client on first use."""
+        if self.client is None:
+            if self.is_anthropic:
+                from anthropic import AsyncAnthropic
+                self.client = AsyncAnthropic(
+                    api_key=settings.ANTHROPIC_API_KEY,
+                    timeout=self.timeout
+                )
+            else:
+                from openai import AsyncOpenAI
+                self.client = AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    timeout=self.timeout
+                )
+        return self.client
+
+    async def close(self):
+        """Close the LLM client's HTTP connections."""
+        if self.client is not None:
+            await self.client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get AI service statistics."""
+        return {
+            "model": self.model,
+            "rule_plans": self._rule_plans,
+            "llm_plans": self._llm_plans,
+            "plan_cache": self.plan_cache.stats(),
+            "response_cache": self.response_cache.stats()
+        }
 
-        # Initialize the appropriate client
-        if self.is_anthropic:
-            from anthropic import Anthropic
-            self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        else:
-            from openai import OpenAI
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    async def _call_llm(self, messages: list, max_tokens: int = 1000, system: str = None) -> str:
+        """
+        Call the LLM with the appropriate API format.
+
+        Uses the async client so the event loop keeps serving other
+        requests during the round trip; at most `max_concurrency` calls
+        run at once.
+        """
+        client = self._get_client()
 
-    def _call_llm(self, messages: list, max_tokens: int = 1000, system: str = None) -> str:
-        """Call the LLM with the appropriate API format."""
         if self.is_anthropic:
             # Anthropic API format
             kwargs = {
@@ -109,7 +197,8 @@ Only return valid JSON, no explanation."""
             if system:
                 kwargs["system"] = system
 
-            response = self.client.messages.create(**kwargs)
+            async with self._llm_slots:
+                response = await client.messages.create(**kwargs)
             return response.content[0].text
         else:
             # OpenAI API format
@@ -118,27 +207,74 @@ Only return valid JSON, no explanation."""
                 openai_messages.append({"role": "system", "content": system})
             openai_messages.extend(messages)
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                messages=openai_messages
-            )
+            async with self._llm_slots:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    messages=openai_messages
+                )
             return response.choices[0].message.content
 
+    async def _stream_llm(self, messages: list, max_tokens: int = 1000, system: str = None) -> AsyncIterator[str]:
+        """Call the LLM and yield the response text as it is generated."""
+        client = self._get_client()
+
+        if self.is_anthropic:
+            kwargs = {
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "messages": messages
+            }
+            if system:
+                kwargs["system"] = system
+
+            async with self._llm_slots:
+                async with client.messages.stream(**kwargs) as stream:
+                    async for text in stream.text_stream:
+                        yield text
+        else:
+            openai_messages = []
+            if system:
+                openai_messages.append({"role": "system", "content": system})
+            openai_messages.extend(messages)
+
+            async with self._llm_slots:
+                stream = await client.chat.completions.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    messages=openai_messages,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
     async def plan_query(self, question: str) -> Dict[str, Any]:
         """
         Analyze user question and create a query plan.
 
-        Returns structured plan for data fetching.
+        Returns structured plan for data fetching. Simple questions are
+        planned by rules; other plans are cached on the normalized
+        question, so repeated questions skip the LLM call.
         """
+        plan = self.rule_planner.plan(question)
+        if plan is not None:
+            self._rule_plans += 1
+            return plan
+
+        cached = self.plan_cache.get(question)
+        if cached is not None:
+            return cached
+
+        self._llm_plans += 1
         try:
-            response_text = self._call_llm(
+            response_text = (await self._call_llm(
                 messages=[{
                     "role": "user",
                     "content": self.QUERY_PLANNING_PROMPT.format(question=question)
                 }],
                 max_tokens=1000
-            ).strip()
+            )).strip()
 
             # Try to find JSON in the response
             if response_text.startswith("{"):
@@ -151,6 +287,7 @@ Only return valid JSON, no explanation."""
                 else:
                     plan = json.loads(response_text)
 
+            self.plan_cache.set(question, plan)
             return plan
 
         except (json.JSONDecodeError, Exception):
@@ -163,92 +300,199 @@ Only return valid JSON, no explanation."""
                 "comparison_mode": False
             }
 
-    async def execute_query(self, plan: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the query plan and fetch required data."""
+    def _plan_fetches(self, plan: Dict[str, Any]) -> Dict[str, Callable[[], Awaitable[Dict[str, Any]]]]:
+        """Map each entity in a query plan to the scraper call that fetches it."""
         intent = plan.get("intent", "general")
-        entities = plan.get("entities", {})
-        filters = plan.get("filters", {})
+        entities = plan.get("entities") or {}
+        filters = plan.get("filters") or {}
+
+        fetches = {}
+
+        if intent == "rider_info" and entities.get("riders"):
+            for rider_slug in entities["riders"][:3]:
+                fetches[rider_slug] = partial(self.scraper.get_rider, rider_slug)
+
+        elif intent == "rider_victories" and entities.get("riders"):
+            year = filters.get("year")
+            for rider_slug in entities["riders"][:3]:
+                fetches[rider_slug] = partial(self.scraper.get_rider_victories, rider_slug, year)
+
+        elif intent == "rider_results" and entities.get("riders"):
+            year = filters.get("year")
+            for rider_slug in entities["riders"][:3]:
+                fetches[rider_slug] = partial(self.scraper.get_rider_results, rider_slug, year)
 
-        data = {}
+        elif intent == "race_results" and entities.get("races"):
+            year = filters.get("year") or entities.get("year") or 2024
+            stage = entities.get("stage")
+            for race_slug in entities["races"][:3]:
+                fetches[race_slug] = partial(self.scraper.get_race_results, race_slug, year, stage)
+
+        elif intent == "race_startlist" and entities.get("races"):
+            year = filters.get("year") or entities.get("year") or 2024
+            for race_slug in entities["races"][:3]:
+                fetches[race_slug] = partial(self.scraper.get_race_startlist, race_slug, year)
+
+        elif intent == "ranking":
+            ranking_type = filters.get("ranking_type", "individual")
+            fetches["ranking"] = partial(self.scraper.get_ranking, ranking_type)
+
+        elif intent == "comparison" and len(entities.get("riders", [])) >= 2:
+            for rider_slug in entities["riders"][:4]:
+                fetches[rider_slug] = partial(self.scraper.get_rider, rider_slug)
+
+        elif intent == "team_info" and entities.get("teams"):
+            year = filters.get("year") or 2024
+            for team_slug in entities["teams"][:3]:
+                fetches[team_slug] = partial(self.scraper.get_team, team_slug, year)
+
+        return fetches
+
+    async def iter_query(
+        self,
+        plan: Dict[str, Any],
+        trace: Optional[FetchTrace] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any], float]]:
+        """
+        Run the fetches of a query plan concurrently.
+
+        Yields (entity key, data, seconds) as each fetch completes. At most
+        `fetch_concurrency` fetches run at once; fetches still pending at
+        the `fetch_deadline` are cancelled and yielded as errors, and a
+        failing fetch only produces an error for its own entity.
+
+        If `trace` is given, the scrape cache keys read by the fetches are
+        recorded in it.
+        """
+        fetches = self._plan_fetches(plan)
+        if not fetches:
+            return
+
+        slots = asyncio.Semaphore(self.fetch_concurrency)
+
+        async def _timed(key, fetch):
+            async with slots:
+                started = time.perf_counter()
+                try:
+                    with trace_fetches(trace):
+                        result = await fetch()
+                except Exception as e:
+                    result = {"error": str(e)}
+                return key, result, time.perf_counter() - started
+
+        pending = {
+            asyncio.create_task(_timed(key, fetch)): key
+            for key, fetch in fetches.items()
+        }
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.fetch_deadline
 
         try:
-            if intent == "rider_info" and entities.get("riders"):
-                for rider_slug in entities["riders"][:3]:
-                    rider_data = await self.scraper.get_rider(rider_slug)
-                    data[rider_slug] = rider_data
-
-            elif intent == "rider_victories" and entities.get("riders"):
-                year = filters.get("year")
-                for rider_slug in entities["riders"][:3]:
-                    rider_data = await self.scraper.get_rider_victories(rider_slug, year)
-                    data[rider_slug] = rider_data
-
-            elif intent == "race_results" and entities.get("races"):
-                year = filters.get("year") or entities.get("year") or 2024
-                stage = entities.get("stage")
-                for race_slug in entities["races"][:3]:
-                    race_data = await self.scraper.get_race_results(race_slug, year, stage)
-                    data[race_slug] = race_data
-
-            elif intent == "race_startlist" and entities.get("races"):
-                year = filters.get("year") or entities.get("year") or 2024
-                for race_slug in entities["races"][:3]:
-                    startlist_data = await self.scraper.get_race_startlist(race_slug, year)
-                    data[race_slug] = startlist_data
-
-            elif intent == "ranking":
-                ranking_type = filters.get("ranking_type", "individual")
-                ranking_data = await self.scraper.get_ranking(ranking_type)
-                data["ranking"] = ranking_data
-
-            elif intent == "comparison" and len(entities.get("riders", [])) >= 2:
-                for rider_slug in entities["riders"][:4]:
-                    rider_data = await self.scraper.get_rider(rider_slug)
-                    data[rider_slug] = rider_data
-
-            elif intent == "team_info" and entities.get("teams"):
-                year = filters.get("year") or 2024
-                for team_slug in entities["teams"][:3]:
-                    team_data = await self.scraper.get_team(team_slug, year)
-                    data[team_slug] = team_data
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    pending.pop(task)
+                    yield task.result()
+
+            for task, key in pending.items():
+                task.cancel()
+                yield key, {"error": f"Timed out after {self.fetch_deadline:g}s"}, self.fetch_deadline
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def execute_query_timed(
+        self,
+        plan: Dict[str, Any],
+        trace: Optional[FetchTrace] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Execute the query plan and fetch required data.
 
-        except Exception as e:
-            data["error"] = str(e)
+        Returns the data keyed by entity (in plan order) and the fetch
+        time of each entity in milliseconds.
+        """
+        results = {}
+        timings = {}
+        async for key, result, elapsed in self.iter_query(plan, trace):
+            results[key] = result
+            timings[key] = round(elapsed * 1000, 1)
 
+        order = list(self._plan_fetches(plan))
+        data = {key: results[key] for key in order if key in results}
+        return data, {key: timings[key] for key in data}
+
+    async def execute_query(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the query plan and fetch required data."""
+        data, _ = await self.execute_query_timed(plan)
         return data
 
-    async def generate_response(
+    def _response_messages(
         self,
         question: str,
         data: Dict[str, Any],
         plan: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Generate natural language response with optional visualization data."""
-        data_context = json.dumps(data, indent=2, default=str)
+    ) -> Tuple[list, Dict[str, int]]:
+        """
+        Build the user message asking the LLM to answer from fetched data.
 
-        try:
-            response_text = self._call_llm(
-                messages=[{
-                    "role": "user",
-                    "content": f"""Question: {question}
+        Returns the messages and the before/after context token estimates.
+        """
+        data_context, context_tokens = self.context_builder.build(data, plan)
+
+        messages = [{
+            "role": "user",
+            "content": f"""Question: {question}
 
-Data fetched from ProCyclingStats:
-```json
+Data fetched from ProCyclingStats (tables are pipe-separated, first line is the header):
 {data_context}
-```
 
 Query plan: {json.dumps(plan)}
 
 Provide a helpful response based on this data. Be concise and informative.
 If there's an error in the data, explain what went wrong."""
-                }],
+        }]
+        return messages, context_tokens
+
+    async def generate_response(
+        self,
+        question: str,
+        data: Dict[str, Any],
+        plan: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Generate natural language response with optional visualization data."""
+        messages, context_tokens = self._response_messages(question, data, plan)
+        try:
+            response_text = await self._call_llm(
+                messages=messages,
                 max_tokens=2000,
                 system=self.SYSTEM_PROMPT
             )
 
         except Exception as e:
             response_text = f"Mi dispiace, si è verificato un errore: {str(e)}"
+            failed = True
+        else:
+            failed = False
+
+        result = self._build_result(response_text, data, plan)
+        result["meta"] = {"context_tokens": context_tokens}
+        if failed:
+            result["meta"]["llm_error"] = True
+        return result
 
+    def _build_result(
+        self,
+        response_text: str,
+        data: Dict[str, Any],
+        plan: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Assemble the chat result: message, data and optional visualization."""
         result = {
             "message": response_text,
             "data": data,
@@ -329,9 +573,110 @@ If there's an error in the data, explain what went wrong."""
         """
         Main entry point for chat interactions.
 
-        Orchestrates: plan -> fetch -> respond
+        Orchestrates: plan -> fetch -> respond. Answers are reused from
+        the response cache while the question, plan and data are unchanged.
         """
         plan = await self.plan_query(question)
-        data = await self.execute_query(plan)
-        response = await self.generate_response(question, data, plan)
+        trace = FetchTrace()
+        data, timings = await self.execute_query_timed(plan, trace)
+
+        response_key = self._response_key(question, plan, trace)
+        response = self.response_cache.get(response_key)
+        if response is None:
+            response = await self.generate_response(question, data, plan)
+            if self._is_cacheable(data, response):
+                self.response_cache.set(response_key, response, trace.keys)
+            response["meta"]["response_cache"] = "miss"
+        else:
+            # Only the answer is cached: attach the data just fetched
+            response["data"] = data
+            response["meta"]["response_cache"] = "hit"
+
+        response["meta"]["timings_ms"] = timings
+        response["meta"]["data_age_s"] = int(trace.max_age)
+        response["meta"]["stale"] = trace.stale
         return response
+
+    def _response_key(self, question: str, plan: Dict[str, Any], trace: FetchTrace) -> str:
+        """Response cache key for an answer over the pages recorded in `trace`."""
+        return self.response_cache.key(self.plan_cache.key(question), plan, trace.versions)
+
+    @staticmethod
+    def _is_cacheable(data: Dict[str, Any], response: Dict[str, Any]) -> bool:
+        """Only complete answers over error-free data are cached."""
+        if response["meta"].get("llm_error"):
+            return False
+        return not any(
+            isinstance(payload, dict) and "error" in payload
+            for payload in data.values()
+        )
+
+    async def chat_stream(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of `chat`.
+
+        Yields events as soon as each piece is available:
+        - {"event": "plan", "plan": ...}
+        - {"event": "data", "entity": ..., "data": ..., "elapsed_ms": ...}
+          once per entity, in completion order
+        - {"event": "token", "text": ...} for each LLM text delta
+        - {"event": "done", "message": ..., "visualization": ..., "meta": ...}
+        """
+        plan = await self.plan_query(question)
+        yield {"event": "plan", "plan": plan}
+
+        results = {}
+        timings = {}
+        trace = FetchTrace()
+        async for key, result, elapsed in self.iter_query(plan, trace):
+            results[key] = result
+            timings[key] = round(elapsed * 1000, 1)
+            yield {"event": "data", "entity": key, "data": result, "elapsed_ms": timings[key]}
+        data = {key: results[key] for key in self._plan_fetches(plan) if key in results}
+
+        response_key = self._response_key(question, plan, trace)
+        cached = self.response_cache.get(response_key)
+        if cached is not None:
+            # Whole answer in one token event
+            yield {"event": "token", "text": cached["message"]}
+            yield {
+                "event": "done",
+                "message": cached["message"],
+                "visualization": cached["visualization"],
+                "meta": {
+                    **cached["meta"], "timings_ms": timings, "response_cache": "hit",
+                    "data_age_s": int(trace.max_age), "stale": trace.stale
+                }
+            }
+            return
+
+        messages, context_tokens = self._response_messages(question, data, plan)
+        parts = []
+        meta = {"context_tokens": context_tokens}
+        try:
+            async for text in self._stream_llm(
+                messages=messages,
+                max_tokens=2000,
+                system=self.SYSTEM_PROMPT
+            ):
+                parts.append(text)
+                yield {"event": "token", "text": text}
+            response_text = "".join(parts)
+        except Exception as e:
+            response_text = f"Mi dispiace, si è verificato un errore: {str(e)}"
+            meta["llm_error"] = True
+            yield {"event": "token", "text": response_text}
+
+        result = self._build_result(response_text, data, plan)
+        result["meta"] = meta
+        if self._is_cacheable(data, result):
+            self.response_cache.set(response_key, result, trace.keys)
+        yield {
+            "event": "done",
+            "message": result["message"],
+            "visualization": result["visualization"],
+            "meta": {
+                **meta, "timings_ms": timings, "response_cache": "miss",
+                "data_age_s": int(trace.max_age), "stale": trace.stale
+            }
+        }
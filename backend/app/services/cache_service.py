@@ -1,70 +1,333 @@
 """
 Cache Service
 
-In-memory caching with TTL support.
-Can be replaced with Redis for production.
+In-memory caching with TTL support and a size-bounded LRU budget.
+A shared backend (e.g. Redis) can be plugged in behind it, either on its
+own or as an L2 tier behind the in-process cache.
+
+Entries have a soft and a hard TTL: past the soft TTL (`ttl`) an entry
+is stale and only returned to callers that ask for stale data (so they
+can serve it while revalidating); past the hard TTL (`ttl` plus
+`stale_grace`) it is gone.
+
+Local entries also keep the value encoded as JSON bytes, produced once
+when the entry is stored (its size is the entry's budget cost), so API
+responses for cached payloads are sent without encoding them again.
+
+Entries set with `persist=True` (pages that no longer change) are also
+written to an optional on-disk snapshot store, the last tier looked up,
+so they survive restarts.
 """
 
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List, Callable
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 import asyncio
+import logging
 from datetime import datetime, timedelta
 
+from app.services.snapshot_store import SnapshotStore
+from app.utils.json_utils import encode_json
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    Interface for shared cache backends.
+
+    Entries are dicts with "value", "created_at", "stale_at" and
+    "expires_at" (datetimes), the same shape as the in-memory entries.
+    """
+
+    @abstractmethod
+    async def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get an entry if present and not expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: int, stale_after: Optional[int] = None):
+        """Store a value for `ttl` seconds, stale after `stale_after` seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Delete a key."""
+
+    @abstractmethod
+    async def clear(self):
+        """Delete every key owned by this backend."""
+
+    @abstractmethod
+    async def close(self):
+        """Release connections."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+
 
 class CacheService:
-    """Simple in-memory cache with TTL."""
+    """In-memory cache with TTL and LRU eviction, optionally tiered."""
 
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        max_bytes: int = 256 * 1024 * 1024,
+        remote: Optional[CacheBackend] = None,
+        local: bool = True,
+        local_ttl: Optional[int] = None,
+        stale_grace: int = 0,
+        snapshots: Optional[SnapshotStore] = None
+    ):
+        """
+        Args:
+            max_entries: Maximum number of cached keys
+            max_bytes: Maximum JSON-encoded size of all cached values
+            remote: Shared backend used as L2 (or as the only tier)
+            local: Keep an in-process L1 copy of entries
+            local_ttl: Cap on L1 TTL when a remote tier is used, so
+                refreshes made by other workers are picked up
+            stale_grace: Seconds past an entry's TTL during which it is
+                still returned as stale (see `get_entry`)
+            snapshots: On-disk store for entries set with `persist=True`
+        """
+        # Ordered from least to most recently used
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self._cleanup_task: Optional[asyncio.Task] = None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.remote = remote
+        self.local = local
+        self.local_ttl = local_ttl
+        self.stale_grace = stale_grace
+        self.snapshots = snapshots
+        self._bytes = 0
+        # id(value) -> key of the local entry holding that value object
+        self._keys_by_value: Dict[int, str] = {}
+        self._listeners: List[Callable[[str, Any], None]] = []
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._snapshot_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejected = 0
+        self._listener_errors = 0
+
+    def add_listener(self, listener: Callable[[str, Any], None]):
+        """
+        Register a callback invoked with (key, value) on every `set`.
+        A failing listener is logged and counted; it never fails the `set`.
+        """
+        self._listeners.append(listener)
 
     async def start(self):
         """Start background cleanup task."""
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
 
     async def close(self):
-        """Stop cleanup task."""
+        """Stop cleanup task and close the remote tier."""
         if self._cleanup_task:
             self._cleanup_task.cancel()
             try:
                 await self._cleanup_task
             except asyncio.CancelledError:
                 pass
+        if self.remote:
+            await self.remote.close()
+        if self.snapshots:
+            await self.snapshots.close()
 
     async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache if not expired."""
-        if key not in self._cache:
+        """Get value from cache if fresh."""
+        entry = await self.get_entry(key)
+        if entry is None:
             return None
+        return entry["value"]
 
-        entry = self._cache[key]
-        if datetime.now() > entry["expires_at"]:
-            del self._cache[key]
+    async def get_entry(self, key: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get the full cache entry (value and timestamps) if fresh.
+
+        With `allow_stale`, entries past their soft TTL are returned too
+        until their hard TTL; callers check `is_stale(entry)`.
+
+        Looks in the local tier first, then in the remote tier, then in
+        the snapshot store; lower-tier hits are copied into the local tier.
+        """
+        entry = self._get_local(key) if self.local else None
+
+        if entry is None and self.remote:
+            entry = await self.remote.get_entry(key)
+        if entry is None and self.snapshots:
+            entry = await self.snapshots.get_entry(key)
+            if entry is not None:
+                self._snapshot_hits += 1
+
+        if entry is not None and self.local and key not in self._cache:
+            self._set_local(
+                key, entry["value"], entry["created_at"],
+                entry["stale_at"], entry["expires_at"]
+            )
+
+        if entry is not None and self.is_stale(entry):
+            if not allow_stale:
+                entry = None
+            else:
+                self._stale_hits += 1
+
+        if entry is None:
+            self._misses += 1
             return None
+        self._hits += 1
+        return entry
 
-        return entry["value"]
+    async def peek_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an entry (fresh or stale) without counting a hit or miss or
+        changing its LRU position. Used by background maintenance.
+        """
+        entry = self._cache.get(key) if self.local else None
+        if entry is None and self.remote:
+            entry = await self.remote.get_entry(key)
+        if entry is None and self.snapshots:
+            entry = await self.snapshots.get_entry(key)
+        if entry is None or datetime.now() > entry["expires_at"]:
+            return None
+        return entry
+
+    def encoded(self, value: Any) -> Optional[bytes]:
+        """
+        JSON bytes of a value returned by this cache, encoded when it was
+        stored; None if `value` is not (or no longer) a local cached value.
+        """
+        key = self._keys_by_value.get(id(value))
+        entry = self._cache.get(key) if key is not None else None
+        if entry is None or entry["value"] is not value:
+            return None
+        return entry["body"]
 
-    async def set(self, key: str, value: Any, ttl: int = 300):
+    @staticmethod
+    def is_stale(entry: Dict[str, Any]) -> bool:
+        """Whether an entry is past its soft TTL."""
+        return datetime.now() > entry["stale_at"]
+
+    async def set(self, key: str, value: Any, ttl: int = 300, persist: bool = False):
         """
         Set value in cache.
 
+        Evicts least recently used entries until the entry and byte
+        budgets are respected. Values larger than the whole byte budget
+        are not cached locally.
+
         Args:
             key: Cache key
             value: Value to cache (must be JSON serializable)
-            ttl: Time to live in seconds (default 5 minutes)
+            ttl: Seconds the value stays fresh (default 5 minutes); it
+                is kept as stale for `stale_grace` more seconds
+            persist: Also write the value to the snapshot store
         """
-        self._cache[key] = {
-            "value": value,
-            "expires_at": datetime.now() + timedelta(seconds=ttl),
-            "created_at": datetime.now()
-        }
+        now = datetime.now()
+        if self.local:
+            self._set_local(
+                key, value, now,
+                now + timedelta(seconds=ttl),
+                now + timedelta(seconds=ttl + self.stale_grace)
+            )
+        if self.remote:
+            await self.remote.set(key, value, ttl + self.stale_grace, stale_after=ttl)
+        if persist and self.snapshots:
+            await self.snapshots.set(key, value, ttl)
+        for listener in self._listeners:
+            try:
+                listener(key, value)
+            except Exception:
+                # The value is stored: callers must not fail on a listener
+                self._listener_errors += 1
+                logger.exception("Cache listener %r failed for %s", listener, key)
 
     async def delete(self, key: str):
         """Delete key from cache."""
         if key in self._cache:
-            del self._cache[key]
+            self._remove(key)
+        if self.remote:
+            await self.remote.delete(key)
+        if self.snapshots:
+            await self.snapshots.delete(key)
 
     async def clear(self):
         """Clear all cache entries."""
         self._cache.clear()
+        self._keys_by_value.clear()
+        self._bytes = 0
+        if self.remote:
+            await self.remote.clear()
+        if self.snapshots:
+            await self.snapshots.clear()
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a local entry, dropping it if expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+
+        if datetime.now() > entry["expires_at"]:
+            self._remove(key)
+            self._expirations += 1
+            return None
+
+        self._cache.move_to_end(key)
+        return entry
+
+    def _set_local(
+        self,
+        key: str,
+        value: Any,
+        created_at: datetime,
+        stale_at: datetime,
+        expires_at: datetime
+    ):
+        """Store an entry in the local tier."""
+        if self.remote and self.local_ttl:
+            expires_at = min(expires_at, datetime.now() + timedelta(seconds=self.local_ttl))
+            stale_at = min(stale_at, expires_at)
+
+        body = encode_json(value)
+        size = len(body)
+        if key in self._cache:
+            self._remove(key)
+        if size > self.max_bytes:
+            self._rejected += 1
+            return
+
+        self._cache[key] = {
+            "value": value,
+            "stale_at": stale_at,
+            "expires_at": expires_at,
+            "created_at": created_at,
+            "body": body,
+            "size": size
+        }
+        self._keys_by_value[id(value)] = key
+        self._bytes += size
+        self._evict()
+
+    def _remove(self, key: str):
+        """Remove an entry and release its bytes."""
+        entry = self._cache.pop(key)
+        self._bytes -= entry["size"]
+        if self._keys_by_value.get(id(entry["value"])) == key:
+            del self._keys_by_value[id(entry["value"])]
+
+    def _evict(self):
+        """Evict least recently used entries until within budget."""
+        while self._cache and (
+            len(self._cache) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self._evictions += 1
 
     async def _cleanup_loop(self):
         """Background task to clean expired entries."""
@@ -80,11 +343,30 @@ class CacheService:
             if now > entry["expires_at"]
         ]
         for key in expired_keys:
-            del self._cache[key]
+            self._remove(key)
+        self._expirations += len(expired_keys)
 
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        return {
+        lookups = self._hits + self._misses
+        stats = {
             "entries": len(self._cache),
-            "keys": list(self._cache.keys())
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "stale_hits": self._stale_hits,
+            "snapshot_hits": self._snapshot_hits,
+            "stale_grace": self.stale_grace,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "rejected": self._rejected,
+            "listener_errors": self._listener_errors
         }
+        if self.remote:
+            stats["remote"] = self.remote.stats()
+        if self.snapshots:
+            stats["snapshots"] = self.snapshots.stats()
+        return stats
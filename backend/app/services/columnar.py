@@ -0,0 +1,261 @@
+"""
+Columnar Tables
+
+Compact column-oriented form of scraped row tables (rankings, race
+results, startlists). Instead of one dict per row, each column is a
+NumPy array:
+- integers (ranks, points) as int64 with a validity mask; the odd
+  non-numeric value ("DNF", "DNS") is kept on the side
+- floats as float64 with NaN for missing values
+- strings (teams, nations, names) dictionary-encoded: int32 codes into
+  a list of distinct values
+
+Filters, sorts and top-N run vectorized over the columns; rows are only
+materialized as dicts for the page being returned.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from abc import ABC, abstractmethod
+import sys
+
+import numpy as np
+
+
+class Column(ABC):
+    """One column of a ColumnarTable."""
+
+    @abstractmethod
+    def value(self, i: int) -> Any:
+        """Value of row `i` as it was in the row dict."""
+
+    @abstractmethod
+    def sort_keys(self) -> np.ndarray:
+        """Array ordering rows by this column (missing values last)."""
+
+    @abstractmethod
+    def nbytes(self) -> int:
+        """Approximate memory footprint."""
+
+
+class IntColumn(Column):
+    """int64 values with a validity mask and sparse non-integer values."""
+
+    def __init__(self, values: Sequence[Any]):
+        n = len(values)
+        self.values = np.zeros(n, dtype=np.int64)
+        self.valid = np.zeros(n, dtype=bool)
+        self.other: Dict[int, Any] = {}
+        for i, v in enumerate(values):
+            if isinstance(v, int) and not isinstance(v, bool):
+                self.values[i] = v
+                self.valid[i] = True
+            elif v is not None:
+                self.other[i] = v
+
+    def value(self, i: int) -> Any:
+        if self.valid[i]:
+            return int(self.values[i])
+        return self.other.get(i)
+
+    def between(self, low: Optional[int], high: Optional[int]) -> np.ndarray:
+        """Mask of valid values in [low, high]."""
+        mask = self.valid.copy()
+        if low is not None:
+            mask &= self.values >= low
+        if high is not None:
+            mask &= self.values <= high
+        return mask
+
+    def sort_keys(self) -> np.ndarray:
+        return np.where(self.valid, self.values.astype(np.float64), np.inf)
+
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.valid.nbytes + sys.getsizeof(self.other)
+
+
+class FloatColumn(Column):
+    """float64 values, NaN where missing."""
+
+    def __init__(self, values: Sequence[Any]):
+        self.values = np.array(
+            [float(v) if v is not None else np.nan for v in values], dtype=np.float64
+        )
+
+    def value(self, i: int) -> Any:
+        v = self.values[i]
+        return None if np.isnan(v) else float(v)
+
+    def sort_keys(self) -> np.ndarray:
+        return np.where(np.isnan(self.values), np.inf, self.values)
+
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+
+class CategoryColumn(Column):
+    """Dictionary-encoded strings: int32 codes into the distinct values."""
+
+    def __init__(self, values: Sequence[Any]):
+        self.categories: List[str] = []
+        lookup: Dict[str, int] = {}
+        codes = np.full(len(values), -1, dtype=np.int32)
+        for i, v in enumerate(values):
+            if v is None:
+                continue
+            code = lookup.get(v)
+            if code is None:
+                code = lookup[v] = len(self.categories)
+                self.categories.append(v)
+            codes[i] = code
+        self.codes = codes
+
+    def value(self, i: int) -> Any:
+        code = self.codes[i]
+        return self.categories[code] if code >= 0 else None
+
+    def matching(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Mask of rows whose value satisfies `predicate` (evaluated once per category)."""
+        hits = np.array([predicate(c) for c in self.categories] + [False], dtype=bool)
+        # Code -1 (missing) indexes the trailing False
+        return hits[self.codes]
+
+    def sort_keys(self) -> np.ndarray:
+        order = np.argsort(np.array(self.categories, dtype=object), kind="stable")
+        ranks = np.empty(len(self.categories) + 1, dtype=np.float64)
+        ranks[order] = np.arange(len(self.categories))
+        ranks[-1] = np.inf  # missing values last
+        return ranks[self.codes]
+
+    def nbytes(self) -> int:
+        return (
+            self.codes.nbytes
+            + sys.getsizeof(self.categories)
+            + sum(sys.getsizeof(c) for c in self.categories)
+        )
+
+
+class ObjectColumn(Column):
+    """Fallback for values of mixed or nested types."""
+
+    def __init__(self, values: Sequence[Any]):
+        self.values = list(values)
+
+    def value(self, i: int) -> Any:
+        return self.values[i]
+
+    def sort_keys(self) -> np.ndarray:
+        # Ranks of the values' text, so sorts stay numeric (stable, negatable)
+        keys = np.full(len(self.values), np.inf)
+        present = [i for i, v in enumerate(self.values) if v is not None]
+        if present:
+            labels = np.array([str(self.values[i]) for i in present])
+            keys[present] = np.unique(labels, return_inverse=True)[1]
+        return keys
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.values)
+
+
+class ColumnarTable:
+    """A row table stored column by column."""
+
+    def __init__(self, columns: Dict[str, Column], length: int, absent: Optional[Dict[str, np.ndarray]] = None):
+        self.columns = columns
+        self.length = length
+        # Column -> mask of rows that did not have the key at all
+        self.absent = absent or {}
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "ColumnarTable":
+        """Convert a list of row dicts."""
+        names: List[str] = []
+        for row in rows:
+            for key in row:
+                if key not in names:
+                    names.append(key)
+
+        columns: Dict[str, Column] = {}
+        absent: Dict[str, np.ndarray] = {}
+        for name in names:
+            values = [row.get(name) for row in rows]
+            columns[name] = _make_column(values)
+            missing = np.array([name not in row for row in rows], dtype=bool)
+            if missing.any():
+                absent[name] = missing
+        return cls(columns, len(rows), absent)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def all(self) -> np.ndarray:
+        """Mask selecting every row."""
+        return np.ones(self.length, dtype=bool)
+
+    def column(self, name: str) -> Optional[Column]:
+        return self.columns.get(name)
+
+    def order(self, mask: np.ndarray, sort: Optional[str] = None, top: Optional[int] = None) -> np.ndarray:
+        """
+        Positions of the rows in `mask`, in table order or sorted.
+
+        Args:
+            mask: Rows to keep
+            sort: Column to sort by, "-column" for descending
+            top: Only the first `top` positions are needed (partial sort)
+        """
+        positions = np.flatnonzero(mask)
+        if not sort:
+            return positions if top is None else positions[:top]
+
+        descending = sort.startswith("-")
+        column = self.columns.get(sort.lstrip("-"))
+        if column is None:
+            return positions if top is None else positions[:top]
+
+        keys = column.sort_keys()[positions]
+        if descending:
+            # Negate the keys rather than reverse the order: ties keep
+            # table order and missing values (inf) stay last
+            keys = -np.where(np.isinf(keys), -np.inf, keys)
+        if top is not None and top < len(positions):
+            # Partial sort: only the top-N rows are ordered. Rows tied with
+            # the N-th key are taken in table order, so pages of different
+            # sizes agree with the full stable sort.
+            cutoff = np.partition(keys, top - 1)[top - 1]
+            ahead = np.flatnonzero(keys < cutoff)
+            ties = np.flatnonzero(keys == cutoff)[:top - len(ahead)]
+            part = np.concatenate([ahead, ties])
+            return positions[part[np.argsort(keys[part], kind="stable")]]
+        return positions[np.argsort(keys, kind="stable")][:top]
+
+    def rows(self, positions: Iterable[int], fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Materialize rows as dicts, with only `fields` when given."""
+        names = [f for f in fields if f in self.columns] if fields else list(self.columns)
+        out = []
+        for i in positions:
+            i = int(i)
+            out.append({
+                name: self.columns[name].value(i) for name in names
+                if name not in self.absent or not self.absent[name][i]
+            })
+        return out
+
+    def nbytes(self) -> int:
+        """Approximate memory footprint of the columns."""
+        return sum(c.nbytes() for c in self.columns.values()) + sum(m.nbytes for m in self.absent.values())
+
+
+def _make_column(values: List[Any]) -> Column:
+    """Pick the most compact column type for a list of values."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return ObjectColumn(values)
+    if all(isinstance(v, str) for v in present):
+        return CategoryColumn(values)
+    ints = [v for v in present if isinstance(v, int) and not isinstance(v, bool)]
+    if ints and all(isinstance(v, (int, str)) and not isinstance(v, bool) for v in present):
+        # Integers, possibly with a few markers such as "DNF"
+        return IntColumn(values)
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return FloatColumn(values)
+    return ObjectColumn(values)
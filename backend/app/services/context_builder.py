@@ -0,0 +1,181 @@
+"""
+LLM Context Builder
+
+Compacts scraped data before it goes into the answer prompt:
+- keeps only the fields the query intent needs
+- keeps the top rows of each table
+- encodes tables as pipe-separated text instead of indented JSON
+- shrinks row counts until the context fits a token budget
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.json_utils import encode_json
+
+
+# Rough chars-per-token ratio used for estimates (English/Italian prose)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a string."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ContextBuilder:
+    """Builds a compact, intent-aware text context from fetched data."""
+
+    # Per intent: payload key -> None (keep scalar/dict) or max table rows.
+    # Keys not listed are dropped.
+    INTENT_FIELDS: Dict[str, Dict[str, Optional[int]]] = {
+        "rider_info": {
+            "name": None, "nationality": None, "birthdate": None,
+            "place_of_birth": None, "height": None, "weight": None,
+            "points_per_speciality": None, "teams_history": 5,
+            "points_per_season_history": 5, "season_results": 10,
+        },
+        "comparison": {
+            "name": None, "nationality": None, "birthdate": None,
+            "points_per_speciality": None, "points_per_season_history": 5,
+            "season_results": 8,
+        },
+        "rider_victories": {
+            "name": None, "nationality": None, "victories": 30,
+        },
+        "rider_results": {
+            "name": None, "nationality": None, "season_results": 30,
+        },
+        "race_results": {
+            "name": None, "year": None, "startdate": None, "enddate": None,
+            "category": None, "uci_tour": None, "distance": None,
+            "date": None, "departure": None, "arrival": None,
+            "stage_type": None, "won_how": None, "results": 20, "gc": 10,
+            "stages_winners": 25, "stages": 25,
+        },
+        "race_startlist": {
+            "startlist": 60,
+        },
+        "ranking": {
+            "ranking": 25,
+        },
+        "team_info": {
+            "name": None, "nationality": None, "status": None, "bike": None,
+            "wins_count": None, "pcs_ranking_position": None,
+            "uci_ranking_position": None, "riders": 30,
+        },
+    }
+
+    # Columns kept for known tables (other tables keep every column)
+    TABLE_COLUMNS: Dict[str, List[str]] = {
+        "ranking": ["rank", "rider_name", "team_name", "nationality", "points"],
+        "results": ["rank", "rider_name", "team_name", "time", "status"],
+        "gc": ["rank", "rider_name", "team_name", "time"],
+        "startlist": ["rider_number", "rider_name", "team_name", "nationality"],
+        "riders": ["rider_name", "nationality", "age"],
+        "season_results": ["date", "stage_name", "result", "gc_position"],
+        "victories": ["date", "stage_name"],
+        "teams_history": ["season", "team_name", "class"],
+        "points_per_season_history": ["season", "points", "rank"],
+        "stages": ["date", "stage_name", "profile_icon"],
+        "stages_winners": ["stage_name", "rider_name", "nationality"],
+    }
+
+    # Default row limit for tables when the intent has no field profile
+    DEFAULT_ROWS = 10
+
+    # Minimum rows kept per table when shrinking to the token budget
+    MIN_ROWS = 3
+
+    def __init__(self, token_budget: int = 4000):
+        self.token_budget = token_budget
+
+    def build(self, data: Dict[str, Any], plan: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """
+        Build the compact context for a query.
+
+        Returns:
+            (context text, {"before": tokens, "after": tokens}) where
+            "before" estimates the raw data as compact JSON (encoded with
+            orjson, not the indented dump the prompt used to carry).
+        """
+        before = len(encode_json(data)) // CHARS_PER_TOKEN + 1
+        intent = plan.get("intent", "general")
+        fields = self.INTENT_FIELDS.get(intent)
+
+        scale = 1.0
+        context = self._render(data, fields, scale)
+        while estimate_tokens(context) > self.token_budget and scale > 0.05:
+            scale /= 2
+            context = self._render(data, fields, scale)
+
+        if estimate_tokens(context) > self.token_budget:
+            context = context[:self.token_budget * CHARS_PER_TOKEN] + "\n[truncated]"
+
+        return context, {"before": before, "after": estimate_tokens(context)}
+
+    def _render(self, data: Dict[str, Any], fields: Optional[Dict[str, Optional[int]]], scale: float) -> str:
+        """Render every entity's payload."""
+        sections = []
+        for entity, payload in data.items():
+            lines = [f"## {entity}"]
+            if not isinstance(payload, dict):
+                lines.append(_format_value(payload))
+            elif "error" in payload:
+                lines.append(f"error: {payload['error']}")
+            else:
+                lines.extend(self._render_payload(payload, fields, scale))
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections)
+
+    def _render_payload(self, payload: Dict[str, Any], fields: Optional[Dict[str, Optional[int]]], scale: float) -> List[str]:
+        """Render one entity's fields and tables."""
+        lines = []
+        for key, value in payload.items():
+            if fields is not None and key not in fields:
+                continue
+            if value is None or value == [] or value == {}:
+                continue
+
+            if _is_table(value):
+                limit = fields.get(key) if fields else None
+                limit = limit or self.DEFAULT_ROWS
+                limit = max(self.MIN_ROWS, int(limit * scale))
+                lines.extend(self._render_table(key, value, limit))
+            else:
+                lines.append(f"{key}: {_format_value(value)}")
+        return lines
+
+    def _render_table(self, name: str, rows: List[Dict[str, Any]], limit: int) -> List[str]:
+        """Render a table as a header line plus pipe-separated rows."""
+        columns = self.TABLE_COLUMNS.get(name)
+        if columns is None:
+            columns = list(rows[0].keys())
+        columns = [c for c in columns if any(c in row for row in rows[:limit])]
+
+        shown = rows[:limit]
+        header = f"{name} (top {len(shown)} of {len(rows)}):" if len(shown) < len(rows) else f"{name}:"
+        lines = [header, "|".join(columns)]
+        for row in shown:
+            lines.append("|".join(_format_cell(row.get(c)) for c in columns))
+        return lines
+
+
+def _is_table(value: Any) -> bool:
+    """Whether a value is a list of row dicts."""
+    return isinstance(value, list) and bool(value) and isinstance(value[0], dict)
+
+
+def _format_cell(value: Any) -> str:
+    """Format a table cell, keeping the pipe separator unambiguous."""
+    if value is None:
+        return ""
+    return str(value).replace("|", "/")
+
+
+def _format_value(value: Any) -> str:
+    """Format a scalar, dict or list field on one line."""
+    if isinstance(value, dict):
+        return ", ".join(f"{k}={v}" for k, v in value.items())
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return str(value)
@@ -6,12 +6,20 @@ Examples:
 - "Pogacar" -> "tadej-pogacar"
 - "Tour de France" -> "tour-de-france"
 - "UAE Team Emirates" -> "uae-team-emirates"
+
+Riders outside the alias table are looked up in an optional RiderIndex
+of every rider seen in scraped pages, which also tolerates typos. Team
+slugs are mapped to the slug of the requested season through an
+optional TeamIndex.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Pattern
 import re
 from unidecode import unidecode
 
+from app.services.rider_index import RiderIndex
+from app.services.team_index import TeamIndex
+
 
 class EntityResolver:
     """Resolves entity names to ProCyclingStats slugs."""
@@ -138,6 +146,27 @@ class EntityResolver:
         "uno-x": "uno-x-mobility",
     }
 
+    # Compiled on first use by `canonicalize`
+    _alias_pattern: Optional[Pattern] = None
+    _alias_slugs: Dict[str, str] = {}
+
+    def __init__(
+        self,
+        rider_index: Optional[RiderIndex] = None,
+        team_index: Optional[TeamIndex] = None
+    ):
+        """
+        Args:
+            rider_index: Index of scraped riders used beyond the aliases
+            team_index: Season index of team slugs
+        """
+        self.rider_index = rider_index
+        self.team_index = team_index
+        if rider_index is not None:
+            for slug in self.RIDER_ALIASES.values():
+                if slug not in rider_index:
+                    rider_index.add(slug, self._slug_to_name(slug))
+
     async def resolve_rider(self, name: str) -> str:
         """
         Resolve rider name to PCS slug.
@@ -155,6 +184,12 @@ class EntityResolver:
         if normalized in self.RIDER_ALIASES:
             return self.RIDER_ALIASES[normalized]
 
+        # Then riders seen in scraped pages (exact or closest name)
+        if self.rider_index is not None:
+            slug = self.rider_index.resolve(name)
+            if slug:
+                return slug
+
         # Try to create slug from name
         return self._name_to_slug(name)
 
@@ -168,20 +203,29 @@ class EntityResolver:
         return self._name_to_slug(name)
 
     async def resolve_team(self, name: str, year: int = 2024) -> str:
-        """Resolve team name to PCS slug."""
+        """
+        Resolve team name to the PCS slug of the team in `year`.
+
+        Aliases name the current team; the team index maps them to the
+        slug of older seasons once the team's season list is known.
+        """
         normalized = self._normalize(name)
 
         if normalized in self.TEAM_ALIASES:
-            return self.TEAM_ALIASES[normalized]
+            slug = self.TEAM_ALIASES[normalized]
+        else:
+            slug = self._name_to_slug(name)
 
-        return self._name_to_slug(name)
+        if self.team_index is not None:
+            return self.team_index.resolve(slug, year) or slug
+        return slug
 
     async def search_riders(self, query: str) -> List[Dict[str, Any]]:
         """
         Search for riders matching query.
 
-        In a full implementation, this would search the PCS database.
-        For now, returns matches from aliases.
+        Returns alias matches first, then riders of the rider index whose
+        name starts with the query, then close (typo) matches.
         """
         normalized = self._normalize(query)
         results = []
@@ -194,8 +238,33 @@ class EntityResolver:
                     "match_type": "alias"
                 })
 
+        if self.rider_index is not None:
+            seen = {r["slug"] for r in results}
+            results.extend(r for r in self.rider_index.search(query) if r["slug"] not in seen)
+
         return results
 
+    def canonicalize(self, text: str) -> str:
+        """
+        Normalize text and replace known rider, race and team aliases with
+        their slugs, e.g. "Chi ha vinto il Tour?" -> "chi ha vinto il tour-de-france?".
+        """
+        cls = type(self)
+        if cls._alias_pattern is None:
+            slugs = {}
+            # Later tables win on duplicates; races before teams so "uae tour"
+            # stays a race while "uae" alone is a team
+            for table in (self.TEAM_ALIASES, self.RACE_ALIASES, self.RIDER_ALIASES):
+                slugs.update(table)
+            aliases = sorted(slugs, key=len, reverse=True)
+            cls._alias_slugs = slugs
+            cls._alias_pattern = re.compile(
+                r"(?<![a-z0-9-])(" + "|".join(re.escape(a) for a in aliases) + r")(?![a-z0-9-])"
+            )
+
+        normalized = self._normalize(text)
+        return cls._alias_pattern.sub(lambda m: cls._alias_slugs[m.group(1)], normalized)
+
     def _normalize(self, text: str) -> str:
         """Normalize text for matching."""
         # Remove accents, lowercase, strip
@@ -0,0 +1,241 @@
+"""
+Live Publisher
+
+Pushes refreshed PCS data to /ws/live subscribers instead of having
+clients poll the REST endpoints.
+
+A CacheService listener sees every refreshed ranking, race (GC or
+stage) and startlist page, diffs it against the previous version and
+sends only the changes to the subscribers of its topics:
+- the cache key itself, e.g. `ranking:me:individual`,
+  `race:tour-de-france:2024:stage-5`, `startlist:tour-de-france:2024`
+- for race pages, also the race, e.g. `race:tour-de-france:2024`
+
+Each message is encoded once and fanned out to every subscriber. The
+first version seen of a page is sent whole (`snapshot`), later ones as
+an `update` with the changed and removed rows of each table and the
+changed scalar fields. Pages with subscribers are reported through
+`watched_keys` so the pre-warmer keeps refreshing them. Only topics of
+a known shape are accepted (`page_key`); a subscribed page that was
+never scraped is only watched for the current or next season, and a
+bounded number of them at a time, so subscriptions cannot spend the
+scrape budget on arbitrary pages.
+
+Pushes are driven by this process's own CacheService writes. With
+several workers (e.g. gunicorn with CACHE_BACKEND=tiered), a refresh
+made by one worker only reaches the subscribers connected to that
+worker: entries promoted from Redis do not call the listeners. Run
+/ws/live on a single worker.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from collections import OrderedDict
+from datetime import date, datetime
+import asyncio
+import re
+
+# Cache key prefixes of pages pushed to subscribers
+LIVE_PREFIXES = ("ranking", "race", "startlist")
+
+# Topics accepted from clients: ranking, startlist, race (GC) or stage pages
+TOPIC_PATTERN = re.compile(
+    r"ranking:(?:me|we|mu|wu|mj|wj):(?:individual|teams|nations)"
+    r"|startlist:[a-z0-9-]+:\d{4}"
+    r"|race:[a-z0-9-]+:\d{4}(?::gc|:stage-\d{1,2})?"
+)
+
+# Row fields identifying a row across versions, most specific first
+ROW_KEYS = ("rider_url", "team_url", "stage_url", "nation_url", "rider_name", "team_name", "nation", "name")
+
+
+class LivePublisher:
+    """Diffs refreshed cache entries and pushes the changes to topic subscribers."""
+
+    def __init__(
+        self,
+        manager: Any,
+        max_keys: int = 256,
+        max_unseen: int = 20,
+        today: Callable[[], date] = date.today
+    ):
+        """
+        Args:
+            manager: ConnectionManager of /ws/live (`subscriptions` and
+                `broadcast_to_topic`)
+            max_keys: Previous page versions kept for diffing
+            max_unseen: Subscribed pages never scraped yet watched at a time
+            today: Clock deciding which seasons are watched before a scrape
+        """
+        self.manager = manager
+        self.max_keys = max_keys
+        self.max_unseen = max_unseen
+        self.today = today
+        # Cache key -> last published version (the cached object itself)
+        self._previous: "OrderedDict[str, Any]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Counters
+        self._refreshes = 0
+        self._unchanged = 0
+        self._messages = 0
+        self._deliveries = 0
+
+    def on_cache_set(self, key: str, value: Any):
+        """CacheService listener: schedule a push for a refreshed live page."""
+        if key.split(":", 1)[0] not in LIVE_PREFIXES or not isinstance(value, dict) or "error" in value:
+            return
+
+        previous = self._previous.pop(key, None)
+        self._previous[key] = value
+        while len(self._previous) > self.max_keys:
+            self._previous.popitem(last=False)
+
+        topics = [topic for topic in topics_for(key) if self._subscribers(topic)]
+        if not topics or previous is value:
+            return
+
+        self._refreshes += 1
+        if previous is None:
+            message = {"type": "snapshot", "key": key, "data": value}
+        else:
+            changes = diff_pages(previous, value)
+            if not changes:
+                self._unchanged += 1
+                return
+            message = {"type": "update", "key": key, "changes": changes}
+        message["at"] = datetime.now().isoformat()
+
+        task = asyncio.get_running_loop().create_task(self._push(topics, message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _push(self, topics: List[str], message: Dict[str, Any]):
+        for topic in topics:
+            self._messages += 1
+            self._deliveries += self._subscribers(topic)
+            await self.manager.broadcast_to_topic(topic, {**message, "topic": topic})
+
+    def _subscribers(self, topic: str) -> int:
+        return len(self.manager.subscriptions.get(topic) or ())
+
+    def watched_keys(self) -> List[str]:
+        """
+        Cache keys of pages that have subscribers, to keep them refreshed:
+        pages seen since startup, then up to `max_unseen` subscribed pages
+        of the current or next season not scraped yet.
+        """
+        keys = [key for key in self._previous if any(self._subscribers(t) for t in topics_for(key))]
+        unseen = 0
+        current = self.today().year
+        for topic, clients in self.manager.subscriptions.items():
+            key = page_key(topic)
+            if not clients or key is None or key in keys:
+                continue
+            year = _season(key)
+            if unseen >= self.max_unseen or (year is not None and not current <= year <= current + 1):
+                continue
+            unseen += 1
+            keys.append(key)
+        return keys
+
+    async def close(self):
+        """Wait for pushes in flight."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get publisher statistics."""
+        return {
+            "topics": sum(1 for clients in self.manager.subscriptions.values() if clients),
+            "tracked_pages": len(self._previous),
+            "watched_pages": len(self.watched_keys()),
+            "refreshes": self._refreshes,
+            "unchanged": self._unchanged,
+            "messages": self._messages,
+            "deliveries": self._deliveries
+        }
+
+
+def topics_for(key: str) -> List[str]:
+    """Topics a cache key is published to."""
+    parts = key.split(":")
+    if parts[0] == "race" and len(parts) == 4:
+        return [key, ":".join(parts[:3])]
+    return [key]
+
+
+def page_key(topic: str) -> Optional[str]:
+    """Cache key of the page a topic follows (a race topic follows its GC); None for unknown topics."""
+    if not TOPIC_PATTERN.fullmatch(topic):
+        return None
+    if topic.startswith("race:") and topic.count(":") == 2:
+        return f"{topic}:gc"
+    return topic
+
+
+def _season(key: str) -> Optional[int]:
+    """Season of a race or startlist cache key; None for rankings."""
+    parts = key.split(":")
+    return int(parts[2]) if parts[0] in ("race", "startlist") else None
+
+
+def diff_pages(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Changes from one version of a page to the next:
+    {"fields": {name: value}, "tables": {name: {"changed": rows, "removed": ids}}}
+    with only the non-empty parts; empty if nothing changed.
+    """
+    fields = {}
+    tables = {}
+    for name, value in new.items():
+        before = old.get(name)
+        if _is_table(value) and _is_table(before):
+            changed, removed = _diff_rows(before, value)
+            if changed or removed:
+                tables[name] = {"changed": changed, "removed": removed}
+        elif value != before:
+            fields[name] = value
+    for name in old.keys() - new.keys():
+        fields[name] = None
+
+    changes: Dict[str, Any] = {}
+    if fields:
+        changes["fields"] = fields
+    if tables:
+        changes["tables"] = tables
+    return changes
+
+
+def _is_table(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(row, dict) for row in value)
+
+
+def _diff_rows(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    """Rows added or changed, and ids of rows removed."""
+    field = _row_key(old, new)
+    if field is None:
+        # No identifying column: compare by position
+        changed = [row for i, row in enumerate(new) if i >= len(old) or old[i] != row]
+        return changed, list(range(len(new), len(old)))
+
+    before = {row[field]: row for row in old}
+    ids = {row[field] for row in new}
+    changed = [row for row in new if before.get(row[field]) != row]
+    removed = [row_id for row_id in before if row_id not in ids]
+    return changed, removed
+
+
+def _row_key(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Optional[str]:
+    """First ROW_KEYS field present in every row and unique within each version."""
+    for field in ROW_KEYS:
+        if all(_unique(rows, field) for rows in (old, new)):
+            return field
+    return None
+
+
+def _unique(rows: List[Dict[str, Any]], field: str) -> bool:
+    values = [row.get(field) for row in rows]
+    try:
+        return None not in values and len(set(values)) == len(values)
+    except TypeError:
+        return False
@@ -0,0 +1,104 @@
+"""
+Negative Cache
+
+Remembers failed PCS scrapes so retries do not hit PCS again:
+- not found (unknown rider, race or team slug): the error is cached for
+  a short fixed TTL
+- transient failures (connection errors, Cloudflare, parse errors): the
+  key is retried after an exponential backoff, doubled on each
+  consecutive failure and reset by a success
+
+While a key is negatively cached or backing off, callers get the last
+error payload without a scrape. Those absorbed misses are counted.
+"""
+
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import time
+
+
+class NegativeCache:
+    """Short-lived cache of scrape failures, with exponential backoff."""
+
+    def __init__(
+        self,
+        not_found_ttl: int = 600,
+        backoff_base: float = 10.0,
+        backoff_max: float = 900.0,
+        max_entries: int = 5000
+    ):
+        """
+        Args:
+            not_found_ttl: Seconds a not-found error is served from memory
+            backoff_base: Seconds before retrying after a first transient failure
+            backoff_max: Cap on the backoff delay
+            max_entries: Maximum number of failing keys remembered
+        """
+        self.not_found_ttl = not_found_ttl
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_entries = max_entries
+        # Key -> {"payload", "not_found", "failures", "retry_at"} (monotonic)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        # Counters
+        self._not_found_hits = 0
+        self._backoff_hits = 0
+        self._failures = 0
+
+    def active(self, key: str) -> bool:
+        """Whether a key must not be scraped yet."""
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() < entry["retry_at"]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Error payload for a key that must not be scraped yet, counting the absorbed miss."""
+        if not self.active(key):
+            return None
+        entry = self._entries[key]
+        if entry["not_found"]:
+            self._not_found_hits += 1
+        else:
+            self._backoff_hits += 1
+        return entry["payload"]
+
+    def record_failure(self, key: str, payload: Dict[str, Any]):
+        """Record a failed scrape; `payload["not_found"]` marks pages PCS does not have."""
+        self._failures += 1
+        not_found = bool(payload.get("not_found"))
+        entry = self._entries.get(key)
+        failures = entry["failures"] + 1 if entry and not entry["not_found"] and not not_found else 1
+
+        if not_found:
+            delay = self.not_found_ttl
+        else:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - 1))
+
+        self._entries[key] = {
+            "payload": payload,
+            "not_found": not_found,
+            "failures": failures,
+            "retry_at": time.monotonic() + delay
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def record_success(self, key: str):
+        """Forget a key's failures."""
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get negative cache statistics."""
+        now = time.monotonic()
+        active = [entry for entry in self._entries.values() if now < entry["retry_at"]]
+        return {
+            "not_found_keys": sum(1 for entry in active if entry["not_found"]),
+            "backing_off_keys": sum(1 for entry in active if not entry["not_found"]),
+            "absorbed_not_found": self._not_found_hits,
+            "absorbed_backoff": self._backoff_hits,
+            "absorbed_total": self._not_found_hits + self._backoff_hits,
+            "failures": self._failures,
+            "not_found_ttl": self.not_found_ttl,
+            "backoff_max": self.backoff_max
+        }
@@ -5,23 +5,342 @@ Uses the procyclingstats library to fetch data from procyclingstats.com
 Implements caching to avoid rate limiting and improve performance.
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Iterator, Set, Tuple, Union
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import OrderedDict
+from functools import partial
+from datetime import datetime
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
 
 from procyclingstats import Rider, Race, RaceStartlist, Stage, Team, Ranking
 
 from app.services.cache_service import CacheService
 from app.services.entity_resolver import EntityResolver
+from app.services.negative_cache import NegativeCache
+from app.services.rider_index import RiderIndex
+from app.services.team_index import TeamIndex
+from app.services.rate_limiter import TokenBucketRateLimiter, Priority
+from app.services.ttl_policy import Lifetime, TTLPolicy
+
+# Start of the procyclingstats error for pages PCS does not have
+NOT_FOUND_ERROR = "HTML from given URL is invalid"
+
+# A TTL in seconds, or a policy function of the scraped data returning a Lifetime
+TTL = Union[int, Callable[[Dict[str, Any]], Lifetime]]
+
+
+class FetchTrace:
+    """Cache keys and data freshness seen by `_fetch` calls (see `trace_fetches`)."""
+
+    def __init__(self):
+        self.keys: Set[str] = set()
+        # Cache key -> creation time of the entry the data came from
+        self.versions: Dict[str, str] = {}
+        self.max_age = 0.0
+        self.stale = False
+
+    def record(self, cache_key: str, age: float = 0.0, stale: bool = False, version: Optional[str] = None):
+        """Record one `_fetch` call."""
+        self.keys.add(cache_key)
+        if version is not None:
+            self.versions[cache_key] = version
+        self.max_age = max(self.max_age, age)
+        self.stale = self.stale or stale
+
+
+# Traces active in the current context, innermost last
+_traces: ContextVar[Tuple[FetchTrace, ...]] = ContextVar("pcs_fetch_traces", default=())
+
+
+@contextmanager
+def trace_fetches(trace: Optional[FetchTrace] = None) -> Iterator[FetchTrace]:
+    """
+    Record the scraper calls made inside the block, including calls in
+    tasks started from it, into `trace` (or a new one). Traces nest: an
+    outer trace (e.g. per HTTP request) also sees the inner calls.
+    """
+    trace = FetchTrace() if trace is None else trace
+    token = _traces.set(_traces.get() + (trace,))
+    try:
+        yield trace
+    finally:
+        _traces.reset(token)
+
+
+def _record_fetch(cache_key: str, age: float = 0.0, stale: bool = False, version: Optional[str] = None):
+    """Record a `_fetch` call in every active trace."""
+    for trace in _traces.get():
+        trace.record(cache_key, age, stale, version)
 
 
 class PCSScraperService:
-    """Service for scraping ProCyclingStats data."""
+    """
+    Service for scraping ProCyclingStats data.
+
+    One instance is created per process (see `app.main.lifespan`) so that
+    every request shares the same scrape pool and entity resolver.
+    """
 
-    def __init__(self, cache: CacheService):
+    def __init__(
+        self,
+        cache: CacheService,
+        max_workers: int = 4,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        max_tracked_keys: int = 1000,
+        ttl_policy: Optional[TTLPolicy] = None,
+        rider_index: Optional[RiderIndex] = None,
+        negative_cache: Optional[NegativeCache] = None,
+        team_index: Optional[TeamIndex] = None
+    ):
         self.cache = cache
-        self.entity_resolver = EntityResolver()
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.ttl_policy = ttl_policy or TTLPolicy()
+        self.negative_cache = negative_cache or NegativeCache()
+        self.entity_resolver = EntityResolver(rider_index, team_index)
+        self.team_index = team_index
+        if rider_index is not None:
+            # Every scraped startlist, roster, ranking and result feeds the index
+            cache.add_listener(rider_index.on_cache_set)
+        if team_index is not None:
+            cache.add_listener(team_index.on_cache_set)
+        self.rate_limiter = rate_limiter
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="pcs-scrape"
+        )
+
+        # Pool accounting (mutated from worker threads)
+        self._pool_lock = threading.Lock()
+        self._submitted = 0
+        self._started = 0
+        self._completed = 0
+
+        # Single-flight registry: cache key -> scrape task shared by all
+        # concurrent callers that missed the cache for that key
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._originated = 0
+        self._coalesced = 0
+        self._stale_served = 0
+        self._revalidations = 0
+
+        # Loaders and access counts of recently fetched keys, so hot keys
+        # can be refreshed ahead of expiry (see `hot_keys`, `refresh`)
+        self.max_tracked_keys = max_tracked_keys
+        self._loaders: "OrderedDict[str, Tuple[Callable[[], Dict[str, Any]], TTL]]" = OrderedDict()
+        self._access_counts: Dict[str, float] = {}
+        self._refreshes = 0
+
+    async def close(self):
+        """
+        Drain the scrape pool.
+
+        Scrapes already running are allowed to finish, queued ones are
+        cancelled. Called once on application shutdown.
+        """
+        if self.rate_limiter:
+            await self.rate_limiter.close()
+        await asyncio.to_thread(
+            self.executor.shutdown, wait=True, cancel_futures=True
+        )
+
+    async def _run(
+        self,
+        func: Callable[[], Dict[str, Any]],
+        priority: Optional[Priority] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a blocking procyclingstats call on the shared scrape pool.
+
+        Each call first takes a token from the PCS rate limiter, in the
+        given priority lane (default: the lane of the calling context).
+        """
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(priority)
+
+        def _task():
+            with self._pool_lock:
+                self._started += 1
+            try:
+                return func()
+            finally:
+                with self._pool_lock:
+                    self._completed += 1
+
+        with self._pool_lock:
+            self._submitted += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _task)
+
+    async def _fetch(
+        self,
+        cache_key: str,
+        scrape: Callable[[], Dict[str, Any]],
+        ttl: TTL
+    ) -> Dict[str, Any]:
+        """
+        Return cached data for a key, scraping it on a miss.
+
+        Concurrent misses for the same key share one scrape: the first
+        caller starts it, the others await the same task. Error payloads
+        are returned to every waiter but never cached; the negative cache
+        serves them to later callers for a while instead (see
+        `NegativeCache`).
+
+        Stale entries (past the soft TTL) are returned at once while one
+        background refresh, at background priority, replaces them.
+        """
+        self._remember(cache_key, scrape, ttl)
+        entry = await self.cache.get_entry(cache_key, allow_stale=True)
+        if entry is not None:
+            stale = self.cache.is_stale(entry)
+            age = (datetime.now() - entry["created_at"]).total_seconds()
+            _record_fetch(cache_key, age, stale, entry["created_at"].isoformat())
+            self.ttl_policy.record_hit(cache_key, age)
+            if stale:
+                self._stale_served += 1
+                self._revalidate(cache_key, scrape, ttl)
+            return entry["value"]
+
+        _record_fetch(cache_key)
+        task = self._inflight.get(cache_key)
+        if task is None:
+            failed = self.negative_cache.get(cache_key)
+            if failed is not None:
+                return failed
+
+        if task is not None:
+            self._coalesced += 1
+        else:
+            self._originated += 1
+            task = self._start_load(cache_key, scrape, ttl)
+
+        # Shield so a disconnecting caller does not cancel the shared scrape
+        data = await asyncio.shield(task)
+        if _traces.get() and "error" not in data:
+            # Version of the entry just stored, as later hits will record it
+            stored = await self.cache.peek_entry(cache_key)
+            if stored is not None:
+                _record_fetch(cache_key, version=stored["created_at"].isoformat())
+        return data
+
+    def _revalidate(self, cache_key: str, scrape: Callable[[], Dict[str, Any]], ttl: TTL):
+        """Start a background refresh of a stale key unless one is in flight or backing off."""
+        if cache_key in self._inflight or self.negative_cache.active(cache_key):
+            return
+        self._revalidations += 1
+        self._start_load(cache_key, scrape, ttl, Priority.BACKGROUND)
+
+    def tracks(self, cache_key: str) -> bool:
+        """Whether a key was fetched before and can be refreshed."""
+        return cache_key in self._loaders
+
+    async def refresh(self, cache_key: str) -> bool:
+        """
+        Re-scrape a previously fetched key at background priority.
+
+        Joins the scrape already in flight for the key, if any. Returns
+        False if the key is unknown or the scrape failed.
+        """
+        loader = self._loaders.get(cache_key)
+        if loader is None or self.negative_cache.active(cache_key):
+            return False
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            self._refreshes += 1
+            scrape, ttl = loader
+            task = self._start_load(cache_key, scrape, ttl, Priority.BACKGROUND)
+        data = await asyncio.shield(task)
+        return "error" not in data
+
+    def hot_keys(self, limit: int) -> List[str]:
+        """Most frequently fetched keys, most accessed first."""
+        ranked = sorted(self._access_counts.items(), key=lambda item: item[1], reverse=True)
+        return [key for key, _ in ranked[:limit]]
+
+    def decay_access_counts(self, factor: float = 0.5):
+        """Age access counts so the hot set follows recent traffic."""
+        for key in self._access_counts:
+            self._access_counts[key] *= factor
+
+    def _remember(self, cache_key: str, scrape: Callable[[], Dict[str, Any]], ttl: TTL):
+        """Record a key's loader and count the access, bounded LRU."""
+        self._loaders[cache_key] = (scrape, ttl)
+        self._loaders.move_to_end(cache_key)
+        self._access_counts[cache_key] = self._access_counts.get(cache_key, 0) + 1
+        while len(self._loaders) > self.max_tracked_keys:
+            oldest, _ = self._loaders.popitem(last=False)
+            self._access_counts.pop(oldest, None)
+
+    def _start_load(
+        self,
+        cache_key: str,
+        scrape: Callable[[], Dict[str, Any]],
+        ttl: TTL,
+        priority: Optional[Priority] = None
+    ) -> asyncio.Task:
+        """Start the shared scrape task for a key."""
+        task = asyncio.create_task(self._load(cache_key, scrape, ttl, priority))
+        task.add_done_callback(_consume_exception)
+        self._inflight[cache_key] = task
+        return task
+
+    async def _load(
+        self,
+        cache_key: str,
+        scrape: Callable[[], Dict[str, Any]],
+        ttl: TTL,
+        priority: Optional[Priority] = None
+    ) -> Dict[str, Any]:
+        """Scrape and cache a single key (the originating side of `_fetch`)."""
+        try:
+            try:
+                data = await self._run(scrape, priority)
+            except Exception as e:
+                self.negative_cache.record_failure(cache_key, {"error": str(e)})
+                raise
+            if "error" in data:
+                self.negative_cache.record_failure(cache_key, data)
+                return data
+            self.negative_cache.record_success(cache_key)
+            # Only pages classified by the policy (races, seasons) can be frozen
+            if callable(ttl):
+                lifetime = ttl(data)
+                seconds, persist = lifetime.ttl, lifetime.frozen
+            else:
+                seconds, persist = ttl, False
+            await self.cache.set(cache_key, data, ttl=seconds, persist=persist)
+            return data
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get scrape pool statistics."""
+        with self._pool_lock:
+            submitted = self._submitted
+            started = self._started
+            completed = self._completed
+        stats = {
+            "workers": self.max_workers,
+            "queue_depth": submitted - started,
+            "running": started - completed,
+            "completed": completed,
+            "inflight": len(self._inflight),
+            "originating_calls": self._originated,
+            "coalesced_calls": self._coalesced,
+            "stale_served": self._stale_served,
+            "revalidations": self._revalidations,
+            "refreshes": self._refreshes,
+            "tracked_keys": len(self._loaders),
+            "negative_cache": self.negative_cache.stats(),
+            "ttl_policy": self.ttl_policy.stats()
+        }
+        if self.rate_limiter:
+            stats["rate_limiter"] = self.rate_limiter.stats()
+        return stats
 
     async def get_rider(self, name_or_slug: str) -> Dict[str, Any]:
         """
@@ -34,12 +353,16 @@ class PCSScraperService:
             Dict with rider data including name, nationality, team, stats, etc.
         """
         slug = await self.entity_resolver.resolve_rider(name_or_slug)
-        cache_key = f"rider:{slug}"
+        return await self._get_rider_page(slug)
 
-        # Check cache first
-        cached = await self.cache.get(cache_key)
-        if cached:
-            return cached
+    async def _get_rider_page(self, slug: str) -> Dict[str, Any]:
+        """
+        Get the canonical parsed rider page.
+
+        This is the only rider entry stored in the cache; victories and
+        results are projections of it.
+        """
+        cache_key = f"rider:{slug}"
 
         # Scrape in thread pool (procyclingstats is sync)
         def _scrape():
@@ -47,16 +370,10 @@ class PCSScraperService:
                 rider = Rider(f"rider/{slug}")
                 return rider.parse()
             except Exception as e:
-                return {"error": str(e), "slug": slug}
-
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(self.executor, _scrape)
+                return _scrape_error(e, slug=slug)
 
         # Cache for 15 minutes
-        if "error" not in data:
-            await self.cache.set(cache_key, data, ttl=900)
-
-        return data
+        return await self._fetch(cache_key, _scrape, ttl=self.ttl_policy.rider_ttl)
 
     async def get_rider_victories(
         self,
@@ -65,64 +382,32 @@ class PCSScraperService:
     ) -> Dict[str, Any]:
         """Get rider victories, optionally filtered by year."""
         slug = await self.entity_resolver.resolve_rider(name_or_slug)
-        cache_key = f"rider_victories:{slug}:{year or 'all'}"
-
-        cached = await self.cache.get(cache_key)
-        if cached:
-            return cached
-
-        def _scrape():
-            try:
-                # Get rider main page for victories
-                rider = Rider(f"rider/{slug}")
-                data = rider.parse()
-                return data
-            except Exception as e:
-                return {"error": str(e), "slug": slug}
-
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(self.executor, _scrape)
-
-        # Filter by year if specified and data has victories
-        if year and "error" not in data:
-            if "victories" in data:
-                data["victories"] = [
-                    v for v in data.get("victories", [])
-                    if v.get("year") == year or str(year) in str(v.get("date", ""))
-                ]
+        data = await self._get_rider_page(slug)
+        if "error" in data:
+            return data
 
-        if "error" not in data:
-            await self.cache.set(cache_key, data, ttl=900)
-
-        return data
+        results = _filter_results_by_year(data.get("season_results"), year)
+        # Shallow copy: the cached page itself is never modified
+        return {
+            **data,
+            "victories": [r for r in results if r.get("result") == 1]
+        }
 
     async def get_rider_results(
         self,
         name_or_slug: str,
         year: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Get rider race results."""
+        """Get rider race results, optionally filtered by year."""
         slug = await self.entity_resolver.resolve_rider(name_or_slug)
-        cache_key = f"rider_results:{slug}:{year or 'all'}"
-
-        cached = await self.cache.get(cache_key)
-        if cached:
-            return cached
-
-        def _scrape():
-            try:
-                rider = Rider(f"rider/{slug}")
-                return rider.parse()
-            except Exception as e:
-                return {"error": str(e), "slug": slug}
+        data = await self._get_rider_page(slug)
+        if "error" in data:
+            return data
 
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(self.executor, _scrape)
-
-        if "error" not in data:
-            await self.cache.set(cache_key, data, ttl=900)
-
-        return data
+        return {
+            **data,
+            "season_results": _filter_results_by_year(data.get("season_results"), year)
+        }
 
     async def get_race_results(
         self,
@@ -151,10 +436,6 @@ class PCSScraperService:
             url = f"race/{resolved_slug}/{year}"
             cache_key = f"race:{resolved_slug}:{year}:gc"
 
-        cached = await self.cache.get(cache_key)
-        if cached:
-            return cached
-
         def _scrape():
             try:
                 if stage:
@@ -163,15 +444,10 @@ class PCSScraperService:
                     scraper = Race(url)
                 return scraper.parse()
             except Exception as e:
-                return {"error": str(e), "race": resolved_slug, "year": year}
-
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(self.executor, _scrape)
-
-        if "error" not in data:
-            await self.cache.set(cache_key, data, ttl=900)
+                return _scrape_error(e, race=resolved_slug, year=year)
 
-        return data
+        # Past races are kept for long, live ones refresh quickly
+        return await self._fetch(cache_key, _scrape, ttl=partial(self.ttl_policy.race_ttl, year))
 
     async def get_race_startlist(
         self,
@@ -183,49 +459,69 @@ class PCSScraperService:
         url = f"race/{resolved_slug}/{year}/startlist"
         cache_key = f"startlist:{resolved_slug}:{year}"
 
-        cached = await self.cache.get(cache_key)
-        if cached:
-            return cached
-
         def _scrape():
             try:
                 startlist = RaceStartlist(url)
                 return {"startlist": startlist.startlist()}
             except Exception as e:
-                return {"error": str(e), "race": resolved_slug, "year": year}
-
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(self.executor, _scrape)
+                return _scrape_error(e, race=resolved_slug, year=year)
 
-        if "error" not in data:
-            await self.cache.set(cache_key, data, ttl=1800)  # 30 min
-
-        return data
+        return await self._fetch(cache_key, _scrape, ttl=partial(
+            self.ttl_policy.season_ttl, year, self.ttl_policy.startlist_ttl
+        ))
 
     async def get_team(self, team_slug: str, year: int) -> Dict[str, Any]:
-        """Get team roster and info."""
+        """
+        Get team roster and info.
+
+        With a team index, seasons the team did not ride are not
+        requested at all. A team whose seasons are not known yet is
+        requested for `year` as is; if PCS has no such page, the current
+        season is fetched (its page lists the slug of every season) and
+        the older season is requested again under its own slug.
+        """
         resolved_slug = await self.entity_resolver.resolve_team(team_slug, year)
+        if self.team_index is None:
+            return await self._fetch_team(resolved_slug, year)
+
+        seasons = self.team_index.seasons(resolved_slug)
+        # Newer seasons may not be listed yet: only older gaps are skipped
+        if seasons and year not in seasons and year < max(seasons):
+            return {
+                "error": f"No {year} season for team {resolved_slug} "
+                         f"(seasons {min(seasons)}-{max(seasons)})",
+                "team": resolved_slug,
+                "year": year,
+                "not_found": True
+            }
+
+        data = await self._fetch_team(resolved_slug, year)
+        current = self.ttl_policy.today().year
+        if seasons or year == current or not data.get("not_found"):
+            return data
+
+        if "error" in await self.get_team(team_slug, current):
+            return data
+        season_slug = await self.entity_resolver.resolve_team(team_slug, year)
+        if season_slug == resolved_slug:
+            return data
+        return await self.get_team(season_slug, year)
+
+    async def _fetch_team(self, resolved_slug: str, year: int) -> Dict[str, Any]:
+        """Fetch the page of a team season under its resolved slug."""
         url = f"team/{resolved_slug}-{year}"
         cache_key = f"team:{resolved_slug}:{year}"
 
-        cached = await self.cache.get(cache_key)
-        if cached:
-            return cached
-
         def _scrape():
             try:
                 team = Team(url)
                 return team.parse()
             except Exception as e:
-                return {"error": str(e), "team": resolved_slug, "year": year}
+                return _scrape_error(e, team=resolved_slug, year=year)
 
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(self.executor, _scrape)
-
-        if "error" not in data:
-            await self.cache.set(cache_key, data, ttl=3600)  # 1 hour
-
-        return data
+        return await self._fetch(cache_key, _scrape, ttl=partial(
+            self.ttl_policy.season_ttl, year, self.ttl_policy.team_ttl
+        ))
 
     async def get_ranking(
         self,
@@ -242,10 +538,6 @@ class PCSScraperService:
         url = f"rankings/{category}/{ranking_type}"
         cache_key = f"ranking:{category}:{ranking_type}"
 
-        cached = await self.cache.get(cache_key)
-        if cached:
-            return cached
-
         def _scrape():
             try:
                 ranking = Ranking(url)
@@ -256,16 +548,40 @@ class PCSScraperService:
                 else:
                     return ranking.parse()
             except Exception as e:
-                return {"error": str(e), "ranking_type": ranking_type}
-
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(self.executor, _scrape)
-
-        if "error" not in data:
-            await self.cache.set(cache_key, data, ttl=600)  # 10 min
+                return _scrape_error(e, ranking_type=ranking_type)
 
-        return data
+        return await self._fetch(cache_key, _scrape, ttl=self.ttl_policy.ranking_ttl)
 
     async def search_riders(self, query: str) -> List[Dict[str, Any]]:
         """Search for riders by name."""
         return await self.entity_resolver.search_riders(query)
+
+
+def _filter_results_by_year(
+    results: Optional[List[Dict[str, Any]]],
+    year: Optional[int]
+) -> List[Dict[str, Any]]:
+    """Filter parsed `season_results` rows by the year of their date."""
+    if not results:
+        return []
+    if not year:
+        return list(results)
+    return [r for r in results if str(r.get("date") or "").startswith(str(year))]
+
+
+def _scrape_error(exc: Exception, **context: Any) -> Dict[str, Any]:
+    """
+    Error payload of a failed scrape. procyclingstats rejects pages PCS
+    does not have ("Page not found") with a ValueError "HTML from given
+    URL is invalid", which is flagged `not_found`. Anything else
+    (ConnectionError, ValueErrors of its table and date parsers...) may
+    be transient.
+    """
+    not_found = isinstance(exc, ValueError) and str(exc).startswith(NOT_FOUND_ERROR)
+    return {"error": str(exc), **context, "not_found": not_found}
+
+
+def _consume_exception(task: asyncio.Task):
+    """Mark a shared scrape's exception as retrieved if nobody awaited it."""
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,132 @@
+"""
+Query Plan Cache
+
+Caches LLM query plans keyed on a normalized form of the question, so
+near-identical questions ("chi ha vinto il Tour 2024", "who won the tour
+in 2024") reuse one plan instead of paying for a planning round trip.
+
+Normalization: accents stripped and lowercased, entity aliases replaced
+by their slugs, punctuation and stopwords dropped, and common Italian /
+English query words folded onto one canonical term.
+"""
+
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+import copy
+import re
+import time
+
+from app.services.entity_resolver import EntityResolver
+
+
+# Words that do not change the plan
+STOPWORDS = {
+    # Italian
+    "il", "lo", "la", "i", "gli", "le", "un", "uno", "una", "di", "del",
+    "della", "dei", "degli", "delle", "da", "dal", "in", "nel", "nella",
+    "al", "alla", "a", "e", "ed", "con", "per", "su", "che", "chi", "ha",
+    "hanno", "ho", "quale", "quali", "quanti", "quante", "quanto", "come",
+    "mi", "me", "dimmi", "mostra", "mostrami", "fammi", "vedere", "sono",
+    "l", "d", "dell", "dall", "nell", "all", "sull", "anno",
+    # English
+    "the", "a", "an", "of", "in", "at", "on", "for", "to", "and", "is",
+    "are", "was", "were", "did", "does", "do", "who", "what", "which",
+    "how", "many", "much", "me", "show", "tell", "give", "please", "year",
+    "has", "have", "with", "about",
+}
+
+# Query words folded onto one canonical term (Italian and English)
+SYNONYMS = {
+    "vinto": "win", "vince": "win", "vincitore": "win", "won": "win",
+    "wins": "win", "winner": "win", "win": "win",
+    "vittorie": "victories", "vittoria": "victories", "victories": "victories",
+    "victory": "victories",
+    "classifica": "ranking", "classifiche": "ranking", "ranking": "ranking",
+    "rankings": "ranking", "standings": "ranking", "uci": "ranking",
+    "risultati": "results", "risultato": "results", "results": "results",
+    "result": "results", "ordine": "results", "arrivo": "results",
+    "partenti": "startlist", "startlist": "startlist", "iscritti": "startlist",
+    "squadra": "team", "team": "team", "corridori": "riders", "riders": "riders",
+    "roster": "riders", "rosa": "riders",
+    "tappa": "stage", "stage": "stage",
+    "confronta": "compare", "confronto": "compare", "compare": "compare",
+    "vs": "compare", "versus": "compare",
+    "generale": "gc", "gc": "gc",
+}
+
+
+class PlanCache:
+    """LRU + TTL cache of query plans keyed on the normalized question."""
+
+    def __init__(self, resolver: EntityResolver, max_entries: int = 2000, ttl: int = 6 * 3600):
+        """
+        Args:
+            resolver: Entity resolver used to canonicalize aliases
+            max_entries: Maximum number of cached plans
+            ttl: Seconds a plan stays valid
+        """
+        self.resolver = resolver
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._plans: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def key(self, question: str) -> str:
+        """Normalized cache key for a question."""
+        text = self.resolver.canonicalize(question)
+        # Keep slug characters, drop the rest of the punctuation
+        tokens = re.findall(r"[a-z0-9][a-z0-9-]*", text)
+
+        terms: List[str] = []
+        for token in tokens:
+            if token in STOPWORDS:
+                continue
+            term = SYNONYMS.get(token, token)
+            if not terms or terms[-1] != term:
+                terms.append(term)
+        return " ".join(terms)
+
+    def get(self, question: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of the cached plan for a question."""
+        key = self.key(question)
+        entry = self._plans.get(key)
+        if entry is None or time.monotonic() > entry["expires_at"]:
+            if entry is not None:
+                del self._plans[key]
+            self._misses += 1
+            return None
+
+        self._plans.move_to_end(key)
+        self._hits += 1
+        return copy.deepcopy(entry["plan"])
+
+    def set(self, question: str, plan: Dict[str, Any]):
+        """Cache the plan for a question."""
+        key = self.key(question)
+        if not key:
+            return
+
+        self._plans[key] = {
+            "plan": copy.deepcopy(plan),
+            "expires_at": time.monotonic() + self.ttl
+        }
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+            self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get plan cache statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._plans),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "evictions": self._evictions
+        }
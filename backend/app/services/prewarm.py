@@ -0,0 +1,260 @@
+"""
+Cache Pre-warming
+
+Background scheduler that keeps the most viewed PCS pages in the cache,
+so deploys and TTL expiries do not turn into slow first requests.
+
+The hot set is:
+- seed pages: rankings, the GC and latest stages of the Grand Tour in
+  progress, and the first riders of the EntityResolver alias table
+- the most frequently fetched cache keys, as observed by the scraper
+- keys with live subscribers (see `LivePublisher.watched_keys`); a
+  subscribed page that was never scraped is fetched through the scraper
+  call its cache key names (see `key_loader`)
+
+Each cycle refreshes the hot keys that would expire before the next
+cycle. Refreshes run one at a time at background priority through the
+PCS rate limiter and are spread over the cycle, so they never burst.
+`min_spacing` keeps them to a share of the PCS budget, and a refresh is
+held back while user scrapes are waiting for a token: the background
+lane only orders the queue, it does not reserve tokens.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from datetime import date, datetime
+import asyncio
+import re
+
+from app.services.pcs_scraper import PCSScraperService, trace_fetches
+from app.services.rate_limiter import Priority, set_priority
+from app.utils.date_utils import parse_date
+
+
+# (race slug, first day, last day) as (month, day): generous windows
+# around each Grand Tour, including the days just after the finish
+GRAND_TOURS = [
+    ("giro-d-italia", (5, 1), (6, 5)),
+    ("tour-de-france", (6, 25), (7, 31)),
+    ("vuelta-a-espana", (8, 10), (9, 20)),
+]
+
+# Latest finished stages kept warm during a Grand Tour
+RECENT_STAGES = 3
+
+
+class Prewarmer:
+    """Keeps a hot set of PCS pages warm in the cache."""
+
+    def __init__(
+        self,
+        scraper: PCSScraperService,
+        interval: float = 300.0,
+        initial_delay: float = 10.0,
+        min_spacing: float = 6.0,
+        top_keys: int = 50,
+        seed_riders: int = 20,
+        watched_keys: Optional[Callable[[], Iterable[str]]] = None
+    ):
+        """
+        Args:
+            scraper: Shared PCS scraper service
+            interval: Seconds between pre-warm cycles
+            initial_delay: Seconds to wait after startup before seeding
+            min_spacing: Minimum seconds between two refreshes
+            top_keys: Number of most fetched keys kept warm
+            seed_riders: Number of alias-table riders seeded at startup
+            watched_keys: Extra keys to keep warm, read every cycle
+        """
+        self.scraper = scraper
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.min_spacing = min_spacing
+        self.top_keys = top_keys
+        self.seed_riders = seed_riders
+        self.watched_keys = watched_keys
+        self._task: Optional[asyncio.Task] = None
+        self._pinned: Set[str] = set()
+
+        # Counters
+        self._cycles = 0
+        self._refreshed = 0
+        self._failed = 0
+        self._deferred = 0
+        self._last_cycle_at: Optional[datetime] = None
+        self._last_cycle_due = 0
+
+    async def start(self):
+        """Start the background pre-warm loop."""
+        self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        """Stop the pre-warm loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _loop(self):
+        """Seed once, then refresh the hot set every `interval` seconds."""
+        # Every scrape started from this task waits behind user requests
+        set_priority(Priority.BACKGROUND)
+        await asyncio.sleep(self.initial_delay)
+        await self.seed()
+
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await self.run_cycle()
+            except Exception:
+                self._failed += 1
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    async def seed(self, today: Optional[date] = None):
+        """Fetch the seed pages and pin their cache keys to the hot set."""
+        with trace_fetches() as trace:
+            for load in self._seed_loaders(today or date.today()):
+                await self._wait_for_idle_limiter()
+                try:
+                    await load()
+                except Exception:
+                    self._failed += 1
+                await asyncio.sleep(self.min_spacing)
+        self._pinned |= trace.keys
+
+    def _seed_loaders(self, today: date) -> List[Callable[[], Awaitable[Any]]]:
+        """Scraper calls for the seed pages."""
+        scraper = self.scraper
+        loaders: List[Callable[[], Awaitable[Any]]] = [
+            lambda: scraper.get_ranking("individual"),
+            lambda: scraper.get_ranking("teams"),
+        ]
+
+        race = current_grand_tour(today)
+        if race:
+            loaders.append(lambda: self._seed_grand_tour(race, today))
+
+        riders: List[str] = []
+        for slug in scraper.entity_resolver.RIDER_ALIASES.values():
+            if slug not in riders:
+                riders.append(slug)
+        for slug in riders[:self.seed_riders]:
+            loaders.append(lambda slug=slug: scraper.get_rider(slug))
+
+        return loaders
+
+    async def _seed_grand_tour(self, race: str, today: date):
+        """Fetch the GC of a Grand Tour in progress and its latest stages."""
+        gc = await self.scraper.get_race_results(race, today.year)
+        for stage in latest_stages(gc, today, RECENT_STAGES):
+            await asyncio.sleep(self.min_spacing)
+            await self.scraper.get_race_results(race, today.year, stage=stage)
+
+    async def run_cycle(self):
+        """Refresh every hot key that would expire before the next cycle."""
+        keys = list(self._pinned)
+        extra = list(self.watched_keys()) if self.watched_keys else []
+        for key in self.scraper.hot_keys(self.top_keys) + extra:
+            if key not in keys:
+                keys.append(key)
+
+        due = [key for key in keys if await self._is_due(key)]
+        self._cycles += 1
+        self._last_cycle_at = datetime.now()
+        self._last_cycle_due = len(due)
+
+        if due:
+            # Spread the refreshes over the cycle instead of bursting
+            spacing = max(self.min_spacing, self.interval / len(due))
+            for i, key in enumerate(due):
+                if i:
+                    await asyncio.sleep(spacing)
+                await self._wait_for_idle_limiter()
+                if await self._refresh(key):
+                    self._refreshed += 1
+                else:
+                    self._failed += 1
+
+        self.scraper.decay_access_counts()
+
+    async def _refresh(self, key: str) -> bool:
+        """Re-scrape a key, or fetch it for the first time if the scraper never loaded it."""
+        if self.scraper.tracks(key):
+            return await self.scraper.refresh(key)
+        load = key_loader(self.scraper, key)
+        if load is None:
+            return False
+        data = await load()
+        return "error" not in data
+
+    async def _wait_for_idle_limiter(self):
+        """Wait while interactive or normal scrapes are queued for a PCS token."""
+        limiter = self.scraper.rate_limiter
+        while limiter and limiter.queue_length(ahead_of=Priority.BACKGROUND):
+            self._deferred += 1
+            await asyncio.sleep(max(self.min_spacing, 0.1))
+
+    async def _is_due(self, key: str) -> bool:
+        """Whether a key is missing or turns stale before the next cycle."""
+        entry = await self.scraper.cache.peek_entry(key)
+        if entry is None:
+            return True
+        return (entry["stale_at"] - datetime.now()).total_seconds() < self.interval
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pre-warm statistics."""
+        return {
+            "interval": self.interval,
+            "pinned_keys": len(self._pinned),
+            "cycles": self._cycles,
+            "refreshed": self._refreshed,
+            "failed": self._failed,
+            "deferred": self._deferred,
+            "last_cycle_at": self._last_cycle_at.isoformat() if self._last_cycle_at else None,
+            "last_cycle_due": self._last_cycle_due
+        }
+
+
+def key_loader(scraper: PCSScraperService, key: str) -> Optional[Callable[[], Awaitable[Dict[str, Any]]]]:
+    """Scraper call fetching a ranking, race or startlist cache key; None for other keys."""
+    parts = key.split(":")
+    if parts[0] == "ranking" and len(parts) == 3:
+        if parts[2] not in ("individual", "teams", "nations") or not re.fullmatch(r"[a-z]{2}", parts[1]):
+            return None
+        return lambda: scraper.get_ranking(parts[2], parts[1])
+    if len(parts) < 3 or not parts[2].isdigit():
+        return None
+    slug, year = parts[1], int(parts[2])
+    if parts[0] == "startlist" and len(parts) == 3:
+        return lambda: scraper.get_race_startlist(slug, year)
+    if parts[0] == "race" and len(parts) == 4:
+        if parts[3] == "gc":
+            return lambda: scraper.get_race_results(slug, year)
+        match = re.fullmatch(r"stage-(\d+)", parts[3])
+        if match:
+            return lambda: scraper.get_race_results(slug, year, int(match.group(1)))
+    return None
+
+
+def current_grand_tour(today: date) -> Optional[str]:
+    """Slug of the Grand Tour running around `today`, if any."""
+    for slug, start, end in GRAND_TOURS:
+        if start <= (today.month, today.day) <= end:
+            return slug
+    return None
+
+
+def latest_stages(race: Dict[str, Any], today: date, count: int) -> List[int]:
+    """Numbers of the last `count` stages of a Race payload run by `today`."""
+    numbers = []
+    for stage in race.get("stages") or []:
+        match = re.search(r"stage-(\d+)", stage.get("stage_url") or "")
+        if not match:
+            continue
+        # Stage dates are "MM-DD"
+        day = parse_date(f"{today.year}-{stage.get('date')}")
+        if day is None or day <= today:
+            numbers.append(int(match.group(1)))
+    return numbers[-count:]
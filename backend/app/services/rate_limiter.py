@@ -0,0 +1,206 @@
+"""
+Rate Limiter Service
+
+Async token bucket placed in front of every procyclingstats request.
+Waiting callers are served by priority lane, so interactive API and chat
+requests go ahead of background refreshes. A request that may scrape
+many pages (a batch) sets a scrape allowance: past it, its scrapes wait
+in the background lane instead of queueing ahead of other users.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from contextvars import ContextVar
+from enum import IntEnum
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class Priority(IntEnum):
+    """Priority lanes for outbound PCS requests (lower is served first)."""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+# Lane used by scrapes started from the current request/task
+_current_priority: ContextVar[Priority] = ContextVar(
+    "pcs_priority", default=Priority.NORMAL
+)
+
+
+def set_priority(priority: Priority):
+    """Set the priority lane for PCS scrapes started from this context."""
+    _current_priority.set(priority)
+
+
+def current_priority() -> Priority:
+    """Get the priority lane of the current context."""
+    return _current_priority.get()
+
+
+class ScrapeAllowance:
+    """Number of scrapes a request may make ahead of the background lane."""
+
+    def __init__(self, limit: int):
+        self.remaining = limit
+        self.demoted = 0
+
+    def take(self, priority: Priority) -> Priority:
+        """Lane for the next scrape: `priority` while the allowance lasts, then background."""
+        if priority >= Priority.BACKGROUND:
+            return priority
+        if self.remaining > 0:
+            self.remaining -= 1
+            return priority
+        self.demoted += 1
+        return Priority.BACKGROUND
+
+
+# Allowance shared by the scrapes of the current request/task, if any
+_current_allowance: ContextVar[Optional[ScrapeAllowance]] = ContextVar(
+    "pcs_scrape_allowance", default=None
+)
+
+
+def set_allowance(allowance: Optional[ScrapeAllowance]):
+    """Limit the scrapes started from this context outside the background lane."""
+    _current_allowance.set(allowance)
+
+
+class TokenBucketRateLimiter:
+    """Token bucket with priority lanes and wait-time metrics."""
+
+    # Upper bounds (seconds) of the wait-time histogram buckets
+    WAIT_BUCKETS = (0.01, 0.1, 0.5, 1, 5, 15, 30, 60)
+
+    def __init__(self, rate_per_minute: int, burst: Optional[int] = None):
+        """
+        Args:
+            rate_per_minute: Sustained number of requests allowed per minute
+            burst: Bucket capacity (defaults to one minute's worth of tokens)
+        """
+        self.rate_per_minute = rate_per_minute
+        self.capacity = burst or rate_per_minute
+        self._rate = rate_per_minute / 60.0  # tokens per second
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+        # Heap of (priority, sequence, future) - FIFO within a lane
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # Metrics
+        self._wait_counts = [0] * (len(self.WAIT_BUCKETS) + 1)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._acquired = 0
+
+    async def acquire(self, priority: Optional[Priority] = None):
+        """
+        Wait for a token.
+
+        Args:
+            priority: Lane to wait in (defaults to the current context's lane)
+        """
+        if priority is None:
+            priority = current_priority()
+        allowance = _current_allowance.get()
+        if allowance is not None:
+            priority = allowance.take(priority)
+        started = time.monotonic()
+
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record_wait(0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        await future
+        self._record_wait(time.monotonic() - started)
+
+    async def close(self):
+        """Stop the dispatcher and release anyone still waiting."""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+        for _, _, future in self._waiters:
+            if not future.done():
+                future.cancel()
+        self._waiters.clear()
+
+    def _refill(self):
+        """Add the tokens accrued since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    async def _dispatch(self):
+        """Hand out tokens to waiters, highest priority lane first."""
+        while self._waiters:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+                continue
+
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Waiter was cancelled while queued
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+
+    def _record_wait(self, waited: float):
+        """Add a wait time to the histogram."""
+        self._acquired += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        for i, bound in enumerate(self.WAIT_BUCKETS):
+            if waited <= bound:
+                self._wait_counts[i] += 1
+                return
+        self._wait_counts[-1] += 1
+
+    def queue_length(self, ahead_of: Optional[Priority] = None) -> int:
+        """Number of callers currently waiting for a token, only in lanes ahead of `ahead_of` when given."""
+        return sum(
+            1 for priority, _, future in self._waiters
+            if not future.done() and (ahead_of is None or priority < ahead_of)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get rate limiter statistics."""
+        self._refill()
+        lanes = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                lanes[Priority(priority).name.lower()] += 1
+
+        buckets = {f"le_{bound}s": count for bound, count in zip(self.WAIT_BUCKETS, self._wait_counts)}
+        buckets["inf"] = self._wait_counts[-1]
+
+        return {
+            "rate_per_minute": self.rate_per_minute,
+            "burst": self.capacity,
+            "tokens_available": round(self._tokens, 2),
+            "queue_length": sum(lanes.values()),
+            "queue_by_lane": lanes,
+            "wait_seconds": {
+                "count": self._acquired,
+                "sum": round(self._wait_total, 3),
+                "max": round(self._wait_max, 3),
+                "buckets": buckets
+            }
+        }
@@ -0,0 +1,140 @@
+"""
+Redis Cache Backend
+
+Shared cache tier used when REDIS_URL is configured, so that every
+worker process reads the same scraped payloads instead of scraping PCS
+separately. Values are stored as msgpack, zlib-compressed when large.
+"""
+
+from typing import Any, Optional, Dict
+from datetime import datetime
+import time
+import zlib
+
+import msgpack
+
+from app.services.cache_service import CacheBackend
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis implementation of the shared cache backend."""
+
+    # Payloads larger than this are compressed before being stored
+    COMPRESS_THRESHOLD = 1024
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "pcs:",
+        max_connections: int = 20,
+        client: Any = None
+    ):
+        """
+        Args:
+            url: Redis URL, e.g. "redis://localhost:6379/0"
+            prefix: Namespace prepended to every key
+            max_connections: Size of the connection pool
+            client: Pre-built async Redis client (tests)
+        """
+        if client is None:
+            from redis.asyncio import Redis, ConnectionPool
+            pool = ConnectionPool.from_url(url, max_connections=max_connections)
+            client = Redis(connection_pool=pool)
+
+        self.client = client
+        self.prefix = prefix
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._bytes_written = 0
+
+    async def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get an entry; connection errors are treated as misses."""
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception:
+            self._errors += 1
+            return None
+
+        if raw is None:
+            self._misses += 1
+            return None
+
+        try:
+            payload = self._decode(raw)
+        except Exception:
+            self._errors += 1
+            return None
+
+        self._hits += 1
+        return {
+            "value": payload["v"],
+            "created_at": datetime.fromtimestamp(payload["c"]),
+            "stale_at": datetime.fromtimestamp(payload.get("s", payload["e"])),
+            "expires_at": datetime.fromtimestamp(payload["e"])
+        }
+
+    async def set(self, key: str, value: Any, ttl: int, stale_after: Optional[int] = None):
+        """Store a value with a Redis-side expiry of `ttl` seconds."""
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        stale_at = now + (ttl if stale_after is None else stale_after)
+        raw = self._encode({"v": value, "c": now, "s": stale_at, "e": now + ttl})
+        try:
+            await self.client.set(self.prefix + key, raw, ex=ttl)
+            self._bytes_written += len(raw)
+        except Exception:
+            self._errors += 1
+
+    async def delete(self, key: str):
+        """Delete a key."""
+        try:
+            await self.client.delete(self.prefix + key)
+        except Exception:
+            self._errors += 1
+
+    async def clear(self):
+        """Delete every key under this backend's prefix."""
+        try:
+            batch = []
+            async for key in self.client.scan_iter(match=self.prefix + "*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    await self.client.delete(*batch)
+                    batch = []
+            if batch:
+                await self.client.delete(*batch)
+        except Exception:
+            self._errors += 1
+
+    async def close(self):
+        """Close the client and its connection pool."""
+        await self.client.aclose()
+
+    def _encode(self, payload: Dict[str, Any]) -> bytes:
+        """Serialize to msgpack, compressing large payloads."""
+        packed = msgpack.packb(payload, default=str, use_bin_type=True)
+        if len(packed) > self.COMPRESS_THRESHOLD:
+            return b"z" + zlib.compress(packed, 6)
+        return b"m" + packed
+
+    @staticmethod
+    def _decode(raw: bytes) -> Dict[str, Any]:
+        """Inverse of `_encode`."""
+        if raw[:1] == b"z":
+            return msgpack.unpackb(zlib.decompress(raw[1:]), raw=False)
+        return msgpack.unpackb(raw[1:], raw=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+        return {
+            "backend": "redis",
+            "hits": self._hits,
+            "misses": self._misses,
+            "errors": self._errors,
+            "bytes_written": self._bytes_written
+        }
@@ -0,0 +1,115 @@
+"""
+Response Cache
+
+Caches chat answers (message, visualization and meta) keyed on the
+normalized question, the query plan and the versions (cache entry
+creation times) of the scraped pages the data came from. Identical
+questions over unchanged data skip the answer LLM call. The data itself
+is not stored: callers attach the data they just fetched.
+
+Each entry remembers the scrape cache keys its data came from and is
+dropped as soon as one of them is refreshed.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Set
+from collections import OrderedDict
+import hashlib
+import json
+import time
+
+# Parts of a chat result kept in the cache
+CACHED_FIELDS = ("message", "visualization", "meta")
+
+
+class ResponseCache:
+    """LRU + TTL cache of chat answers with scrape-key invalidation."""
+
+    def __init__(self, max_entries: int = 1000, ttl: int = 3600):
+        """
+        Args:
+            max_entries: Maximum number of cached answers
+            ttl: Seconds an answer stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Scrape cache key -> answer keys built from it
+        self._dependents: Dict[str, Set[str]] = {}
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def key(question_key: str, plan: Dict[str, Any], versions: Dict[str, str]) -> str:
+        """Answer key from the normalized question, plan and the versions of its scraped pages."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(question_key.encode())
+        digest.update(json.dumps(plan, sort_keys=True, default=str).encode())
+        for cache_key in sorted(versions):
+            digest.update(f"\n{cache_key}@{versions[cache_key]}".encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached answer (message, visualization, and a copy of its meta)."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() > entry["expires_at"]:
+            if entry is not None:
+                self._drop(key)
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        result = entry["result"]
+        return {**result, "meta": dict(result["meta"])}
+
+    def set(self, key: str, result: Dict[str, Any], depends_on: Iterable[str]):
+        """Cache the message, visualization and meta of an answer built from the given scrape cache keys."""
+        if key in self._entries:
+            self._drop(key)
+
+        deps = set(depends_on)
+        self._entries[key] = {
+            "result": {
+                name: dict(result[name]) if name == "meta" else result.get(name)
+                for name in CACHED_FIELDS
+            },
+            "deps": deps,
+            "expires_at": time.monotonic() + self.ttl
+        }
+        for dep in deps:
+            self._dependents.setdefault(dep, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def on_cache_set(self, cache_key: str, value: Any):
+        """CacheService listener: a refreshed scrape entry invalidates its answers."""
+        for key in self._dependents.pop(cache_key, ()):
+            if key in self._entries:
+                self._drop(key)
+                self._invalidations += 1
+
+    def _drop(self, key: str):
+        """Remove an answer and its dependency links."""
+        entry = self._entries.pop(key)
+        for dep in entry["deps"]:
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[dep]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get response cache statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self._invalidations
+        }
@@ -0,0 +1,387 @@
+"""
+Rider Index
+
+Index of every rider seen in scraped pages (startlists, team rosters,
+rankings, race results, rider profiles), used by EntityResolver to
+resolve and search rider names beyond its alias table.
+
+Each rider is indexed under its full name (in both name orders) and
+each name part. Lookups are:
+- exact: normalized key to slugs
+- prefix: binary search over the sorted keys (a flattened trie)
+- fuzzy: keys sharing enough trigrams with the query (counted over
+  compiled NumPy posting arrays), verified by a banded edit distance,
+  so typos ("pogacsr") still find the rider
+
+New riders are added incrementally: on the next lookup their keys are
+inserted into the sorted keys and appended to the posting arrays of
+their trigrams and to the key lengths, without rebuilding the rest.
+
+The index is fed by a CacheService listener as pages are scraped and
+saved to a JSON file periodically and on shutdown.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from bisect import bisect_left, insort
+import asyncio
+import json
+import os
+import re
+
+import numpy as np
+from unidecode import unidecode
+
+from app.utils.slug_utils import slug_to_name
+
+# Cache key prefixes of pages whose rows list riders
+FED_PREFIXES = ("startlist", "team", "ranking", "race")
+
+# Fuzzy candidates verified with the edit distance, by shared trigrams
+FUZZY_CANDIDATES = 20
+
+# New keys inserted one by one into the sorted keys; more are merged with a sort
+INSORT_MAX = 64
+
+
+class RiderIndex:
+    """Exact, prefix and typo-tolerant lookup of rider names."""
+
+    def __init__(self, path: Optional[str] = None, save_interval: int = 300):
+        """
+        Args:
+            path: JSON file the index is loaded from and saved to
+                (None keeps it in memory only)
+            save_interval: Seconds between saves of new riders
+        """
+        self.path = path
+        self.save_interval = save_interval
+        self._task: Optional[asyncio.Task] = None
+
+        # Slug -> name as scraped ("POGAČAR Tadej")
+        self._riders: Dict[str, str] = {}
+        # Normalized key -> slugs, and key id (position in _key_list)
+        self._keys: Dict[str, Set[str]] = {}
+        self._key_ids: Dict[str, int] = {}
+        self._key_list: List[str] = []
+        # Compiled lookup structures: sorted keys (prefix search), trigram
+        # posting arrays of key ids and key lengths. Keys added since the
+        # last lookup wait in _pending and are compiled in on the next one.
+        self._sorted: List[str] = []
+        self._postings: Dict[str, np.ndarray] = {}
+        self._lengths = np.zeros(0, dtype=np.int32)
+        self._pending: List[str] = []
+        self._dirty = False
+
+        # Counters
+        self._lookups = 0
+        self._fuzzy_resolved = 0
+        self._saves = 0
+
+    def __len__(self) -> int:
+        return len(self._riders)
+
+    def __contains__(self, slug: str) -> bool:
+        return slug in self._riders
+
+    async def start(self):
+        """Load the saved index and start saving new riders periodically."""
+        if self.path:
+            # Before serving requests: nothing else touches the index yet
+            await asyncio.to_thread(self._load)
+            self._task = asyncio.create_task(self._save_loop())
+
+    async def close(self):
+        """Stop the save loop and save new riders."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.save()
+
+    async def _save_loop(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.save()
+
+    async def save(self):
+        """Write the index to `path` if riders were added since the last save."""
+        if not self.path or not self._dirty:
+            return
+        self._dirty = False
+        await asyncio.to_thread(self._write, dict(self._riders))
+        self._saves += 1
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                riders = json.load(f).get("riders", {})
+        except (OSError, ValueError):
+            return
+        for slug, name in riders.items():
+            self.add(slug, name)
+        self._compile()
+        self._dirty = False
+
+    def _write(self, riders: Dict[str, str]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"riders": riders}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def add(self, slug: str, name: str) -> bool:
+        """Index a rider; returns False if already indexed under that name."""
+        name = " ".join(name.split())
+        if not slug or not name or self._riders.get(slug) == name:
+            return False
+
+        self._riders[slug] = name
+        for key in _index_keys(slug, *_split_name(name)):
+            slugs = self._keys.get(key)
+            if slugs is None:
+                slugs = self._keys[key] = set()
+                self._key_ids[key] = len(self._key_list)
+                self._key_list.append(key)
+                self._pending.append(key)
+            slugs.add(slug)
+        self._dirty = True
+        return True
+
+    def add_rows(self, rows: Iterable[Any]) -> int:
+        """Index the riders of parsed PCS rows (rider_url and rider_name); returns how many were new."""
+        added = 0
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            url = row.get("rider_url") or ""
+            if url.startswith("rider/") and row.get("rider_name"):
+                added += self.add(url[len("rider/"):].split("/")[0], row["rider_name"])
+        return added
+
+    def on_cache_set(self, key: str, value: Any):
+        """CacheService listener: index the riders of every scraped page."""
+        if not isinstance(value, dict) or "error" in value:
+            return
+        prefix, _, rest = key.partition(":")
+        if prefix == "rider" and isinstance(value.get("name"), str):
+            self.add(rest, value["name"])
+        elif prefix in FED_PREFIXES:
+            for table in value.values():
+                if isinstance(table, list):
+                    self.add_rows(table)
+
+    def name(self, slug: str) -> Optional[str]:
+        """Display name of an indexed rider ("Tadej Pogačar")."""
+        name = self._riders.get(slug)
+        if name is None:
+            return None
+        given, family = _split_name(name)
+        return " ".join(given + family)
+
+    def resolve(self, query: str) -> Optional[str]:
+        """
+        Slug of the one rider `query` names: a known slug, an exact name
+        or name part, or a single closest fuzzy match. None if unknown
+        or ambiguous.
+
+        Slug-shaped queries ("tom-pidcock-2") are never fuzzy-matched, so
+        an explicit slug is not rewritten to a different rider.
+        """
+        self._lookups += 1
+        key = _normalize(query)
+        if key.replace(" ", "-") in self._riders:
+            return key.replace(" ", "-")
+
+        slugs = self._keys.get(key)
+        if slugs:
+            return next(iter(slugs)) if len(slugs) == 1 else None
+        if "-" in query and " " not in query.strip():
+            return None
+
+        matches = self.fuzzy(key)
+        if not matches:
+            return None
+        best = matches[0][1]
+        slugs = set()
+        for match_key, distance in matches:
+            if distance == best:
+                slugs |= self._keys[match_key]
+        if len(slugs) == 1:
+            self._fuzzy_resolved += 1
+            return slugs.pop()
+        return None
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Riders whose name starts with `query`, then fuzzy matches, best first."""
+        self._lookups += 1
+        key = _normalize(query)
+        results: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+
+        def _collect(keys: Iterable[str], match_type: str):
+            for match_key in keys:
+                for slug in sorted(self._keys[match_key]):
+                    if slug not in seen and len(results) < limit:
+                        seen.add(slug)
+                        results.append({"name": self.name(slug), "slug": slug, "match_type": match_type})
+
+        if key:
+            _collect(self.prefixed(key, limit), "prefix")
+            if len(results) < limit:
+                _collect((k for k, _ in self.fuzzy(key)), "fuzzy")
+        return results
+
+    def _compile(self):
+        """Add the keys indexed since the last lookup to the lookup structures."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        if len(pending) <= INSORT_MAX:
+            for key in pending:
+                insort(self._sorted, key)
+        else:
+            # Two sorted runs: merged in linear time by the sort
+            self._sorted.extend(sorted(pending))
+            self._sorted.sort()
+
+        # Pending keys are the last ids, so every posting array stays sorted
+        new_ids: Dict[str, List[int]] = {}
+        for key in pending:
+            key_id = self._key_ids[key]
+            for gram in _trigrams(key):
+                new_ids.setdefault(gram, []).append(key_id)
+        for gram, ids in new_ids.items():
+            ids_array = np.array(ids, dtype=np.int32)
+            postings = self._postings.get(gram)
+            self._postings[gram] = ids_array if postings is None else np.concatenate([postings, ids_array])
+
+        lengths = np.array([len(key) for key in pending], dtype=np.int32)
+        self._lengths = np.concatenate([self._lengths, lengths])
+
+    def prefixed(self, prefix: str, limit: int = 10) -> List[str]:
+        """Up to `limit` indexed keys starting with `prefix`, shortest first."""
+        self._compile()
+        keys = []
+        i = bisect_left(self._sorted, prefix)
+        # Scan a few more than `limit` so exact and short keys rank first
+        while i < len(self._sorted) and len(keys) < limit * 4 and self._sorted[i].startswith(prefix):
+            keys.append(self._sorted[i])
+            i += 1
+        keys.sort(key=len)
+        return keys[:limit]
+
+    def fuzzy(self, key: str) -> List[Tuple[str, int]]:
+        """(key, edit distance) of indexed keys within the typo budget of `key`, closest first."""
+        self._compile()
+        max_distance = _max_distance(len(key))
+        grams = _trigrams(key)
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not postings:
+            return []
+
+        counts = np.bincount(np.concatenate(postings), minlength=len(self._key_list))
+        # An edit changes at most 3 trigrams, and the length by at most 1
+        mask = counts >= max(1, len(grams) - 3 * max_distance)
+        mask &= np.abs(self._lengths - len(key)) <= max_distance
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > FUZZY_CANDIDATES:
+            candidates = candidates[np.argpartition(-counts[candidates], FUZZY_CANDIDATES)[:FUZZY_CANDIDATES]]
+
+        matches = []
+        for key_id in candidates:
+            candidate = self._key_list[key_id]
+            distance = _edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((candidate, distance))
+        matches.sort(key=lambda match: (match[1], len(match[0])))
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        """Get rider index statistics."""
+        return {
+            "riders": len(self._riders),
+            "keys": len(self._key_list),
+            "lookups": self._lookups,
+            "fuzzy_resolved": self._fuzzy_resolved,
+            "saves": self._saves,
+            "path": self.path
+        }
+
+
+def _normalize(text: str) -> str:
+    """Lowercase ASCII words separated by single spaces."""
+    return " ".join(re.findall(r"[a-z0-9]+", unidecode(text).lower()))
+
+
+def _split_name(name: str) -> Tuple[List[str], List[str]]:
+    """
+    Given and family name parts. PCS tables list riders as
+    "VAN AERT Wout" (family name in capitals first); other names are
+    taken as "Wout van Aert" with the last part as family name.
+    """
+    parts = name.split()
+    family = []
+    while parts and parts[0].isupper() and len(parts[0]) > 1:
+        family.append(parts.pop(0).title())
+    if family and parts:
+        return parts, family
+    parts = family + parts
+    return parts[:-1], parts[-1:]
+
+
+def _index_keys(slug: str, given: List[str], family: List[str]) -> Set[str]:
+    """Normalized keys a rider is found under."""
+    given_key = _normalize(" ".join(given))
+    family_key = _normalize(" ".join(family))
+    keys = {
+        f"{given_key} {family_key}".strip(),
+        # Family name first, as PCS and users often write it
+        f"{family_key} {given_key}".strip(),
+        family_key,
+        _normalize(slug_to_name(slug)),
+    }
+    keys.update(word for word in f"{given_key} {family_key}".split() if len(word) >= 3)
+    keys.discard("")
+    return keys
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_distance(length: int) -> int:
+    """Typos tolerated in a query of `length` characters."""
+    if length < 4:
+        return 0
+    return 1 if length < 9 else 2
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance of a and b, or limit + 1 once it exceeds `limit`.
+    Only the diagonal band of width 2 * limit + 1 is computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [i if i <= limit else over] + [over] * len(b)
+        ca = a[i - 1]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != b[j - 1]),
+                over
+            )
+        if min(current) > limit:
+            return over
+        previous = current
+    return previous[-1]
@@ -0,0 +1,151 @@
+"""
+Rule-based Query Planner
+
+Deterministic fast path in front of the LLM planner. Questions that map
+to a single intent over entities known to the EntityResolver alias
+tables ("Pogacar victories 2024", "classifica", "startlist giro 2025")
+are planned with keyword, year and stage extraction in Italian and
+English. Anything the rules do not fully understand returns None and is
+left to the LLM.
+"""
+
+from typing import Any, Dict, List, Optional, Set
+import re
+
+from app.services.entity_resolver import EntityResolver
+from app.services.plan_cache import STOPWORDS
+
+
+# Intent keywords, matched on normalized tokens
+KEYWORDS = {
+    "ranking": {"classifica", "classifiche", "ranking", "rankings", "standings", "uci", "pcs"},
+    "startlist": {"startlist", "partenti", "iscritti", "start", "list", "racing", "corre"},
+    "victories": {"vittorie", "vittoria", "victories", "victory", "wins", "vinto", "vince", "won"},
+    "results": {"risultati", "risultato", "results", "result", "ordine", "arrivo", "winner",
+                "vincitore", "win", "generale", "gc", "podio", "podium"},
+    "compare": {"confronta", "confronto", "compare", "comparison", "vs", "versus", "contro"},
+    "team": {"squadra", "team", "corridori", "riders", "roster", "rosa"},
+    "info": {"profilo", "profile", "info", "chi", "who", "stats", "statistiche",
+             "carriera", "career", "eta", "age"},
+    "stage": {"tappa", "stage", "etapa"},
+    "teams_ranking": {"squadre", "teams"},
+    "nations_ranking": {"nazioni", "nations", "nazionali"},
+}
+
+ALL_KEYWORDS: Set[str] = set().union(*KEYWORDS.values())
+
+ORDINAL_PATTERN = re.compile(r"\d+(?:st|nd|rd|th|a|o)?")
+YEAR_PATTERN = re.compile(r"\b(19[89]\d|20\d{2})\b")
+STAGE_PATTERN = re.compile(
+    r"\b(?:stage|tappa|etapa)\s+(\d{1,2})\b|\b(\d{1,2})(?:st|nd|rd|th|a|°|ª)?\s+(?:stage|tappa|etapa)\b"
+)
+
+# Default visualization per intent (as the LLM planner would pick)
+VISUALIZATIONS = {
+    "rider_victories": "bar_chart",
+    "comparison": "radar_chart",
+    "ranking": "table",
+}
+
+
+class RulePlanner:
+    """Plans simple cycling questions without an LLM call."""
+
+    def __init__(self, resolver: EntityResolver):
+        self.resolver = resolver
+        self.rider_slugs = set(resolver.RIDER_ALIASES.values())
+        self.race_slugs = set(resolver.RACE_ALIASES.values())
+        self.team_slugs = set(resolver.TEAM_ALIASES.values())
+
+    def plan(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Plan a question.
+
+        Returns:
+            A query plan in the LLM planner's format, or None when the
+            question is not confidently understood.
+        """
+        text = self.resolver.canonicalize(question)
+
+        year_match = YEAR_PATTERN.search(text)
+        year = int(year_match.group(1)) if year_match else None
+        stage_match = STAGE_PATTERN.search(text)
+        stage = int(stage_match.group(1) or stage_match.group(2)) if stage_match else None
+
+        riders: List[str] = []
+        races: List[str] = []
+        teams: List[str] = []
+        words: Set[str] = set()
+
+        for token in re.findall(r"[a-z0-9][a-z0-9-]*", text):
+            if token in self.rider_slugs:
+                _append_once(riders, token)
+            elif token in self.race_slugs:
+                _append_once(races, token)
+            elif token in self.team_slugs:
+                _append_once(teams, token)
+            elif ORDINAL_PATTERN.fullmatch(token):
+                continue
+            elif token in ALL_KEYWORDS:
+                words.add(token)
+            elif token not in STOPWORDS:
+                # Unknown word (maybe a rider we have no alias for): not confident
+                return None
+
+        def has(group: str) -> bool:
+            return bool(words & KEYWORDS[group])
+
+        intent = None
+        filters: Dict[str, Any] = {"year": year, "limit": 10}
+
+        if len(riders) >= 2 and not races and not teams:
+            intent = "comparison"
+        elif riders and not races and not teams:
+            if has("victories"):
+                intent = "rider_victories"
+            elif has("results"):
+                intent = "rider_results"
+            else:
+                intent = "rider_info"
+        elif races and not riders and not teams:
+            if has("startlist"):
+                intent = "race_startlist"
+            else:
+                intent = "race_results"
+        elif teams and not riders and not races:
+            if has("ranking"):
+                return None
+            intent = "team_info"
+        elif not riders and not races and not teams and has("ranking"):
+            intent = "ranking"
+            if has("teams_ranking") or has("team"):
+                filters["ranking_type"] = "teams"
+            elif has("nations_ranking"):
+                filters["ranking_type"] = "nations"
+            else:
+                filters["ranking_type"] = "individual"
+
+        if intent is None:
+            return None
+        if stage is not None and intent != "race_results":
+            return None
+
+        return {
+            "intent": intent,
+            "entities": {
+                "riders": riders,
+                "races": races,
+                "teams": teams,
+                "year": year,
+                "stage": stage
+            },
+            "filters": filters,
+            "visualization": VISUALIZATIONS.get(intent, "none"),
+            "comparison_mode": intent == "comparison"
+        }
+
+
+def _append_once(items: List[str], item: str):
+    """Append an item if not already present, keeping order."""
+    if item not in items:
+        items.append(item)
@@ -0,0 +1,140 @@
+"""
+Snapshot Store
+
+Persistent on-disk tier under CacheService for pages that no longer
+change (finished races, past seasons), so a restarted worker serves
+them without scraping PCS again.
+
+Backed by a single SQLite file indexed by cache key, opened lazily on
+first use and read through SQLite's memory-mapped I/O. Values are
+stored as zlib-compressed compact JSON.
+"""
+
+from typing import Any, Dict, Optional
+from datetime import datetime
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class SnapshotStore:
+    """SQLite store of immutable cache entries keyed by cache key."""
+
+    def __init__(self, path: str, mmap_size: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite file path (parent directories are created)
+            mmap_size: Bytes of the file SQLite may memory-map
+        """
+        self.path = path
+        self.mmap_size = mmap_size
+        self._conn: Optional[sqlite3.Connection] = None
+        # One connection shared by the worker threads
+        self._lock = threading.Lock()
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and drop expired snapshots."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("DELETE FROM snapshots WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    async def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a snapshot as a cache entry; snapshots are never stale."""
+        try:
+            row = await asyncio.to_thread(self._get, key)
+        except sqlite3.Error:
+            self._errors += 1
+            return None
+
+        if row is None or row[2] < time.time():
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        expires_at = datetime.fromtimestamp(row[2])
+        return {
+            "value": json.loads(zlib.decompress(row[0])),
+            "created_at": datetime.fromtimestamp(row[1]),
+            "stale_at": expires_at,
+            "expires_at": expires_at
+        }
+
+    def _get(self, key: str):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT value, created_at, expires_at FROM snapshots WHERE key = ?", (key,)
+            ).fetchone()
+
+    async def set(self, key: str, value: Any, ttl: int):
+        """Persist a value for `ttl` seconds."""
+        now = time.time()
+        blob = zlib.compress(json.dumps(value, separators=(",", ":"), default=str).encode(), 6)
+        try:
+            await asyncio.to_thread(self._execute, (
+                "INSERT OR REPLACE INTO snapshots (key, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?)"
+            ), (key, blob, now, now + ttl))
+            self._writes += 1
+        except sqlite3.Error:
+            self._errors += 1
+
+    async def delete(self, key: str):
+        """Delete a snapshot."""
+        try:
+            await asyncio.to_thread(self._execute, "DELETE FROM snapshots WHERE key = ?", (key,))
+        except sqlite3.Error:
+            self._errors += 1
+
+    async def clear(self):
+        """Delete every snapshot."""
+        try:
+            await asyncio.to_thread(self._execute, "DELETE FROM snapshots", ())
+        except sqlite3.Error:
+            self._errors += 1
+
+    def _execute(self, sql: str, params: tuple):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(sql, params)
+            conn.commit()
+
+    async def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get snapshot store statistics."""
+        return {
+            "path": self.path,
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "hits": self._hits,
+            "misses": self._misses,
+            "writes": self._writes,
+            "errors": self._errors
+        }
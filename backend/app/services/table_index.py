@@ -0,0 +1,149 @@
+"""
+Table Index
+
+Server-side paging, projection and filtering of the row tables in
+scraped payloads (rankings, race results, startlists).
+
+Each cached table is converted once to a columnar form (see
+`app.services.columnar`), memoized for as long as the cached payload
+object stays the same. Requests then filter, sort and take the top rows
+with vectorized operations and materialize only the rows and columns
+they return, instead of slicing (or mutating) the cached payload.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import re
+
+from app.services.columnar import CategoryColumn, ColumnarTable, IntColumn
+from app.utils.slug_utils import name_to_slug
+
+
+@dataclass
+class TableQuery:
+    """Paging, projection and filter parameters of a table request."""
+    offset: int = 0
+    limit: Optional[int] = None
+    fields: Optional[List[str]] = None
+    team: Optional[str] = None
+    nationality: Optional[str] = None
+    rank_min: Optional[int] = None
+    rank_max: Optional[int] = None
+    sort: Optional[str] = None  # column, "-column" for descending
+
+
+class TableIndexCache:
+    """Memoizes one ColumnarTable per cached payload table, LRU-bounded."""
+
+    def __init__(self, max_tables: int = 64):
+        self.max_tables = max_tables
+        # (id(payload), table) -> (payload, index); the payload reference
+        # keeps its id from being reused while memoized
+        self._indexes: "OrderedDict[Tuple[int, str], Tuple[Dict[str, Any], ColumnarTable]]" = OrderedDict()
+        self._builds = 0
+        self._hits = 0
+
+    def index(self, payload: Dict[str, Any], table: str) -> ColumnarTable:
+        """Get the columnar form of `payload[table]`, building it on first use."""
+        key = (id(payload), table)
+        memo = self._indexes.get(key)
+        if memo is not None and memo[0] is payload:
+            self._indexes.move_to_end(key)
+            self._hits += 1
+            return memo[1]
+
+        index = ColumnarTable.from_rows(payload.get(table) or [])
+        self._indexes[key] = (payload, index)
+        self._builds += 1
+        while len(self._indexes) > self.max_tables:
+            self._indexes.popitem(last=False)
+        return index
+
+    def query(
+        self,
+        payload: Dict[str, Any],
+        table: str,
+        query: TableQuery,
+        keep: Sequence[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Build a response with one page of `payload[table]`.
+
+        Scalar fields of the payload are kept, other tables are dropped
+        except those named in `keep`.
+        """
+        total, rows = select(self.index(payload, table), query)
+        response = {
+            key: value for key, value in payload.items()
+            if key in keep or not isinstance(value, (list, dict))
+        }
+        response[table] = rows
+        response["total"] = total
+        response["offset"] = query.offset
+        response["limit"] = query.limit
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Get table index statistics."""
+        return {
+            "tables": len(self._indexes),
+            "max_tables": self.max_tables,
+            "builds": self._builds,
+            "hits": self._hits,
+            "bytes": sum(index.nbytes() for _, index in self._indexes.values())
+        }
+
+
+def select(table: ColumnarTable, query: TableQuery) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Apply filters, sort, paging and projection.
+
+    Returns:
+        (number of rows matching the filters, projected page rows)
+    """
+    mask = table.all()
+
+    if query.team:
+        team = name_to_slug(query.team)
+        matched = None
+        name = table.column("team_name")
+        if isinstance(name, CategoryColumn):
+            matched = name.matching(lambda value: _team_matches(name_to_slug(value), team))
+        url = table.column("team_url")
+        if isinstance(url, CategoryColumn):
+            by_url = url.matching(lambda value: _team_matches(_team_url_slug(value), team))
+            matched = by_url if matched is None else matched | by_url
+        mask &= matched if matched is not None else False
+
+    if query.nationality:
+        nationality = query.nationality.upper()
+        column = table.column("nationality")
+        if isinstance(column, CategoryColumn):
+            mask &= column.matching(lambda value: value.upper() == nationality)
+        else:
+            mask &= False
+
+    if query.rank_min is not None or query.rank_max is not None:
+        column = table.column("rank")
+        if isinstance(column, IntColumn):
+            mask &= column.between(query.rank_min, query.rank_max)
+        else:
+            mask &= False
+
+    total = int(mask.sum())
+    end = None if query.limit is None else query.offset + query.limit
+    positions = table.order(mask, query.sort, top=end)
+    return total, table.rows(positions[query.offset:end], query.fields)
+
+
+def _team_matches(slug: str, team: str) -> bool:
+    """Whether a team slug is the requested team ("uae" matches "uae-team-emirates")."""
+    return slug == team or slug.startswith(team + "-")
+
+
+def _team_url_slug(url: str) -> str:
+    """Team slug from a team URL, without the season ("team/uae-team-emirates-2024")."""
+    if not url.startswith("team/"):
+        return ""
+    return re.sub(r"-\d{4}$", "", url[len("team/"):].split("/")[0])
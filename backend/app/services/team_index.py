@@ -0,0 +1,169 @@
+"""
+Team Season Index
+
+Maps a team slug and a season to the slug PCS used for the team that
+season. Teams change names with their sponsors, so the current alias
+("team-visma-lease-a-bike") is wrong for older seasons ("jumbo-visma"
+in 2023, "team-jumbo-visma" before).
+
+Every team page lists the team's seasons (`history_select`); each list
+is stored as a lineage (season -> slug), and every slug of the lineage
+points to it. The index is fed by a CacheService listener as team
+pages are scraped and saved to a JSON file periodically and on shutdown.
+"""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import os
+import re
+
+# "team/jumbo-visma-2023/overview/" or "team/jumbo-visma/2023/overview"
+SEASON_URL = re.compile(r"team/([a-z0-9-]+?)(?:-|/)(\d{4})(?:/|$)")
+
+
+class TeamIndex:
+    """Season-aware team slug lookup built from team pages."""
+
+    def __init__(self, path: Optional[str] = None, save_interval: int = 300):
+        """
+        Args:
+            path: JSON file the index is loaded from and saved to
+                (None keeps it in memory only)
+            save_interval: Seconds between saves of new lineages
+        """
+        self.path = path
+        self.save_interval = save_interval
+        self._task: Optional[asyncio.Task] = None
+
+        # Lineages (season -> slug) and slug -> lineage position
+        self._lineages: List[Dict[int, str]] = []
+        self._by_slug: Dict[str, int] = {}
+        self._dirty = False
+
+        # Counters
+        self._resolved = 0
+        self._missing_seasons = 0
+        self._saves = 0
+
+    def __contains__(self, slug: str) -> bool:
+        return slug in self._by_slug
+
+    async def start(self):
+        """Load the saved index and start saving new lineages periodically."""
+        if self.path:
+            await asyncio.to_thread(self._load)
+            self._task = asyncio.create_task(self._save_loop())
+
+    async def close(self):
+        """Stop the save loop and save new lineages."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.save()
+
+    async def _save_loop(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.save()
+
+    async def save(self):
+        """Write the index to `path` if lineages changed since the last save."""
+        if not self.path or not self._dirty:
+            return
+        self._dirty = False
+        lineages = [{str(year): slug for year, slug in lineage.items()} for lineage in self._lineages]
+        await asyncio.to_thread(self._write, lineages)
+        self._saves += 1
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lineages = json.load(f).get("lineages", [])
+        except (OSError, ValueError):
+            return
+        for lineage in lineages:
+            self.add({int(year): slug for year, slug in lineage.items()})
+        self._dirty = False
+
+    def _write(self, lineages: List[Dict[str, str]]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"lineages": lineages}, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def add(self, seasons: Dict[int, str]) -> bool:
+        """
+        Store a team's seasons, merging lineages that share a slug.
+        Returns False if nothing was new.
+        """
+        positions = {self._by_slug[slug] for slug in seasons.values() if slug in self._by_slug}
+        merged: Dict[int, str] = {}
+        for position in sorted(positions):
+            merged.update(self._lineages[position])
+        if positions and all(merged.get(year) == slug for year, slug in seasons.items()):
+            return False
+        merged.update(seasons)
+
+        # Reuse the first lineage slot; the others are emptied
+        target = min(positions) if positions else len(self._lineages)
+        if target == len(self._lineages):
+            self._lineages.append({})
+        for position in positions:
+            self._lineages[position] = {}
+        self._lineages[target] = merged
+        for slug in merged.values():
+            self._by_slug[slug] = target
+        self._dirty = True
+        return True
+
+    def on_cache_set(self, key: str, value: Any):
+        """CacheService listener: index the season list of every team page."""
+        if key.startswith("team:") and isinstance(value, dict) and "error" not in value:
+            seasons = parse_seasons(value.get("history_select") or [])
+            if seasons:
+                self.add(seasons)
+
+    def resolve(self, slug: str, year: int) -> Optional[str]:
+        """Slug of `slug`'s team in `year`; None if the team or season is unknown."""
+        position = self._by_slug.get(slug)
+        if position is None:
+            return None
+        season_slug = self._lineages[position].get(year)
+        if season_slug is None:
+            self._missing_seasons += 1
+        else:
+            self._resolved += 1
+        return season_slug
+
+    def seasons(self, slug: str) -> Dict[int, str]:
+        """All known seasons of `slug`'s team."""
+        position = self._by_slug.get(slug)
+        return dict(self._lineages[position]) if position is not None else {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Get team index statistics."""
+        return {
+            "teams": sum(1 for lineage in self._lineages if lineage),
+            "slugs": len(self._by_slug),
+            "resolved": self._resolved,
+            "missing_seasons": self._missing_seasons,
+            "saves": self._saves,
+            "path": self.path
+        }
+
+
+def parse_seasons(history: List[Dict[str, str]]) -> Dict[int, str]:
+    """Season -> slug from a parsed `history_select` menu."""
+    seasons = {}
+    for option in history:
+        match = SEASON_URL.search(option.get("value") or "")
+        if match:
+            seasons[int(match.group(2))] = match.group(1)
+    return seasons
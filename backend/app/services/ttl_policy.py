@@ -0,0 +1,188 @@
+"""
+Cache TTL Policy
+
+Chooses how long scraped PCS data is cached from where it sits in the
+race calendar:
+- historical: a past season, never changes again
+- final: a race of this season that is over (results may still be
+  corrected for a little while)
+- live: a race in progress (or today's stage), refreshed quickly
+- upcoming: a race that has not started yet
+
+Pages that are not tied to a race day (rider profiles, rankings) keep
+their configured TTLs. Final and historical pages are persisted to the
+snapshot store. The policy also counts the scrapes it saved: hits
+on entries older than the TTL the scraper used before the policy.
+"""
+
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from collections import OrderedDict
+from datetime import date, timedelta
+from enum import Enum
+
+from app.utils.date_utils import parse_date
+
+
+class Freshness(str, Enum):
+    """Where a page sits in the race calendar."""
+    HISTORICAL = "historical"
+    FINAL = "final"
+    LIVE = "live"
+    UPCOMING = "upcoming"
+
+
+class Lifetime(NamedTuple):
+    """TTL chosen for a page and the calendar class it was chosen from."""
+    ttl: int
+    freshness: Freshness
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the page no longer changes (final or historical) and can be persisted."""
+        return self.freshness in (Freshness.FINAL, Freshness.HISTORICAL)
+
+
+# TTLs used for every page before the policy, by cache key prefix
+LEGACY_TTLS = {
+    "rider": 900,
+    "race": 900,
+    "startlist": 1800,
+    "team": 3600,
+    "ranking": 600,
+}
+
+# Days after a race's last day during which it is still treated as live
+# (late results, jury decisions)
+LIVE_GRACE_DAYS = 1
+
+
+class TTLPolicy:
+    """Race-calendar-aware TTLs for scraped pages."""
+
+    def __init__(
+        self,
+        live_ttl: int = 300,
+        upcoming_ttl: int = 3600,
+        final_ttl: int = 86400,
+        historical_ttl: int = 30 * 86400,
+        rider_ttl: int = 900,
+        ranking_ttl: int = 600,
+        startlist_ttl: int = 1800,
+        team_ttl: int = 3600,
+        today: Callable[[], date] = date.today,
+        max_tracked: int = 10000
+    ):
+        """
+        Args:
+            live_ttl: TTL of races in progress
+            upcoming_ttl: TTL of races that have not started
+            final_ttl: TTL of finished races of the current season
+            historical_ttl: TTL of past seasons
+            rider_ttl: TTL of rider profiles
+            ranking_ttl: TTL of rankings
+            startlist_ttl: TTL of current-season startlists
+            team_ttl: TTL of current-season team pages
+            today: Clock used for classification (tests)
+            max_tracked: Keys tracked for the saved-scrapes counter
+        """
+        self.ttls = {
+            Freshness.LIVE: live_ttl,
+            Freshness.UPCOMING: upcoming_ttl,
+            Freshness.FINAL: final_ttl,
+            Freshness.HISTORICAL: historical_ttl,
+        }
+        self.rider_ttl = rider_ttl
+        self.ranking_ttl = ranking_ttl
+        self.startlist_ttl = startlist_ttl
+        self.team_ttl = team_ttl
+        self.today = today
+        self.max_tracked = max_tracked
+
+        # Cache key -> legacy TTL windows already counted as saved
+        self._saved_windows: "OrderedDict[str, int]" = OrderedDict()
+        self._saved_scrapes = 0
+        self._decisions = {freshness.value: 0 for freshness in Freshness}
+
+    def classify_race(self, year: int, data: Optional[Dict[str, Any]] = None) -> Freshness:
+        """
+        Classify a race (GC) or stage page.
+
+        Uses the race's startdate/enddate or the stage date when the
+        payload has them, otherwise the year alone.
+        """
+        today = self.today()
+        data = data or {}
+        start = parse_date(data.get("startdate") or data.get("date") or "")
+        end = parse_date(data.get("enddate") or data.get("date") or "")
+
+        if start is None or end is None:
+            return self.classify_season(year)
+        if today < start:
+            return Freshness.UPCOMING
+        if today <= end + timedelta(days=LIVE_GRACE_DAYS):
+            return Freshness.LIVE
+        if end.year < today.year:
+            return Freshness.HISTORICAL
+        return Freshness.FINAL
+
+    def classify_season(self, year: int) -> Freshness:
+        """Classify a page from its season only."""
+        current = self.today().year
+        if year < current:
+            return Freshness.HISTORICAL
+        if year > current:
+            return Freshness.UPCOMING
+        return Freshness.LIVE
+
+    def race_ttl(self, year: int, data: Dict[str, Any]) -> Lifetime:
+        """Lifetime of a scraped race or stage page."""
+        return self._decide(self.classify_race(year, data))
+
+    def season_ttl(self, year: int, current_ttl: int, data: Optional[Dict[str, Any]] = None) -> Lifetime:
+        """Lifetime of a per-season page (startlist, team): past seasons are frozen."""
+        freshness = self.classify_season(year)
+        if freshness == Freshness.HISTORICAL:
+            return self._decide(freshness)
+        self._decisions[freshness.value] += 1
+        return Lifetime(current_ttl, freshness)
+
+    def _decide(self, freshness: Freshness) -> Lifetime:
+        """Count a classification and return its lifetime."""
+        self._decisions[freshness.value] += 1
+        return Lifetime(self.ttls[freshness], freshness)
+
+    def record_hit(self, cache_key: str, age: float):
+        """
+        Count a cache hit that the legacy TTL would have turned into a
+        scrape: one per legacy TTL window the entry has outlived.
+        """
+        legacy = LEGACY_TTLS.get(cache_key.split(":", 1)[0])
+        if not legacy:
+            return
+
+        window = int(age // legacy)
+        if window < 1:
+            # Entry refreshed within the legacy TTL: start over
+            self._saved_windows.pop(cache_key, None)
+            return
+
+        if window > self._saved_windows.get(cache_key, 0):
+            self._saved_scrapes += 1
+            self._saved_windows[cache_key] = window
+            self._saved_windows.move_to_end(cache_key)
+            while len(self._saved_windows) > self.max_tracked:
+                self._saved_windows.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get TTL policy statistics."""
+        return {
+            "saved_scrapes": self._saved_scrapes,
+            "decisions": dict(self._decisions),
+            "ttls": {
+                **{freshness.value: ttl for freshness, ttl in self.ttls.items()},
+                "rider": self.rider_ttl,
+                "ranking": self.ranking_ttl,
+                "startlist": self.startlist_ttl,
+                "team": self.team_ttl
+            }
+        }
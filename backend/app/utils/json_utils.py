@@ -0,0 +1,22 @@
+"""JSON encoding utilities."""
+
+from typing import Any
+import json
+
+import orjson
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_json(value: Any) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Uses orjson; values it cannot handle (e.g. integers wider than 64
+    bits) fall back to the standard library. Unknown types are encoded
+    as strings in both cases.
+    """
+    try:
+        return orjson.dumps(value, default=str, option=_OPTIONS)
+    except (TypeError, orjson.JSONEncodeError):
+        return json.dumps(value, separators=(",", ":"), default=str, ensure_ascii=False).encode()
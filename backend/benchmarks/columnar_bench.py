@@ -0,0 +1,105 @@
+"""
+Columnar table benchmark.
+
+Compares a synthetic 2000-rider ranking held as parsed JSON rows with
+its ColumnarTable form: the memory the table adds on top of the cached
+rows (both are kept while the payload is cached), and the latency of a typical
+table request (team filter, sort by points, top 20) done with plain
+Python over the rows versus vectorized over the columns.
+
+Run from the backend directory:
+    python -m benchmarks.columnar_bench
+"""
+
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from app.services.columnar import ColumnarTable
+from app.services.table_index import TableQuery, select
+from app.utils.slug_utils import name_to_slug
+
+RIDERS = 2000
+ROUNDS = 200
+TEAMS = [f"Team {name} Cycling" for name in (
+    "Alpha", "Bravo", "Charlie", "Delta", "Echo", "Foxtrot", "Golf", "Hotel", "India",
+    "Juliett", "Kilo", "Lima", "Mike", "November", "Oscar", "Papa", "Quebec", "Romeo",
+)]
+NATIONS = ["BE", "FR", "IT", "ES", "NL", "SI", "DK", "GB", "US", "CO", "AU", "DE"]
+
+
+def ranking_json() -> str:
+    """A ranking payload as it comes back from the cache (JSON text)."""
+    rng = random.Random(42)
+    rows = []
+    for i in range(1, RIDERS + 1):
+        team = rng.choice(TEAMS)
+        rows.append({
+            "rank": i,
+            "prev_rank": i + rng.randint(-20, 20),
+            "rider_name": f"Rider{i} Name{i}",
+            "rider_url": f"rider/rider{i}-name{i}",
+            "team_name": team,
+            "team_url": f"team/{name_to_slug(team)}-2024",
+            "nationality": rng.choice(NATIONS),
+            "points": max(0, 5000 - i * 2 + rng.randint(-50, 50)),
+        })
+    return json.dumps({"ranking": rows})
+
+
+def measure(build):
+    """Bytes allocated by `build()` and its result."""
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, value
+
+
+def python_query(rows, team):
+    """The same request over the rows, in plain Python."""
+    hits = [r for r in rows if name_to_slug(r["team_name"]).startswith(team)]
+    hits.sort(key=lambda r: -r["points"])
+    return len(hits), [{"rank": r["rank"], "rider_name": r["rider_name"]} for r in hits[:20]]
+
+
+def timed(func):
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return timings
+
+
+def main():
+    text = ranking_json()
+    rows_bytes, payload = measure(lambda: json.loads(text))
+    # Built from its own parse, so only what the columnar form retains is counted
+    table_bytes, table = measure(lambda: ColumnarTable.from_rows(json.loads(text)["ranking"]))
+
+    started = time.perf_counter()
+    ColumnarTable.from_rows(payload["ranking"])
+    build_ms = (time.perf_counter() - started) * 1e3
+
+    query = TableQuery(limit=20, fields=["rank", "rider_name"], team="team-delta", sort="-points")
+    expected = python_query(payload["ranking"], "team-delta")
+    assert select(table, query) == expected
+
+    rows_timings = timed(lambda: python_query(payload["ranking"], "team-delta"))
+    table_timings = timed(lambda: select(table, query))
+
+    print(f"rows:             {RIDERS}")
+    print(f"memory (KiB):     rows {rows_bytes / 1024:.0f}, columnar adds {table_bytes / 1024:.0f} "
+          f"per table (+{table_bytes / rows_bytes:.0%})")
+    print(f"columnar build:   {build_ms:.1f} ms (once per cached payload)")
+    for label, timings in (("rows", rows_timings), ("columnar", table_timings)):
+        print(f"query {label + ' (us):':14} mean {statistics.mean(timings):.1f}, "
+              f"p50 {timings[len(timings) // 2]:.1f}, p99 {timings[int(len(timings) * 0.99)]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
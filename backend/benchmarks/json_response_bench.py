@@ -0,0 +1,85 @@
+"""
+JSON response benchmark.
+
+Per-request CPU time to turn a large cached payload into a response
+body, for a 500-row ranking and a full Grand Tour race page:
+- default: FastAPI's jsonable_encoder + stdlib JSONResponse (before)
+- orjson: FastJSONResponse returned directly (fresh or derived payloads)
+- pre-encoded: the bytes CacheService encoded when the payload was stored
+
+Run from the backend directory:
+    python -m benchmarks.json_response_bench
+"""
+
+import asyncio
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.responses import FastJSONResponse, json_response
+from app.services.cache_service import CacheService
+
+ROUNDS = 200
+
+
+def ranking(rows: int):
+    return {"ranking": [
+        {"rank": i, "prev_rank": i + 1, "rider_name": f"Rider{i} Name{i}",
+         "rider_url": f"rider/rider{i}-name{i}", "team_name": "UAE Team Emirates",
+         "team_url": "team/uae-team-emirates-2024", "nationality": "SI", "points": 5000 - i}
+        for i in range(1, rows + 1)
+    ]}
+
+
+def race_page(stages: int, riders: int):
+    results = [
+        {"rank": i, "rider_name": f"Rider{i} Name{i}", "rider_url": f"rider/rider{i}-name{i}",
+         "team_name": "Visma | Lease a Bike", "time": "83:38:56", "bonus": "0:00:10",
+         "nationality": "DK", "age": 27, "pcs_points": 100, "uci_points": 50}
+        for i in range(1, riders + 1)
+    ]
+    return {
+        "name": "Tour de France", "year": 2024, "startdate": "2024-06-29", "enddate": "2024-07-21",
+        "stages": [{"date": "07-01", "profile_icon": "p3", "stage_name": f"Stage {i}",
+                    "stage_url": f"race/tour-de-france/2024/stage-{i}"} for i in range(1, stages + 1)],
+        "gc": results, "points": results, "kom": results,
+    }
+
+
+def cpu_us(func):
+    """Process CPU time per call, in microseconds."""
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.process_time()
+        func()
+        timings.append((time.process_time() - started) * 1e6)
+    timings.sort()
+    return timings
+
+
+async def cached(key, value):
+    cache = CacheService()
+    await cache.set(key, value)
+    return cache, await cache.get(key)
+
+
+def main():
+    for name, payload in (("ranking (500 rows)", ranking(500)), ("race page", race_page(21, 180))):
+        cache, value = asyncio.run(cached("bench", payload))
+        assert json_response(value, cache).body == FastJSONResponse(value).body
+
+        print(f"{name}: {len(cache.encoded(value)) / 1024:.0f} KiB")
+        for label, func in (
+            ("default", lambda: JSONResponse(jsonable_encoder(value))),
+            ("orjson", lambda: FastJSONResponse(value)),
+            ("pre-encoded", lambda: json_response(value, cache)),
+        ):
+            timings = cpu_us(func)
+            print(f"  {label + ' (us):':17} mean {statistics.mean(timings):.1f}, "
+                  f"p50 {timings[len(timings) // 2]:.1f}, p99 {timings[int(len(timings) * 0.99)]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
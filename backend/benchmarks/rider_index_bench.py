@@ -0,0 +1,65 @@
+"""
+Rider index benchmark.
+
+Builds a RiderIndex of 30000 synthetic riders (plus the alias-table
+riders) and reports build time and the latency of exact, prefix and
+typo lookups through `resolve` and `search`.
+
+Run from the backend directory:
+    python -m benchmarks.rider_index_bench
+"""
+
+import random
+import time
+
+from app.services.entity_resolver import EntityResolver
+from app.services.rider_index import RiderIndex
+
+RIDERS = 30000
+ROUNDS = 200
+QUERIES = [
+    ("exact", "Tadej Pogacar"),
+    ("family name", "vingegaard"),
+    ("prefix", "evenep"),
+    ("typo", "Pogacsr"),
+    ("typo, full name", "Jonas Vingegrad"),
+    ("unknown", "Zzyzx Qwerty"),
+]
+
+
+def synthetic_name(rng: random.Random) -> str:
+    def word():
+        return "".join(rng.choice("aeioubcdfghklmnprstvz") for _ in range(rng.randint(4, 10)))
+    return f"{word().upper()} {word().capitalize()}"
+
+
+def main():
+    rng = random.Random(7)
+    rows = []
+    for _ in range(RIDERS):
+        name = synthetic_name(rng)
+        family, given = name.split()
+        rows.append({"rider_name": name, "rider_url": f"rider/{given.lower()}-{family.lower()}"})
+
+    index = RiderIndex()
+    started = time.perf_counter()
+    EntityResolver(index)
+    index.add_rows(rows)
+    index.search("warm-up")  # compiles the lookup structures
+    build_s = time.perf_counter() - started
+
+    print(f"riders:  {len(index)} ({index.stats()['keys']} keys), built in {build_s:.2f} s")
+    for label, query in QUERIES:
+        timings = []
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            slug = index.resolve(query)
+            index.search(query)
+            timings.append((time.perf_counter() - started) * 1e6)
+        timings.sort()
+        print(f"{label:16} {query!r:20} -> {slug or '-':22} resolve+search (us): "
+              f"p50 {timings[len(timings) // 2]:.0f}, p99 {timings[int(len(timings) * 0.99)]:.0f}")
+
+
+if __name__ == "__main__":
+    main()
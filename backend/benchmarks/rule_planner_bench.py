@@ -0,0 +1,61 @@
+"""
+Rule planner benchmark.
+
+Reports how many fixture questions the rule-based planner answers
+without the LLM (coverage), whether the chosen intents match the
+expected ones, and planning latency.
+
+Run from the backend directory:
+    python -m benchmarks.rule_planner_bench
+"""
+
+from pathlib import Path
+import json
+import statistics
+import time
+
+from app.services.entity_resolver import EntityResolver
+from app.services.rule_planner import RulePlanner
+
+FIXTURES = Path(__file__).parent / "fixtures" / "planner_questions.json"
+ROUNDS = 200
+
+
+def main():
+    questions = json.loads(FIXTURES.read_text(encoding="utf-8"))
+    planner = RulePlanner(EntityResolver())
+
+    planned = 0
+    correct = 0
+    wrong = []
+    for item in questions:
+        plan = planner.plan(item["question"])
+        intent = plan["intent"] if plan else None
+        if plan:
+            planned += 1
+        if intent == item["intent"]:
+            correct += 1
+        else:
+            wrong.append((item["question"], item["intent"], intent))
+
+    timings = []
+    for _ in range(ROUNDS):
+        for item in questions:
+            started = time.perf_counter()
+            planner.plan(item["question"])
+            timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+
+    expected_rules = sum(1 for item in questions if item["intent"])
+    print(f"questions:        {len(questions)}")
+    print(f"fast-path plans:  {planned} ({planned / len(questions):.0%} coverage)")
+    print(f"expected by rule: {expected_rules}")
+    print(f"intent agreement: {correct}/{len(questions)}")
+    print(f"latency (us):     mean {statistics.mean(timings):.1f}, "
+          f"p50 {timings[len(timings) // 2]:.1f}, p99 {timings[int(len(timings) * 0.99)]:.1f}")
+    for question, expected, got in wrong:
+        print(f"  mismatch: {question!r} expected {expected} got {got}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""AI service tests (LLM and scraper are stubbed, no network)."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.services.ai_service import AIService
+from app.services.cache_service import CacheService
+from app.services.pcs_scraper import PCSScraperService
+
+
+class _FakeCompletions:
+    """Async OpenAI-style completions stub that takes `delay` seconds."""
+
+    def __init__(self, delay: float, reply: str = "{}"):
+        self.delay = delay
+        self.reply = reply
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        if kwargs.get("stream"):
+            return self._stream(["Pogacar ", "won ", "the Tour."])
+        message = SimpleNamespace(content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def _stream(self, parts):
+        for part in parts:
+            delta = SimpleNamespace(content=part)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def _ai_service(max_concurrency: int = 8, delay: float = 0.05, reply: str = "{}") -> AIService:
+    """Build an AIService on an OpenAI-style stub client."""
+    service = AIService(
+        PCSScraperService(CacheService(), max_workers=1),
+        max_concurrency=max_concurrency
+    )
+    service.is_anthropic = False
+    completions = _FakeCompletions(delay, reply)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service
+
+
+def test_llm_calls_do_not_block_event_loop():
+    """Other coroutines keep running while LLM calls are in flight."""
+    service = _ai_service(max_concurrency=2, delay=0.05)
+    ticks = []
+
+    async def _ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def _run():
+        calls = [service._call_llm([{"role": "user", "content": "hi"}]) for _ in range(4)]
+        await asyncio.gather(_ticker(), *calls)
+
+    started = time.monotonic()
+    asyncio.run(_run())
+
+    assert len(ticks) == 5
+    assert ticks[-1] - started < 0.1  # ticker was not starved by the LLM calls
+    assert service.client.chat.completions.max_in_flight == 2
+
+
+def test_execute_query_fans_out_with_partial_results():
+    """Plan fetches run concurrently; failures and timeouts stay per-entity."""
+    service = _ai_service()
+    service.fetch_deadline = 0.3
+
+    async def _get_rider(slug):
+        if slug == "unknown-rider":
+            raise ValueError("HTML from given URL is invalid")
+        if slug == "slow-rider":
+            await asyncio.sleep(5)
+        await asyncio.sleep(0.1)
+        return {"name": slug}
+
+    service.scraper.get_rider = _get_rider
+    plan = {
+        "intent": "comparison",
+        "entities": {"riders": ["tadej-pogacar", "jonas-vingegaard", "unknown-rider", "slow-rider"]},
+    }
+
+    started = time.monotonic()
+    data, timings = asyncio.run(service.execute_query_timed(plan))
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.5  # not 4x the single fetch latency, nor the slow one
+    assert list(data) == ["tadej-pogacar", "jonas-vingegaard", "unknown-rider", "slow-rider"]
+    assert data["tadej-pogacar"] == {"name": "tadej-pogacar"}
+    assert "error" in data["unknown-rider"]
+    assert "Timed out" in data["slow-rider"]["error"]
+    assert set(timings) == set(data)
+
+
+def test_chat_stream_emits_plan_data_then_tokens():
+    """The stream sends the plan, each entity's data, then LLM tokens."""
+    plan = '{"intent": "rider_info", "entities": {"riders": ["tadej-pogacar"]}, "visualization": "none"}'
+    service = _ai_service(reply=plan, delay=0)
+
+    async def _get_rider(slug):
+        return {"name": "Tadej Pogacar"}
+
+    service.scraper.get_rider = _get_rider
+
+    async def _run():
+        return [event async for event in service.chat_stream("Chi è Pogacar?")]
+
+    events = asyncio.run(_run())
+
+    kinds = [e["event"] for e in events]
+    assert kinds == ["plan", "data", "token", "token", "token", "done"]
+    assert events[1]["entity"] == "tadej-pogacar"
+    assert events[-1]["message"] == "Pogacar won the Tour."
+
+
+def test_context_builder_compacts_large_tables():
+    """Ranking context keeps top rows and needed columns within budget."""
+    from app.services.context_builder import ContextBuilder
+
+    ranking = [
+        {
+            "rank": i, "prev_rank": i, "rider_name": f"Rider {i}",
+            "rider_url": f"rider/rider-{i}", "team_name": "Team", "team_url": "team/team-2024",
+            "nationality": "IT", "points": 5000 - i,
+        }
+        for i in range(1, 1001)
+    ]
+    builder = ContextBuilder(token_budget=500)
+
+    context, tokens = builder.build({"ranking": {"ranking": ranking}}, {"intent": "ranking"})
+
+    assert tokens["after"] <= 500 < tokens["before"]
+    assert "rank|rider_name|team_name|nationality|points" in context
+    assert "Rider 1|" in context
+    assert "Rider 999" not in context
+    assert "rider_url" not in context
+
+
+def test_plan_cache_skips_llm_for_equivalent_questions():
+    """Rephrased questions about the same entities reuse the cached plan."""
+    plan = '{"intent": "rider_victories", "entities": {"riders": ["juan-ayuso"]}, "filters": {"year": 2024}}'
+    service = _ai_service(reply=plan, delay=0)
+    calls = []
+    original = service._call_llm
+
+    async def _counting_call(*args, **kwargs):
+        calls.append(1)
+        return await original(*args, **kwargs)
+
+    service._call_llm = _counting_call
+
+    async def _run():
+        first = await service.plan_query("Quante vittorie ha Juan Ayuso nel 2024?")
+        second = await service.plan_query("How many victories does Juan Ayuso have in 2024")
+        return first, second
+
+    first, second = asyncio.run(_run())
+
+    assert first == second
+    assert len(calls) == 1
+    assert service.stats()["plan_cache"]["hits"] == 1
+
+
+def test_rule_planner_bypasses_llm_for_simple_questions():
+    """Questions over known aliases are planned without an LLM call."""
+    service = _ai_service()
+
+    async def _fail(*args, **kwargs):
+        raise AssertionError("LLM should not be called")
+
+    service._call_llm = _fail
+
+    plan = asyncio.run(service.plan_query("Risultati tappa 5 Giro 2024"))
+
+    assert plan["intent"] == "race_results"
+    assert plan["entities"]["races"] == ["giro-d-italia"]
+    assert plan["entities"]["stage"] == 5
+    assert plan["filters"]["year"] == 2024
+    assert service.stats()["rule_plans"] == 1
+
+
+def test_response_cache_reuses_answer_until_data_refreshes():
+    """Repeated questions skip the answer LLM call until the scrape entry is refreshed."""
+    service = _ai_service(delay=0)
+    scraper = service.scraper
+
+    async def _get_rider(slug):
+        return await scraper._fetch(f"rider:{slug}", lambda: {"name": "Tadej Pogacar"}, 900)
+
+    scraper.get_rider = _get_rider
+
+    async def _run():
+        first = await service.chat("Chi è Pogacar?")
+        second = await service.chat("chi e' pogacar")
+        await scraper.cache.set("rider:tadej-pogacar", {"name": "Tadej Pogačar"}, 900)
+        third = await service.chat("Chi è Pogacar?")
+        return first, second, third
+
+    first, second, third = asyncio.run(_run())
+
+    assert first["meta"]["response_cache"] == "miss"
+    assert second["meta"]["response_cache"] == "hit"
+    assert second["message"] == first["message"]
+    # Answers are cached without their data; hits get the data just fetched
+    assert second["data"] == first["data"]
+    assert all("data" not in entry["result"] for entry in service.response_cache._entries.values())
+    assert third["meta"]["response_cache"] == "miss"
+    stats = service.stats()["response_cache"]
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 1
@@ -1,14 +1,20 @@
 """Basic API tests."""
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
-from app.main import app
+from app.config import settings
+from app.main import _create_cache, app
 
 
 @pytest.fixture
-def client():
-    """Create test client."""
+def client(tmp_path, monkeypatch):
+    """Create test client (on-disk stores under a temporary directory)."""
+    monkeypatch.setattr(settings, "CACHE_SNAPSHOT_PATH", str(tmp_path / "pcs_snapshots.db"))
+    monkeypatch.setattr(settings, "RIDER_INDEX_PATH", str(tmp_path / "rider_index.json"))
+    monkeypatch.setattr(settings, "TEAM_INDEX_PATH", str(tmp_path / "team_index.json"))
     with TestClient(app) as c:
         yield c
 
@@ -41,3 +47,112 @@ def test_stats_summary(client):
     assert response.status_code == 200
     data = response.json()
     assert "total_races" in data
+
+
+def test_scraper_is_shared(client):
+    """Test the scraper service is created once per process."""
+    from app.dependencies import get_scraper
+
+    class _Request:
+        app = client.app
+
+    assert get_scraper(_Request()) is get_scraper(_Request())
+
+    response = client.get("/api/stats/scraper")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["queue_depth"] == 0
+    assert data["workers"] >= 1
+
+
+def test_ranking_paging_and_filters_leave_cache_intact(client):
+    """Ranking requests page, filter and project rows without touching the cached payload."""
+    ranking = {"ranking": [
+        {"rank": i, "rider_name": f"Rider {i}", "team_name": "UAE Team Emirates" if i % 2 else "Visma | Lease a Bike",
+         "team_url": "team/uae-team-emirates-2024" if i % 2 else "team/team-visma-lease-a-bike-2024",
+         "nationality": "SI" if i % 3 == 0 else "BE", "points": 1000 - i}
+        for i in range(1, 101)
+    ]}
+
+    async def _get_ranking(ranking_type="individual", category="me"):
+        return ranking
+
+    client.app.state.scraper.get_ranking = _get_ranking
+
+    response = client.get("/api/rankings/individual?limit=2&offset=1&team=uae&fields=rank,rider_name")
+    data = response.json()
+    assert data["total"] == 50
+    assert data["ranking"] == [{"rank": 3, "rider_name": "Rider 3"}, {"rank": 5, "rider_name": "Rider 5"}]
+
+    response = client.get("/api/rankings/individual?nationality=si&rank_min=10&rank_max=20")
+    assert [r["rank"] for r in response.json()["ranking"]] == [12, 15, 18]
+
+    response = client.get("/api/rankings/individual?sort=points&limit=3&fields=rank")
+    assert [r["rank"] for r in response.json()["ranking"]] == [100, 99, 98]
+
+    assert len(ranking["ranking"]) == 100
+    assert client.app.state.tables.stats()["builds"] == 1
+
+
+def test_batch_dedupes_lookups_and_streams(client):
+    """Batch lookups resolve names, fetch duplicates once and report per-item status."""
+    calls = []
+
+    async def _get_rider(slug):
+        calls.append(slug)
+        if slug == "nobody-at-all":
+            return {"error": "HTML from given URL is invalid", "not_found": True}
+        return {"name": slug}
+
+    async def _get_team(slug, year):
+        calls.append(f"{slug}-{year}")
+        return {"name": slug, "year": year}
+
+    client.app.state.scraper.get_rider = _get_rider
+    client.app.state.scraper.get_team = _get_team
+
+    lookups = [
+        {"type": "rider", "slug": "pogacar"},
+        {"type": "rider", "slug": "tadej-pogacar"},
+        {"type": "team", "slug": "uae", "year": 2024},
+        {"type": "rider", "slug": "nobody at all"},
+    ]
+    response = client.post("/api/batch/", json={"lookups": lookups})
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == [200, 200, 200, 404]
+    assert data["results"][1]["data"] == {"name": "tadej-pogacar"}
+    assert data["meta"] == {**data["meta"], "lookups": 4, "unique": 3, "background_scrapes": 0}
+    assert sorted(calls) == ["nobody-at-all", "tadej-pogacar", "uae-team-emirates-2024"]
+
+    response = client.post("/api/batch/", json={"lookups": lookups, "stream": True})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert sorted(line["index"] for line in lines[:-1]) == [0, 1, 2, 3]
+    assert lines[-1]["meta"]["unique"] == 3
+
+    response = client.post("/api/batch/", json={"lookups": [{"type": "team", "slug": "uae"}]})
+    assert response.status_code == 422
+    response = client.post("/api/batch/", json={"lookups": [{"type": "ranking", "slug": "../riders"}]})
+    assert response.status_code == 422
+
+
+def test_redis_backend_requires_url(monkeypatch):
+    """Asking for Redis without REDIS_URL fails at startup instead of caching in memory."""
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "tiered")
+    monkeypatch.setattr(settings, "REDIS_URL", None)
+
+    with pytest.raises(ValueError, match="REDIS_URL"):
+        _create_cache()
+
+
+def test_live_subscriptions_are_validated_and_capped(client, monkeypatch):
+    """Unknown topics and subscriptions past WS_MAX_TOPICS get an error reply."""
+    monkeypatch.setattr(settings, "WS_MAX_TOPICS", 1)
+
+    with client.websocket_connect("/ws/live") as ws:
+        ws.send_json({"type": "subscribe", "topic": "race:../../admin:2024:x"})
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"type": "subscribe", "topic": "ranking:me:individual"})
+        assert ws.receive_json() == {"type": "subscribed", "topic": "ranking:me:individual"}
+        ws.send_json({"type": "subscribe", "topic": "race:tour-de-france:2024"})
+        assert ws.receive_json()["detail"] == "At most 1 topics per connection"
@@ -0,0 +1,135 @@
+"""Cache service tests."""
+
+import asyncio
+import json
+
+from app.services.cache_service import CacheService
+from app.services.snapshot_store import SnapshotStore
+
+
+def test_lru_eviction_by_entry_count():
+    """The least recently used key is evicted when the budget is full."""
+    cache = CacheService(max_entries=2)
+
+    async def _run():
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        await cache.get("a")  # "b" is now least recently used
+        await cache.set("c", {"v": 3})
+        return [await cache.get(k) for k in ("a", "b", "c")]
+
+    assert asyncio.run(_run()) == [{"v": 1}, None, {"v": 3}]
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+def test_byte_budget_and_counters():
+    """Entries are evicted to respect the byte budget, oversize values are skipped."""
+    cache = CacheService(max_bytes=100)
+
+    async def _run():
+        await cache.set("small", {"v": "x" * 30})
+        await cache.set("other", {"v": "y" * 30})
+        await cache.set("huge", {"v": "z" * 500})
+        await cache.set("third", {"v": "w" * 30})
+        await cache.get("missing")
+        await cache.set("expired", {"v": 1}, ttl=-1)
+        await cache.get("expired")
+
+    asyncio.run(_run())
+    stats = cache.stats()
+    assert stats["bytes"] <= 100
+    assert stats["rejected"] == 1
+    assert stats["evictions"] >= 1
+    assert stats["expirations"] == 1
+    assert stats["misses"] == 2
+    assert "keys" not in stats
+
+
+def test_stale_entries_only_returned_on_request():
+    """Past the soft TTL an entry is stale; past the grace period it is gone."""
+    cache = CacheService(stale_grace=60)
+
+    async def _run():
+        await cache.set("ranking:me:individual", {"v": 1}, ttl=-1)
+        await cache.set("gone", {"v": 2}, ttl=-61)
+        fresh_only = await cache.get("ranking:me:individual")
+        entry = await cache.get_entry("ranking:me:individual", allow_stale=True)
+        gone = await cache.get_entry("gone", allow_stale=True)
+        return fresh_only, entry, gone
+
+    fresh_only, entry, gone = asyncio.run(_run())
+
+    assert fresh_only is None
+    assert entry["value"] == {"v": 1}
+    assert cache.is_stale(entry)
+    assert gone is None
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_persisted_entries_survive_restart(tmp_path):
+    """Persisted entries are served from the snapshot store by a new process."""
+    path = str(tmp_path / "snapshots.db")
+
+    async def _write():
+        cache = CacheService(snapshots=SnapshotStore(path))
+        await cache.set("race:tour-de-france:2019:gc", {"name": "Tour de France"}, ttl=3600, persist=True)
+        await cache.set("ranking:me:individual", {"ranking": []}, ttl=600)
+        await cache.close()
+
+    async def _read():
+        cache = CacheService(snapshots=SnapshotStore(path))
+        race = await cache.get("race:tour-de-france:2019:gc")
+        again = await cache.get("race:tour-de-france:2019:gc")
+        ranking = await cache.get("ranking:me:individual")
+        stats = cache.stats()
+        await cache.close()
+        return race, again, ranking, stats
+
+    asyncio.run(_write())
+    race, again, ranking, stats = asyncio.run(_read())
+
+    assert race == again == {"name": "Tour de France"}
+    assert ranking is None
+    assert stats["snapshot_hits"] == 1  # second read came from memory
+    assert stats["snapshots"]["hits"] == 1
+
+
+def test_cached_values_are_pre_encoded():
+    """Local entries keep their JSON bytes, available for the exact cached object only."""
+    async def _run():
+        cache = CacheService()
+        await cache.set("rider:tadej-pogacar", {"name": "Tadej Pogačar", "wins": 88})
+        value = await cache.get("rider:tadej-pogacar")
+        body = cache.encoded(value)
+        copy = cache.encoded(dict(value))
+        await cache.delete("rider:tadej-pogacar")
+        return body, copy, cache.encoded(value), cache.stats()
+
+    body, copy, deleted, stats = asyncio.run(_run())
+
+    assert json.loads(body) == {"name": "Tadej Pogačar", "wins": 88}
+    assert copy is None
+    assert deleted is None
+    assert stats["bytes"] == 0
+
+
+def test_failing_listener_does_not_fail_set():
+    """A listener that raises is counted; the value is stored and later listeners still run."""
+    cache = CacheService()
+    seen = []
+
+    def _broken(key, value):
+        raise RuntimeError("listener bug")
+
+    cache.add_listener(_broken)
+    cache.add_listener(lambda key, value: seen.append(key))
+
+    async def _run():
+        await cache.set("rider:tadej-pogacar", {"name": "Tadej Pogacar"})
+        return await cache.get("rider:tadej-pogacar")
+
+    assert asyncio.run(_run()) == {"name": "Tadej Pogacar"}
+    assert seen == ["rider:tadej-pogacar"]
+    assert cache.stats()["listener_errors"] == 1
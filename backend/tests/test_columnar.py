@@ -0,0 +1,50 @@
+"""Tests for the columnar table representation."""
+
+from app.services.columnar import CategoryColumn, ColumnarTable, IntColumn, ObjectColumn
+
+
+def test_columnar_round_trip_and_sort():
+    """Rows survive conversion (markers, missing keys) and sort with missing values last."""
+    rows = [
+        {"rank": 2, "rider_name": "Pogacar Tadej", "team_name": "UAE Team Emirates", "time": "1:02:03"},
+        {"rank": "DNF", "rider_name": "Evenepoel Remco", "team_name": "Soudal Quick-Step"},
+        {"rank": 1, "rider_name": "Vingegaard Jonas", "team_name": "Visma | Lease a Bike", "time": "1:02:00"},
+    ]
+    table = ColumnarTable.from_rows(rows)
+
+    assert isinstance(table.column("rank"), IntColumn)
+    assert isinstance(table.column("team_name"), CategoryColumn)
+    assert table.rows(range(len(table))) == rows
+
+    positions = table.order(table.all(), "rank")
+    assert [r["rider_name"] for r in table.rows(positions, ["rider_name"])] == [
+        "Vingegaard Jonas", "Pogacar Tadej", "Evenepoel Remco"
+    ]
+    assert list(table.order(table.all(), "-rank", top=1)) == [0]
+    assert list(table.order(table.column("rank").between(1, 1), "rank")) == [2]
+
+
+def test_partial_sort_pages_match_full_sort_with_ties():
+    """Paging a sort with many tied keys neither repeats nor drops rows."""
+    rows = [{"rank": i + 1, "points": 0 if i >= 5 else 100 - i} for i in range(300)]
+    table = ColumnarTable.from_rows(rows)
+    mask = table.all()
+
+    full = list(table.order(mask, "-points"))
+    paged = []
+    for offset in range(0, 300, 20):
+        paged.extend(table.order(mask, "-points", top=offset + 20)[offset:offset + 20])
+
+    assert [int(i) for i in paged] == full
+    assert list(table.order(mask, "points", top=3)) == full[5:8]
+
+
+def test_mixed_type_column_sorts_like_numeric_columns():
+    """Descending sorts of mixed-type columns keep ties in table order and missing values last."""
+    rows = [{"bonus": v} for v in ["b", None, 2.5, "b", "a", None, 2.5]]
+    table = ColumnarTable.from_rows(rows)
+    assert isinstance(table.column("bonus"), ObjectColumn)
+
+    assert list(table.order(table.all(), "-bonus")) == [0, 3, 4, 2, 6, 1, 5]
+    assert list(table.order(table.all(), "bonus")) == [2, 6, 4, 0, 3, 1, 5]
+    assert list(table.order(table.all(), "-bonus", top=2)) == [0, 3]
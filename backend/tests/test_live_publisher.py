@@ -0,0 +1,73 @@
+"""Tests for the live update publisher."""
+
+import asyncio
+from datetime import date
+
+from app.services.cache_service import CacheService
+from app.services.live_publisher import LivePublisher, page_key
+
+
+class _Manager:
+    """Stand-in for the /ws/live ConnectionManager."""
+
+    def __init__(self, topics):
+        self.subscriptions = {topic: {object()} for topic in topics}
+        self.sent = []
+
+    async def broadcast_to_topic(self, topic, message):
+        self.sent.append(message)
+
+
+def _ranking(points):
+    return {"ranking": [
+        {"rank": i + 1, "rider_url": f"rider/r{i}", "points": p} for i, p in enumerate(points)
+    ]}
+
+
+def test_refreshes_are_diffed_and_pushed_to_subscribers():
+    """Only changed rows are pushed, to every topic of the page, and unchanged refreshes are dropped."""
+    manager = _Manager(["ranking:me:individual", "race:tour-de-france:2024"])
+    publisher = LivePublisher(manager, today=lambda: date(2024, 7, 1))
+
+    async def _run():
+        cache = CacheService()
+        cache.add_listener(publisher.on_cache_set)
+        await cache.set("ranking:me:individual", _ranking([300, 200, 100]))
+        await cache.set("ranking:me:individual", _ranking([300, 250, 100]))
+        await cache.set("ranking:me:individual", _ranking([300, 250, 100]))
+        await cache.set("ranking:me:individual", _ranking([300, 250]))
+        await cache.set("race:tour-de-france:2024:stage-5", {"stage_name": "Stage 5", "results": []})
+        await cache.set("rider:tadej-pogacar", {"name": "Tadej Pogacar"})
+        await publisher.close()
+
+    asyncio.run(_run())
+
+    snapshot, update, removal, stage = manager.sent
+    assert snapshot["type"] == "snapshot"
+    assert update["changes"] == {"tables": {"ranking": {
+        "changed": [{"rank": 2, "rider_url": "rider/r1", "points": 250}], "removed": []
+    }}}
+    assert removal["changes"]["tables"]["ranking"]["removed"] == ["rider/r2"]
+    # Stage pages also go to the subscribers of their race
+    assert (stage["topic"], stage["key"]) == ("race:tour-de-france:2024", "race:tour-de-france:2024:stage-5")
+    stats = publisher.stats()
+    assert stats["unchanged"] == 1
+    # A subscribed race is watched through its GC page even before it is scraped
+    assert publisher.watched_keys() == [
+        "ranking:me:individual", "race:tour-de-france:2024:stage-5", "race:tour-de-france:2024:gc"
+    ]
+
+
+def test_only_known_topics_of_current_seasons_are_watched_unseen():
+    """Unknown topic shapes are rejected; unscraped pages are watched for the current or next season only."""
+    manager = _Manager([
+        "race:tour-de-france:2024", "race:giro-d-italia:2019", "startlist:vuelta-a-espana:2025",
+        "ranking:me:anything", "rider:tadej-pogacar", "race:x:2024:stage-500",
+    ])
+    publisher = LivePublisher(manager, max_unseen=1, today=lambda: date(2024, 7, 1))
+
+    assert page_key("race:tour-de-france:2024") == "race:tour-de-france:2024:gc"
+    assert page_key("ranking:me:anything") is None
+    assert page_key("rider:tadej-pogacar") is None
+    # 2019 is too old; the 2025 startlist is past the max_unseen budget
+    assert publisher.watched_keys() == ["race:tour-de-france:2024:gc"]
@@ -0,0 +1,240 @@
+"""PCS scraper service tests (no network: scrape functions are stubbed)."""
+
+from datetime import date
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.cache_service import CacheService
+from app.services import pcs_scraper
+from app.services.pcs_scraper import PCSScraperService, trace_fetches
+from app.services.team_index import TeamIndex
+
+
+@pytest.fixture
+def scraper():
+    """Create a scraper with a fresh in-memory cache."""
+    service = PCSScraperService(CacheService(), max_workers=2)
+    yield service
+    service.executor.shutdown(wait=True)
+
+
+def test_concurrent_misses_share_one_scrape(scraper):
+    """Concurrent misses for the same key trigger a single scrape."""
+    calls = []
+    lock = threading.Lock()
+
+    def _scrape():
+        with lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return {"name": "Tadej Pogacar"}
+
+    async def _run():
+        return await asyncio.gather(*[
+            scraper._fetch("rider:tadej-pogacar", _scrape, ttl=60)
+            for _ in range(10)
+        ])
+
+    results = asyncio.run(_run())
+
+    assert len(calls) == 1
+    assert all(r == {"name": "Tadej Pogacar"} for r in results)
+    stats = scraper.stats()
+    assert stats["originating_calls"] == 1
+    assert stats["coalesced_calls"] == 9
+    assert stats["inflight"] == 0
+
+
+def test_scrape_error_reaches_waiters_and_is_not_cached(scraper):
+    """An error payload is shared with every waiter but never cached."""
+    def _scrape():
+        time.sleep(0.05)
+        return {"error": "HTML from given URL is invalid"}
+
+    async def _run():
+        results = await asyncio.gather(*[
+            scraper._fetch("rider:nobody", _scrape, ttl=60)
+            for _ in range(5)
+        ])
+        return results, await scraper.cache.get("rider:nobody")
+
+    results, cached = asyncio.run(_run())
+
+    assert all("error" in r for r in results)
+    assert cached is None
+
+
+def test_scrape_exception_reaches_every_waiter(scraper):
+    """An exception raised by the shared scrape propagates to all callers."""
+    def _scrape():
+        time.sleep(0.05)
+        raise ConnectionError("PCS unreachable")
+
+    async def _run():
+        return await asyncio.gather(*[
+            scraper._fetch("ranking:me:individual", _scrape, ttl=60)
+            for _ in range(3)
+        ], return_exceptions=True)
+
+    results = asyncio.run(_run())
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+def test_rider_views_share_one_scrape(scraper, monkeypatch):
+    """Profile, victories and results come from one cached rider page."""
+    calls = []
+
+    class _Rider:
+        def __init__(self, url):
+            calls.append(url)
+
+        def parse(self):
+            return {
+                "name": "Tadej Pogacar",
+                "season_results": [
+                    {"stage_name": "Strade Bianche", "result": 1, "date": "2024-03-02"},
+                    {"stage_name": "Milano-Sanremo", "result": 3, "date": "2024-03-16"},
+                    {"stage_name": "Il Lombardia", "result": 1, "date": "2023-10-07"},
+                ],
+            }
+
+    monkeypatch.setattr("app.services.pcs_scraper.Rider", _Rider)
+
+    async def _run():
+        profile = await scraper.get_rider("pogacar")
+        victories = await scraper.get_rider_victories("pogacar", 2024)
+        results = await scraper.get_rider_results("tadej-pogacar")
+        return profile, victories, results
+
+    profile, victories, results = asyncio.run(_run())
+
+    assert calls == ["rider/tadej-pogacar"]
+    assert scraper.cache.stats()["entries"] == 1
+    assert [v["stage_name"] for v in victories["victories"]] == ["Strade Bianche"]
+    assert len(results["season_results"]) == 3
+    assert "victories" not in profile
+
+
+def test_stale_entry_served_while_one_refresh_runs():
+    """Stale hits return at once and share a single background refresh."""
+    scraper = PCSScraperService(CacheService(stale_grace=60), max_workers=1)
+    calls = []
+
+    def _scrape():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"ranking": ["fresh"]}
+
+    async def _run():
+        await scraper.cache.set("ranking:me:individual", {"ranking": ["old"]}, ttl=-1)
+        with trace_fetches() as trace:
+            started = time.monotonic()
+            served = await asyncio.gather(*[
+                scraper._fetch("ranking:me:individual", _scrape, ttl=600)
+                for _ in range(5)
+            ])
+            elapsed = time.monotonic() - started
+        await scraper._inflight["ranking:me:individual"]
+        return served, elapsed, trace, await scraper.cache.get("ranking:me:individual")
+
+    served, elapsed, trace, refreshed = asyncio.run(_run())
+    scraper.executor.shutdown(wait=True)
+
+    assert all(r == {"ranking": ["old"]} for r in served)
+    assert elapsed < 0.05  # nobody waited for the scrape
+    assert trace.stale
+    assert len(calls) == 1
+    assert refreshed == {"ranking": ["fresh"]}
+    stats = scraper.stats()
+    assert stats["stale_served"] == 5
+    assert stats["revalidations"] == 1
+
+
+def test_failed_scrapes_are_not_retried_at_once(scraper):
+    """Not-found pages are served from the negative cache, transient failures (parse errors too) back off."""
+    calls = {"rider:nobody": 0, "ranking:me:individual": 0}
+
+    def _missing():
+        calls["rider:nobody"] += 1
+        return pcs_scraper._scrape_error(ValueError("HTML from given URL is invalid: 'rider/nobody'"))
+
+    def _unparsable():
+        calls["ranking:me:individual"] += 1
+        return pcs_scraper._scrape_error(ValueError("Rank column wasn't found."))
+
+    async def _run():
+        for _ in range(3):
+            await scraper._fetch("rider:nobody", _missing, ttl=60)
+            await scraper._fetch("ranking:me:individual", _unparsable, ttl=60)
+        # Backoff over: the next call scrapes again and doubles the delay
+        scraper.negative_cache._entries["ranking:me:individual"]["retry_at"] = 0
+        await scraper._fetch("ranking:me:individual", _unparsable, ttl=60)
+        return scraper.negative_cache._entries["ranking:me:individual"]["failures"]
+
+    failures = asyncio.run(_run())
+
+    assert calls == {"rider:nobody": 1, "ranking:me:individual": 2}
+    assert failures == 2
+    stats = scraper.stats()["negative_cache"]
+    assert stats["absorbed_not_found"] == 2
+    assert stats["absorbed_backoff"] == 2
+    assert stats["not_found_keys"] == 1
+    assert stats["backing_off_keys"] == 1
+
+
+def test_team_seasons_resolve_to_historical_slugs(scraper, monkeypatch):
+    """Older seasons PCS has no page for are requested again under the slug listed by the current team page."""
+    index = TeamIndex()
+    scraper.team_index = scraper.entity_resolver.team_index = index
+    scraper.cache.add_listener(index.on_cache_set)
+    scraper.ttl_policy.today = lambda: date(2024, 6, 1)
+
+    history = [
+        {"text": "2024 | Team Visma | Lease a Bike", "value": "team/team-visma-lease-a-bike-2024/overview/"},
+        {"text": "2023 | Jumbo-Visma", "value": "team/jumbo-visma-2023/overview/"},
+        {"text": "2019 | Team Jumbo-Visma", "value": "team/team-jumbo-visma-2019/overview/"},
+    ]
+    urls = []
+
+    pages = {f"team/{option['value'].split('/')[1]}": "Visma" for option in history}
+    pages["team/team-sky-2018"] = "Team Sky"
+
+    class _Team:
+        def __init__(self, url):
+            urls.append(url)
+            if url not in pages:
+                raise ValueError("HTML from given URL is invalid")
+            self.url = url
+
+        def parse(self):
+            if self.url == "team/team-sky-2018":
+                return {"name": "Team Sky", "history_select": [{"value": "team/team-sky-2018/overview/"}]}
+            return {"name": "Visma", "history_select": history}
+
+    monkeypatch.setattr(pcs_scraper, "Team", _Team)
+
+    async def _run():
+        return (
+            await scraper.get_team("visma", 2023),
+            await scraper.get_team("jumbo-visma", 2019),
+            await scraper.get_team("visma", 2021),
+            await scraper.get_team("team-sky", 2018),
+        )
+
+    visma_2023, jumbo_2019, missing, sky = asyncio.run(_run())
+
+    assert urls == [
+        "team/team-visma-lease-a-bike-2023",
+        "team/team-visma-lease-a-bike-2024",
+        "team/jumbo-visma-2023",
+        "team/team-jumbo-visma-2019",
+        "team/team-sky-2018",
+    ]
+    assert visma_2023["name"] == jumbo_2019["name"] == "Visma"
+    assert missing["not_found"] is True
+    assert sky["name"] == "Team Sky"
+    assert index.stats()["teams"] == 2
@@ -0,0 +1,105 @@
+"""Cache pre-warming tests (scrape functions are stubbed, no network)."""
+
+import asyncio
+from datetime import date
+
+from app.services.cache_service import CacheService
+from app.services.pcs_scraper import PCSScraperService
+from app.services.prewarm import Prewarmer, current_grand_tour, key_loader, latest_stages
+from app.services.rate_limiter import Priority, TokenBucketRateLimiter
+
+
+def test_cycle_refreshes_hot_keys_about_to_expire():
+    """Hot keys that turn stale before the next cycle are re-scraped, others are not."""
+    scraper = PCSScraperService(CacheService(), max_workers=1)
+    prewarmer = Prewarmer(scraper, interval=60, min_spacing=0, top_keys=2)
+    calls = []
+
+    def _loader(key):
+        def _scrape():
+            calls.append(key)
+            return {"key": key}
+        return _scrape
+
+    async def _run():
+        # Ranking expires in 30s, rider in an hour; the team is rarely fetched
+        for _ in range(3):
+            await scraper._fetch("ranking:me:individual", _loader("ranking"), ttl=30)
+        await scraper._fetch("rider:tadej-pogacar", _loader("rider"), ttl=3600)
+        await scraper._fetch("rider:tadej-pogacar", _loader("rider"), ttl=3600)
+        await scraper._fetch("team:uae-team-emirates:2024", _loader("team"), ttl=1)
+        calls.clear()
+        await prewarmer.run_cycle()
+
+    asyncio.run(_run())
+    scraper.executor.shutdown(wait=True)
+
+    assert calls == ["ranking"]
+    assert prewarmer.stats()["refreshed"] == 1
+    assert scraper.stats()["refreshes"] == 1
+
+
+def test_cycle_fetches_watched_keys_never_scraped():
+    """A watched page the scraper never loaded is fetched through the call its key names."""
+    scraper = PCSScraperService(CacheService(), max_workers=1)
+    calls = []
+
+    async def _get_ranking(ranking_type, category):
+        calls.append((ranking_type, category))
+        return {"ranking": []}
+
+    scraper.get_ranking = _get_ranking
+    watched = ["ranking:we:teams", "ranking:me:anything", "rider:tadej-pogacar"]
+    prewarmer = Prewarmer(scraper, interval=0.03, min_spacing=0, watched_keys=lambda: watched)
+
+    asyncio.run(prewarmer.run_cycle())
+    scraper.executor.shutdown(wait=True)
+
+    assert calls == [("teams", "we")]
+    assert prewarmer.stats()["refreshed"] == 1
+    assert key_loader(scraper, "race:tour-de-france:2024:stage-5") is not None
+    assert key_loader(scraper, "race:tour-de-france:latest:gc") is None
+
+
+def test_cycle_waits_for_queued_user_scrapes():
+    """A refresh is held back while an interactive scrape waits for a token."""
+    # 600/min = one token every 100ms
+    limiter = TokenBucketRateLimiter(rate_per_minute=600, burst=1)
+    scraper = PCSScraperService(CacheService(), max_workers=1, rate_limiter=limiter)
+    prewarmer = Prewarmer(scraper, interval=60, min_spacing=0)
+    prewarmer._pinned = {"ranking:me:individual"}
+    queued_at_refresh = []
+
+    async def _refresh(key):
+        queued_at_refresh.append(limiter.queue_length())
+        return True
+
+    scraper.refresh = _refresh
+    scraper.tracks = lambda key: True
+
+    async def _run():
+        await limiter.acquire()  # drain the bucket
+        user = asyncio.create_task(limiter.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        await prewarmer.run_cycle()
+        await user
+
+    asyncio.run(_run())
+    scraper.executor.shutdown(wait=True)
+
+    assert queued_at_refresh == [0]
+    assert prewarmer.stats()["deferred"] >= 1
+
+
+def test_grand_tour_seed_helpers():
+    """The Grand Tour in progress and its latest finished stages are found."""
+    race = {"stages": [
+        {"date": "07-05", "stage_url": "race/tour-de-france/2024/stage-7"},
+        {"date": "07-06", "stage_url": "race/tour-de-france/2024/stage-8"},
+        {"date": "07-07", "stage_url": "race/tour-de-france/2024/stage-9"},
+        {"date": "07-09", "stage_url": "race/tour-de-france/2024/stage-10"},
+    ]}
+
+    assert current_grand_tour(date(2024, 7, 7)) == "tour-de-france"
+    assert current_grand_tour(date(2024, 11, 1)) is None
+    assert latest_stages(race, date(2024, 7, 7), 2) == [8, 9]
@@ -0,0 +1,80 @@
+"""PCS rate limiter tests."""
+
+import asyncio
+
+from app.services.rate_limiter import (
+    Priority, ScrapeAllowance, TokenBucketRateLimiter, set_allowance, set_priority
+)
+
+
+def test_burst_is_served_without_waiting():
+    """Requests within the burst size do not wait."""
+    limiter = TokenBucketRateLimiter(rate_per_minute=60, burst=3)
+
+    async def _run():
+        for _ in range(3):
+            await limiter.acquire()
+        return limiter.stats()
+
+    stats = asyncio.run(_run())
+
+    assert stats["wait_seconds"]["count"] == 3
+    assert stats["wait_seconds"]["max"] == 0
+    assert stats["queue_length"] == 0
+
+
+def test_interactive_lane_goes_first():
+    """Queued interactive requests are served before background ones."""
+    # 1200/min = one token every 50ms
+    limiter = TokenBucketRateLimiter(rate_per_minute=1200, burst=1)
+    order = []
+
+    async def _request(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    async def _run():
+        await limiter.acquire()  # drain the bucket
+        background = [
+            asyncio.create_task(_request(f"bg{i}", Priority.BACKGROUND))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(_request("chat", Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        lanes = limiter.stats()["queue_by_lane"]
+        await asyncio.gather(*background, interactive)
+        await limiter.close()
+        return lanes
+
+    lanes = asyncio.run(_run())
+
+    assert lanes == {"interactive": 1, "normal": 0, "background": 3}
+    assert order[0] == "chat"
+    assert order[1:] == ["bg0", "bg1", "bg2"]
+
+
+def test_scrape_allowance_demotes_later_scrapes():
+    """Past its allowance, a request's scrapes wait in the background lane."""
+    # 1200/min = one token every 50ms
+    limiter = TokenBucketRateLimiter(rate_per_minute=1200, burst=1)
+    allowance = ScrapeAllowance(1)
+
+    async def _batch():
+        set_priority(Priority.INTERACTIVE)
+        set_allowance(allowance)
+        await asyncio.gather(limiter.acquire(), limiter.acquire(), limiter.acquire())
+
+    async def _run():
+        await limiter.acquire()  # drain the bucket
+        batch = asyncio.create_task(_batch())
+        await asyncio.sleep(0.01)
+        lanes = limiter.stats()["queue_by_lane"]
+        await batch
+        await limiter.close()
+        return lanes
+
+    lanes = asyncio.run(_run())
+
+    assert lanes == {"interactive": 1, "normal": 0, "background": 2}
+    assert allowance.demoted == 2
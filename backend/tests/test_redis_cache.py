@@ -0,0 +1,66 @@
+"""Redis cache backend tests (run against fakeredis)."""
+
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.services.cache_service import CacheService
+from app.services.redis_cache import RedisCacheBackend
+
+
+def _worker(server) -> CacheService:
+    """Build a tiered cache as one worker process would."""
+    client = fakeredis.aioredis.FakeRedis(server=server)
+    return CacheService(
+        remote=RedisCacheBackend("redis://unused", client=client),
+        local_ttl=60
+    )
+
+
+def test_workers_share_entries_through_redis():
+    """A value cached by one worker is served to another from L2."""
+    server = fakeredis.FakeServer()
+    ranking = {"ranking": [{"rank": i, "rider_name": f"Rider {i}"} for i in range(200)]}
+
+    async def _run():
+        first, second = _worker(server), _worker(server)
+        await first.set("ranking:me:individual", ranking, ttl=600)
+        value = await second.get("ranking:me:individual")
+        local_entries = second.stats()["entries"]
+        remote_stats = second.stats()["remote"]
+        await first.close()
+        await second.close()
+        return value, local_entries, remote_stats
+
+    value, local_entries, remote_stats = asyncio.run(_run())
+
+    assert value == ranking
+    assert local_entries == 1  # promoted into the second worker's L1
+    assert remote_stats["hits"] == 1
+
+
+def test_redis_only_mode_and_clear():
+    """Without L1 every lookup goes to Redis; clear removes prefixed keys."""
+    server = fakeredis.FakeServer()
+
+    async def _run():
+        client = fakeredis.aioredis.FakeRedis(server=server)
+        cache = CacheService(
+            remote=RedisCacheBackend("redis://unused", client=client),
+            local=False
+        )
+        await cache.set("rider:tadej-pogacar", {"name": "Tadej Pogacar"}, ttl=60)
+        hit = await cache.get("rider:tadej-pogacar")
+        await cache.clear()
+        miss = await cache.get("rider:tadej-pogacar")
+        entries = cache.stats()["entries"]
+        await cache.close()
+        return hit, miss, entries
+
+    hit, miss, entries = asyncio.run(_run())
+
+    assert hit == {"name": "Tadej Pogacar"}
+    assert miss is None
+    assert entries == 0
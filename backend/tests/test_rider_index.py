@@ -0,0 +1,83 @@
+"""Tests for the rider index and its use by the entity resolver."""
+
+import asyncio
+
+from app.services.cache_service import CacheService
+from app.services.entity_resolver import EntityResolver
+from app.services.rider_index import RiderIndex
+
+
+STARTLIST = {"startlist": [
+    {"rider_name": "POGAČAR Tadej", "rider_url": "rider/tadej-pogacar", "team_name": "UAE Team Emirates"},
+    {"rider_name": "VAN AERT Wout", "rider_url": "rider/wout-van-aert", "team_name": "Visma | Lease a Bike"},
+    {"rider_name": "YATES Adam", "rider_url": "rider/adam-yates", "team_name": "UAE Team Emirates"},
+    {"rider_name": "YATES Simon", "rider_url": "rider/simon-yates", "team_name": "Visma | Lease a Bike"},
+    {"rider_name": "SKJELMOSE Mattias", "rider_url": "rider/mattias-skjelmose-jensen", "team_name": "Lidl-Trek"},
+]}
+
+
+def test_scraped_riders_resolve_with_typos():
+    """Riders from a cached startlist are found by prefix and despite typos."""
+    async def _run():
+        cache = CacheService()
+        index = RiderIndex()
+        cache.add_listener(index.on_cache_set)
+        resolver = EntityResolver(index)
+        await cache.set("startlist:tour-de-france:2024", STARTLIST)
+        return (
+            await resolver.resolve_rider("Pogacsr"),
+            await resolver.resolve_rider("Skjelmsoe"),
+            await resolver.resolve_rider("mattias skjelmose"),
+            await resolver.resolve_rider("Yates"),
+            await resolver.resolve_rider("Unknown Rider"),
+            await resolver.search_riders("skj"),
+        )
+
+    pogacar, typo, full, yates, unknown, search = asyncio.run(_run())
+
+    assert pogacar == "tadej-pogacar"
+    assert typo == full == "mattias-skjelmose-jensen"
+    assert yates == "adam-yates"  # alias table first
+    assert unknown == "unknown-rider"
+    assert search == [{"name": "Mattias Skjelmose", "slug": "mattias-skjelmose-jensen", "match_type": "prefix"}]
+
+
+def test_index_is_saved_and_reloaded(tmp_path):
+    """New riders are written to disk and loaded by the next process."""
+    path = str(tmp_path / "riders.json")
+
+    async def _write():
+        index = RiderIndex(path)
+        await index.start()
+        index.add_rows(STARTLIST["startlist"])
+        await index.close()
+
+    async def _read():
+        index = RiderIndex(path)
+        await index.start()
+        await index.close()
+        return index
+
+    asyncio.run(_write())
+    index = asyncio.run(_read())
+
+    assert len(index) == 5
+    assert index.name("wout-van-aert") == "Wout Van Aert"
+    assert index.resolve("van art") == "wout-van-aert"
+    assert index.stats()["saves"] == 0  # nothing new to save
+
+
+def test_incremental_additions_and_explicit_slugs():
+    """Riders added after a lookup are found, and unknown slugs are not fuzzy-matched."""
+    index = RiderIndex()
+    index.add_rows(STARTLIST["startlist"][:2])
+    assert index.resolve("pogacar") == "tadej-pogacar"
+
+    index.add("tom-pidcock", "PIDCOCK Thomas")
+    index.add_rows(STARTLIST["startlist"][2:])
+
+    assert index.prefixed("pid") == ["pidcock", "pidcock thomas"]
+    assert index.resolve("Pidcok") == "tom-pidcock"
+    assert index.resolve("tom-pidcock-2") is None
+    assert index.resolve("skjelmose") == "mattias-skjelmose-jensen"
+    assert index._sorted == sorted(index._key_list)
@@ -0,0 +1,46 @@
+"""TTL policy tests."""
+
+from datetime import date
+
+from app.services.ttl_policy import Freshness, TTLPolicy
+
+
+def _policy() -> TTLPolicy:
+    return TTLPolicy(today=lambda: date(2024, 7, 10))
+
+
+def test_races_are_classified_by_calendar():
+    """Past seasons are historical, running races live, later ones upcoming."""
+    policy = _policy()
+    tour = {"startdate": "2024-06-29", "enddate": "2024-07-21"}
+
+    assert policy.classify_race(2019, {"startdate": "2019-07-06", "enddate": "2019-07-28"}) == Freshness.HISTORICAL
+    assert policy.classify_race(2024, tour) == Freshness.LIVE
+    assert policy.classify_race(2024, {"startdate": "2024-04-14", "enddate": "2024-04-14"}) == Freshness.FINAL
+    assert policy.classify_race(2024, {"date": "2024-08-17"}) == Freshness.UPCOMING
+    assert policy.classify_race(2019) == Freshness.HISTORICAL
+
+    assert policy.race_ttl(2019, {}) == (policy.ttls[Freshness.HISTORICAL], Freshness.HISTORICAL)
+    assert policy.race_ttl(2024, tour).ttl == policy.ttls[Freshness.LIVE]
+    assert policy.season_ttl(2023, policy.team_ttl).frozen
+    assert policy.season_ttl(2024, policy.team_ttl) == (policy.team_ttl, Freshness.LIVE)
+
+
+def test_only_final_and_historical_pages_are_frozen():
+    """Persistence follows the calendar class, not the configured TTL values."""
+    policy = TTLPolicy(today=lambda: date(2024, 7, 10), final_ttl=3600, team_ttl=7200)
+
+    assert not policy.season_ttl(2024, policy.team_ttl).frozen
+    assert policy.race_ttl(2024, {"startdate": "2024-04-14", "enddate": "2024-04-14"}).frozen
+
+
+def test_saved_scrapes_count_outlived_legacy_windows():
+    """A hit counts once per legacy TTL window the entry has outlived."""
+    policy = _policy()
+
+    policy.record_hit("race:tour-de-france:2019:gc", 300)   # within 900s
+    policy.record_hit("race:tour-de-france:2019:gc", 1000)  # 1st window
+    policy.record_hit("race:tour-de-france:2019:gc", 1200)  # same window
+    policy.record_hit("race:tour-de-france:2019:gc", 2000)  # 2nd window
+
+    assert policy.stats()["saved_scrapes"] == 2